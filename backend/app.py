@@ -1,19 +1,49 @@
+import asyncio
+import json
 import os
 import shutil
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import FastAPI, HTTPException, Request, Body
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional, List
 from scripts.sui_utils import get_user_tokens, mint_token, burn_token, transfer_token
 from scripts.move_package_utils import create_move_package
-from database import add_token_record, get_tokens_by_deployer, get_tokens_by_owner, get_all_tokens, delete_token_record, update_token_owner
-from scripts.event_listener import start_event_listener
-from scripts.sui_txn_utils import get_transactions_by_object, get_transactions_by_address, get_transaction_details
+from database import add_token_record, get_tokens_by_deployer, get_tokens_by_owner, get_all_tokens, list_tokens, iter_tokens, delete_token_record, update_token_owner, get_deploy_job, count_deploy_jobs_by_state, get_token, get_token_holders, get_holder_coverage, get_portfolio, normalize_address, start_index_refresh
+from scripts.event_listener import start_event_listener, listener_health, NETWORK_CONFIGS
+from scripts.holder_indexer import start_holder_indexer, holder_index_status
+from scripts.owner_tracker import start_owner_tracker, owner_tracker_status
+from config import CHAIN_WRITE_WORKERS, DB_WORKERS, PTB_MAX_RECIPIENTS, PTB_MAX_BATCH_RECIPIENTS
+from scripts.ptb_batch import run_batch, build_mint_ptb, build_transfer_ptb
+from scripts.build_cache import build_cache_stats
+from scripts.gas_pool import get_gas_pool, gas_pool_stats
+from scripts.gas_estimate import gas_estimate_stats
+from scripts.txn_cache import get_transactions_by_object, get_transactions_by_address, get_transaction_details, cache_stats
+from scripts.deploy_queue import DEPLOY_JOB_STATES
+from metrics import HTTP_REQUEST_SECONDS, DEPLOY_QUEUE_DEPTH, render_metrics
+from logger import get_logger
+
+logger = get_logger(__name__)
 
 app = FastAPI()
 
+# Handlers are async. Work that would block the event loop is sent to dedicated pools:
+# mint/burn/transfer fork the sui CLI and can take seconds, so they get their own bounded
+# pool and queue there instead of occupying threads that serve reads. SQLite calls use a
+# separate small pool; index lookups in database.py are in-memory and run inline.
+_chain_write_executor = ThreadPoolExecutor(max_workers=CHAIN_WRITE_WORKERS, thread_name_prefix="chain-write")
+_db_executor = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix="db")
+
+async def _run_chain_write(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_chain_write_executor, fn, *args)
+
+async def _run_db(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_db_executor, fn, *args)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["https://token-forge-pearl.vercel.app","http://localhost:5173", "http://localhost:5174"],  # Add your frontend URL here
@@ -22,10 +52,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    # Labelled by route template (e.g. /api/deploy_jobs/{job_id}) to keep series bounded
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=route.path if route is not None else "unmatched",
+            status=status,
+        )
+
 @app.on_event("startup")
 def on_startup():
-    print("[App] FastAPI startup event triggered. Starting event listener...")
+    logger.info("FastAPI startup; starting event listener")
     start_event_listener()
+    start_index_refresh()
+    network_urls = {network: config["url"] for network, config in NETWORK_CONFIGS.items()}
+    start_holder_indexer(network_urls)
+    start_owner_tracker(network_urls)
+    # Load the signer's gas coins in the background; leases wait for it if needed
+    threading.Thread(target=get_gas_pool, name="gas-pool-init", daemon=True).start()
 
 # Directory paths
 TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), 'templates', 'fungible_token_template.move')
@@ -83,36 +137,96 @@ class TransferParams(BaseModel):
     recipient: str
     sender_address: str
 
+class BatchRecipient(BaseModel):
+    address: str
+    amount: int
+
+class MintBatchParams(BaseModel):
+    package_id: str
+    module_name: str
+    treasury_cap_id: str
+    sender_address: str
+    recipients: List[BatchRecipient]
+    chunk_size: int = PTB_MAX_RECIPIENTS
+
+class TransferBatchParams(BaseModel):
+    coin_object_id: str
+    sender_address: str
+    recipients: List[BatchRecipient]
+    chunk_size: int = PTB_MAX_RECIPIENTS
+
 class TokenUpdateParams(BaseModel):
     package_id: str
     new_owner: str = None  # Optional for transfer
 
 @app.post("/mint")
-def mint(params: MintParams):
+async def mint(params: MintParams):
     try:
-        tx_hash = mint_token(params)
+        tx_hash = await _run_chain_write(mint_token, params)
         return {"status": "success", "tx_hash": tx_hash}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _batch_response(results):
+    failed = sum(1 for r in results if r["status"] != "success")
+    return {
+        "status": "success" if not failed else ("failed" if failed == len(results) else "partial"),
+        "transactions": len({r["tx_digest"] for r in results if r["tx_digest"]}),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "results": results,
+    }
+
+def _check_batch_size(recipients):
+    if not recipients:
+        raise HTTPException(status_code=400, detail="recipients must not be empty")
+    if len(recipients) > PTB_MAX_BATCH_RECIPIENTS:
+        raise HTTPException(status_code=400, detail=f"at most {PTB_MAX_BATCH_RECIPIENTS} recipients per request")
+
+@app.post("/mint/batch")
+async def mint_batch(params: MintBatchParams):
+    _check_batch_size(params.recipients)
+    recipients = [(r.address, r.amount) for r in params.recipients]
+    results = await run_batch(
+        params.treasury_cap_id,
+        recipients,
+        lambda chunk: build_mint_ptb(params.package_id, params.module_name, params.treasury_cap_id, chunk, params.sender_address),
+        _run_chain_write,
+        params.chunk_size,
+    )
+    return _batch_response(results)
+
+@app.post("/transfer/batch")
+async def transfer_batch(params: TransferBatchParams):
+    _check_batch_size(params.recipients)
+    recipients = [(r.address, r.amount) for r in params.recipients]
+    results = await run_batch(
+        params.coin_object_id,
+        recipients,
+        lambda chunk: build_transfer_ptb(params.coin_object_id, chunk, params.sender_address),
+        _run_chain_write,
+        params.chunk_size,
+    )
+    return _batch_response(results)
+
 @app.post("/burn")
-def burn(params: BurnParams):
+async def burn(params: BurnParams):
     try:
-        tx_hash = burn_token(params)
+        tx_hash = await _run_chain_write(burn_token, params)
         return {"status": "success", "tx_hash": tx_hash}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/transfer")
-def transfer(params: TransferParams):
+async def transfer(params: TransferParams):
     try:
-        tx_hash = transfer_token(params)
+        tx_hash = await _run_chain_write(transfer_token, params)
         return {"status": "success", "tx_hash": tx_hash}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/my_tokens")
-def my_tokens(req: UserTokensRequest):
+async def my_tokens(req: UserTokensRequest):
     try:
         tokens = get_tokens_by_deployer(req.address)
         return {"tokens": tokens}
@@ -120,66 +234,146 @@ def my_tokens(req: UserTokensRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/user_tokens")
-def get_user_tokens(address: str):
+async def get_user_tokens(address: str):
     try:
         tokens = get_tokens_by_deployer(address)
-        print("[DEBUG] /api/user_tokens tokens:", tokens)  # Debug print
+        logger.debug("Fetched user tokens", extra={"address": address, "count": len(tokens)})
         return {"tokens": tokens}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+MAX_PAGE_SIZE = 1000
+
 @app.get("/api/all_tokens")
-def get_all_tokens_api():
+async def get_all_tokens_api(
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    network: Optional[str] = None,
+    creator: Optional[str] = None,
+    symbol_prefix: Optional[str] = None,
+    format: str = "json",
+):
+    """
+    Token catalog in insertion order. Pages are keyed by an opaque `cursor`
+    (pass back `next_cursor`). format=ndjson streams every matching record,
+    one JSON object per line, without building the response in memory.
+    """
+    filters = {"network": network, "creator": creator, "symbol_prefix": symbol_prefix}
+    if format == "ndjson":
+        lines = (json.dumps(token) + "\n" for token in iter_tokens(**filters))
+        return StreamingResponse(lines, media_type="application/x-ndjson")
     try:
-        tokens = get_all_tokens()
-        return {"tokens": tokens}
+        after_id = int(cursor) if cursor else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    try:
+        tokens, last_id = await _run_db(lambda: list_tokens(after_id, limit, **filters))
+        return {"tokens": tokens, "next_cursor": str(last_id) if last_id is not None else None}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/tokens/{package_id}/holders")
+async def api_token_holders(package_id: str, limit: int = 100, offset: int = 0):
+    """
+    Holders of a token by descending balance, from the holder index. complete is
+    false when holders from before indexed_since may be missing.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    holders, total = await _run_db(get_token_holders, normalize_address(package_id), limit, max(0, offset))
+    coverage = await _run_db(get_holder_coverage, normalize_address(package_id))
+    return {"package_id": package_id, "holder_count": total, **coverage, "holders": holders}
+
+@app.get("/api/portfolio/{address}")
+async def api_portfolio(address: str):
+    """Indexed token balances of an address, with the token's name, symbol and decimals."""
+    balances = await _run_db(get_portfolio, address)
+    for entry in balances:
+        token = get_token(entry["package_id"]) or {}
+        entry.update({key: token.get(key) for key in ("name", "symbol", "decimals", "network")})
+    return {"address": address, "tokens": balances}
+
+@app.get("/api/holders/status")
+async def api_holder_index_status():
+    return {"networks": holder_index_status(), "owner_tracking": owner_tracker_status()}
+
 @app.get("/api/transactions/by_object/{object_id}")
-def api_transactions_by_object(object_id: str):
+async def api_transactions_by_object(object_id: str):
     try:
-        txns = get_transactions_by_object(object_id)
+        txns = await get_transactions_by_object(object_id)
         return {"transactions": txns}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/transactions/by_address/{address}")
-def api_transactions_by_address(address: str):
+async def api_transactions_by_address(address: str):
     try:
-        txns = get_transactions_by_address(address)
+        txns = await get_transactions_by_address(address)
         return {"transactions": txns}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/transactions/details/{tx_digest}")
-def api_transaction_details(tx_digest: str):
+async def api_transaction_details(tx_digest: str):
     try:
-        details = get_transaction_details(tx_digest)
+        details = await get_transaction_details(tx_digest)
         return {"transaction": details}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/listener/health")
+async def api_listener_health():
+    return {"subscriptions": listener_health()}
+
+@app.get("/api/cache/stats")
+async def api_cache_stats():
+    return {**cache_stats(), "move_build": build_cache_stats(), "gas_estimates": gas_estimate_stats()}
+
+@app.get("/api/gas_pool")
+async def api_gas_pool():
+    return gas_pool_stats() or {"available": False}
+
+@app.get("/metrics")
+async def metrics():
+    jobs_by_state = await _run_db(count_deploy_jobs_by_state)
+    for state in DEPLOY_JOB_STATES:
+        DEPLOY_QUEUE_DEPTH.set(jobs_by_state.get(state, 0), state=state)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/api/deploy_jobs")
+async def api_deploy_jobs():
+    try:
+        return {"jobs_by_state": await _run_db(count_deploy_jobs_by_state)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/deploy_jobs/{job_id}")
+async def api_deploy_job(job_id: int):
+    job = await _run_db(get_deploy_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Deploy job not found")
+    return {"job": job}
+
 @app.post("/delete_token")
-def delete_token(params: TokenUpdateParams):
+async def delete_token(params: TokenUpdateParams):
     try:
-        delete_token_record(params.package_id)
+        await _run_db(delete_token_record, params.package_id)
         return {"status": "success"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/update_token_owner")
-def update_token_owner_api(params: TokenUpdateParams):
+async def update_token_owner_api(params: TokenUpdateParams):
     try:
         if not params.new_owner:
             raise HTTPException(status_code=400, detail="new_owner is required")
-        update_token_owner(params.package_id, params.new_owner)
+        await _run_db(update_token_owner, params.package_id, params.new_owner)
         return {"status": "success"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/my_owned_tokens")
-def my_owned_tokens(params: OwnerTokensParams):
+async def my_owned_tokens(params: OwnerTokensParams):
     try:
         tokens = get_tokens_by_owner(params.owner_address)
         return {"tokens": tokens}
@@ -0,0 +1,92 @@
+"""
+Backfill throughput against the stub fullnode.
+
+Publishes N TokenCreationEvents on the stub, a third of them with a recorded token
+and half with a publish transaction from the backend's publisher, then runs the
+backfill (scripts/backfill.py) with --recover-packages over a scratch database and
+checks the reconciliation counts. --latency adds per-request RPC latency, which the
+page prefetch overlaps with the database writes.
+
+    python benchmarks/bench_backfill.py --events 5000 --latency 0.02
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmarks.common import emit
+from benchmarks.stub_fullnode import StubFullnode, make_token_creation_event
+
+FACTORY = "0x" + "11" * 32
+PUBLISHER = "0x" + "99" * 32
+
+
+def _creator(i):
+    return "0x" + format(i % 97 + 1, "064x")
+
+
+def bench_backfill(events, latency, db_file):
+    os.environ["TOKENS_DB_FILE"] = db_file
+    import scripts.event_listener as event_listener
+    from database import add_token_records
+    from scripts.backfill import backfill
+
+    stub = StubFullnode(latency=latency).start()
+    event_listener.NETWORK_CONFIGS.clear()
+    event_listener.NETWORK_CONFIGS["testnet"] = {"url": stub.url, "package_id": FACTORY}
+    stub.add_events([make_token_creation_event(FACTORY, i, creator=_creator(i)) for i in range(events)])
+    existing = range(0, events, 3)
+    add_token_records([
+        {"package_id": f"0x{i:064x}", "creator": _creator(i), "symbol": f"TK{i}", "name": f"Token {i}", "network": "testnet"}
+        for i in existing
+    ])
+    published = [i for i in range(events) if i % 2 == 0 and i % 3]
+    for i in published:
+        package_id, cap, metadata = (f"0x{i + offset:064x}" for offset in (10 ** 8, 2 * 10 ** 8, 3 * 10 ** 8))
+        stub.transactions[f"publish{i}"] = {
+            "digest": f"publish{i}", "timestampMs": str(i), "transaction": {"data": {"sender": PUBLISHER}},
+            "objectChanges": [
+                {"type": "published", "packageId": package_id, "modules": [f"tk{i}"]},
+                {"type": "created", "objectId": cap, "objectType": f"0x2::coin::TreasuryCap<{package_id}::tk{i}::TK{i}>",
+                 "owner": {"AddressOwner": _creator(i)}},
+                {"type": "created", "objectId": metadata, "objectType": f"0x2::coin::CoinMetadata<{package_id}::tk{i}::TK{i}>",
+                 "owner": "Immutable"},
+            ],
+        }
+        stub.objects[metadata] = {"objectId": metadata, "content": {"fields": {"name": f"Token {i}", "symbol": f"TK{i}"}}}
+
+    args = SimpleNamespace(network=None, from_checkpoint=None, reset=True, recover_packages=True, publisher=PUBLISHER,
+                           deploy_missing=False, concurrency=2)
+    start = time.perf_counter()
+    stats = asyncio.run(backfill(args))["testnet"]
+    elapsed = time.perf_counter() - start
+    stub.stop()
+    expected = {"existing": len(existing), "recovered": len(published),
+                "missing": events - len(existing) - len(published)}
+    return {
+        "events": events,
+        "rpc_latency_s": latency,
+        "seconds": elapsed,
+        "events_per_s": events / elapsed if elapsed else None,
+        "stats": stats,
+        "reconciled_as_expected": all(stats.get(k) == v for k, v in expected.items()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the TokenCreationEvent backfill.")
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub RPC latency per request (seconds)")
+    parser.add_argument("--output", help="Write the JSON result to this file as well as stdout")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        result = bench_backfill(args.events, args.latency, os.path.join(tmp, "bench_tokens.db"))
+    emit(result, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Bulk mint throughput: one `sui client call` per recipient vs. PTB batches.
+
+Runs against benchmarks/fake_sui.py, whose per-transaction delay (FAKE_SUI_CALL_DELAY)
+models the round-trip and whose FAKE_SUI_PTB_COMMAND_DELAY models the extra cost of
+each command inside a PTB. Sequential calls are timed on a sample of recipients.
+
+    python benchmarks/bench_batch.py --recipients 2000 --treasury-caps 2
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmarks.common import FAKE_SUI, emit
+
+PACKAGE_ID = "0x" + "11" * 32
+SENDER = "0x" + "44" * 32
+
+
+def _recipients(count):
+    return [("0x" + format(i + 1, "064x"), 1000 + i) for i in range(count)]
+
+
+def bench_sequential(sample):
+    from scripts.sui_utils import mint_token
+    start = time.perf_counter()
+    for address, amount in _recipients(sample):
+        mint_token(SimpleNamespace(package_id=PACKAGE_ID, module_name="bench", treasury_cap_id="0x" + "22" * 32,
+                                   amount=amount, recipient=address, sender_address=SENDER))
+    elapsed = time.perf_counter() - start
+    return {"recipients": sample, "seconds": elapsed, "recipients_per_s": sample / elapsed}
+
+
+def bench_batched(recipients, treasury_caps, chunk_size, workers):
+    from scripts.ptb_batch import build_mint_ptb, run_batch
+    executor = ThreadPoolExecutor(max_workers=workers)
+
+    async def run_blocking(fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+    async def run():
+        # One airdrop per TreasuryCap, split evenly, all submitted at once
+        everyone = _recipients(recipients)
+        share = -(-recipients // treasury_caps)
+        batches = []
+        for i in range(treasury_caps):
+            cap = "0x" + format(0x2200 + i, "064x")
+            batches.append(run_batch(
+                cap, everyone[i * share:(i + 1) * share],
+                lambda chunk, cap=cap: build_mint_ptb(PACKAGE_ID, "bench", cap, chunk, SENDER),
+                run_blocking, chunk_size,
+            ))
+        return [r for results in await asyncio.gather(*batches) for r in results]
+
+    start = time.perf_counter()
+    results = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    executor.shutdown()
+    return {
+        "recipients": recipients,
+        "treasury_caps": treasury_caps,
+        "chunk_size": chunk_size,
+        "transactions": len({r["tx_digest"] for r in results}),
+        "succeeded": sum(1 for r in results if r["status"] == "success"),
+        "seconds": elapsed,
+        "recipients_per_s": recipients / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk mint: per-recipient calls vs. PTB batches.")
+    parser.add_argument("--recipients", type=int, default=2000)
+    parser.add_argument("--treasury-caps", type=int, default=2, help="Concurrent airdrops (distinct TreasuryCaps)")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--sequential-sample", type=int, default=20)
+    parser.add_argument("--call-delay", type=float, default=None, help="fake sui time per transaction (seconds)")
+    parser.add_argument("--output", help="Write the JSON result to this file as well as stdout")
+    args = parser.parse_args()
+    os.environ.setdefault("SUI_CLI_PATH", FAKE_SUI)
+    if args.call_delay is not None:
+        os.environ["FAKE_SUI_CALL_DELAY"] = str(args.call_delay)
+
+    from config import CHAIN_WRITE_WORKERS
+    sequential = bench_sequential(args.sequential_sample)
+    batched = bench_batched(args.recipients, args.treasury_caps, args.chunk_size, CHAIN_WRITE_WORKERS)
+    emit({
+        "call_delay_s": float(os.environ.get("FAKE_SUI_CALL_DELAY", 0.5)),
+        "sequential": sequential,
+        "batched": batched,
+        "speedup": batched["recipients_per_s"] / sequential["recipients_per_s"],
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
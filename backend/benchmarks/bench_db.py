@@ -0,0 +1,119 @@
+"""
+Database benchmark at a given table size.
+
+Seeds a scratch SQLite database with N token records (bulk inserts), then times the
+operations the API and listener issue: index load, point lookups, creator/owner
+lookups, keyset pages with filters, single inserts, owner updates and duplicate
+reservations. One size per process, because the record index is process-wide.
+
+    python benchmarks/bench_db.py --size 100000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmarks.common import emit, time_ops
+
+SEED_BATCH = 10000
+SAMPLE_OPS = 2000
+
+
+def make_token(i, creators):
+    creator = creators[i % len(creators)]
+    return {
+        "package_id": f"0x{i:064x}",
+        "creator": creator,
+        "owner": creator,
+        "network": "testnet" if i % 4 else "mainnet",
+        "name": f"Bench Token {i}",
+        "symbol": f"B{i % 5000}",
+        "decimals": 9,
+        "description": "seeded by bench_db.py",
+        "metadata_uri": "https://example.com/icon.png",
+        "initial_supply": "1000000000",
+        "treasury_cap_id": f"0x{i + 10 ** 12:064x}",
+    }
+
+
+def bench_db(size, db_file, seed=1):
+    os.environ["TOKENS_DB_FILE"] = db_file
+    import database  # connects to TOKENS_DB_FILE on import
+
+    rng = random.Random(seed)
+    creators = ["0x" + format(rng.getrandbits(256), "064x") for _ in range(max(1, size // 100))]
+    result = {"size": size}
+
+    start = time.perf_counter()
+    for offset in range(0, size, SEED_BATCH):
+        database.add_token_records([make_token(i, creators) for i in range(offset, min(size, offset + SEED_BATCH))])
+    seed_seconds = time.perf_counter() - start
+    result["bulk_insert"] = {"seconds": seed_seconds, "records_per_s": size / seed_seconds if seed_seconds else None}
+
+    # Startup cost: rebuild the resident index from the table
+    with database._index_lock:
+        for index in (database._records, database._by_creator, database._by_owner, database._row_by_package):
+            index.clear()
+    start = time.perf_counter()
+    database._load_index(database._connect())
+    result["index_load_seconds"] = time.perf_counter() - start
+
+    package_ids = [(f"0x{rng.randrange(size):064x}",) for _ in range(SAMPLE_OPS)]
+    some_creators = [(rng.choice(creators),) for _ in range(SAMPLE_OPS)]
+    result["get_token"] = time_ops(database.get_token, package_ids)
+    result["get_tokens_by_deployer"] = time_ops(database.get_tokens_by_deployer, some_creators)
+    result["get_tokens_by_owner"] = time_ops(database.get_tokens_by_owner, some_creators)
+
+    after_ids = [(rng.randrange(size),) for _ in range(SAMPLE_OPS // 4)]
+    result["list_tokens_page"] = time_ops(lambda after: database.list_tokens(after_id=after, limit=100), after_ids)
+    result["list_tokens_by_network"] = time_ops(
+        lambda after: database.list_tokens(after_id=after, limit=100, network="mainnet"), after_ids
+    )
+    result["list_tokens_by_creator"] = time_ops(
+        lambda creator: database.list_tokens(limit=100, creator=creator), some_creators[:SAMPLE_OPS // 4]
+    )
+    result["list_tokens_by_symbol_prefix"] = time_ops(
+        lambda prefix: database.list_tokens(limit=100, symbol_prefix=prefix),
+        [(f"B{rng.randrange(500)}",) for _ in range(SAMPLE_OPS // 4)],
+    )
+    # Selective prefix: B1000..B4999 match only size / 5000 records each
+    result["list_tokens_by_rare_symbol_prefix"] = time_ops(
+        lambda prefix: database.list_tokens(limit=100, symbol_prefix=prefix),
+        [(f"B{rng.randrange(1000, 5000)}",) for _ in range(SAMPLE_OPS // 4)],
+    )
+
+    start = time.perf_counter()
+    scanned = sum(1 for _ in database.iter_tokens(batch_size=1000))
+    scan_seconds = time.perf_counter() - start
+    result["full_scan"] = {"records": scanned, "records_per_s": scanned / scan_seconds if scan_seconds else None}
+
+    result["add_token_record"] = time_ops(
+        database.add_token_record, [(make_token(size + i, creators),) for i in range(SAMPLE_OPS // 4)]
+    )
+    result["update_token_owner"] = time_ops(
+        database.update_token_owner, [(pid, rng.choice(creators)) for (pid,) in package_ids[:SAMPLE_OPS // 4]]
+    )
+    result["reserve_token_event"] = time_ops(
+        database.reserve_token_event,
+        [("testnet", rng.choice(creators), f"R{i}", f"Reserved {i}", (f"benchtx{i}", "0")) for i in range(SAMPLE_OPS // 4)],
+    )
+    result["db_file_mb"] = os.path.getsize(db_file) / 1024 ** 2
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark database operations at one table size.")
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--db-file", help="Scratch database path (default: a new temporary file)")
+    parser.add_argument("--output", help="Write the JSON result to this file as well as stdout")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = args.db_file or os.path.join(tmp, "bench_tokens.db")
+        emit(bench_db(args.size, db_file), args.output)
+
+
+if __name__ == "__main__":
+    main()
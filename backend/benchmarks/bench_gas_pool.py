@@ -0,0 +1,83 @@
+"""
+Chain write throughput against gas pool size.
+
+Runs concurrent mint_token calls with benchmarks/fake_sui.py as the sui CLI and
+FAKE_SUI_GAS_LOCK set, so transactions paying with the same gas coin are serialized
+the way a fullnode serializes them on one owned object. Pool size 0 disables the
+pool: every call uses the CLI's default coin. The signer's coins are served by the
+stub fullnode (suix_getCoins).
+
+    python benchmarks/bench_gas_pool.py --mints 64 --workers 8 --sizes 0,1,2,4,8
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmarks.common import FAKE_SUI, emit, summarize
+
+SIGNER = "0x" + "ab" * 32
+PACKAGE_ID = "0x" + "11" * 32
+
+
+def bench_pool(size, mints, workers, stub):
+    import scripts.gas_pool as gas_pool
+    from scripts.sui_utils import mint_token
+
+    gas_pool.GAS_POOL_ENABLED = size > 0
+    gas_pool._pool = None
+    if size:
+        stub.objects.clear()
+        stub.add_gas_coins(SIGNER, size, 10 ** 10)
+        gas_pool._pool = gas_pool.GasPool(SIGNER, size=size, rpc_url=stub.url).start()
+
+    def mint(i):
+        started = time.perf_counter()
+        mint_token(SimpleNamespace(package_id=PACKAGE_ID, module_name="bench", treasury_cap_id="0x" + "22" * 32,
+                                   amount=1000 + i, recipient="0x" + format(i + 1, "064x"), sender_address=SIGNER))
+        return (time.perf_counter() - started) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        latencies = list(pool.map(mint, range(mints)))
+    elapsed = time.perf_counter() - start
+    return {
+        "pool_size": size,
+        "mints": mints,
+        "seconds": elapsed,
+        "mints_per_s": mints / elapsed,
+        "mint_latency": summarize(latencies),
+        "pool": gas_pool.gas_pool_stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chain write throughput against gas pool size.")
+    parser.add_argument("--mints", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--sizes", default="0,1,2,4,8", help="Comma-separated pool sizes (0 = no pool)")
+    parser.add_argument("--call-delay", type=float, default=0.5, help="fake sui client call time (seconds)")
+    parser.add_argument("--output", help="Write the JSON result to this file as well as stdout")
+    args = parser.parse_args()
+    os.environ.setdefault("SUI_CLI_PATH", FAKE_SUI)
+    os.environ["FAKE_SUI_GAS_LOCK"] = "1"
+    os.environ["FAKE_SUI_ADDRESS"] = SIGNER
+    os.environ["FAKE_SUI_CALL_DELAY"] = str(args.call_delay)
+
+    from benchmarks.stub_fullnode import StubFullnode
+    stub = StubFullnode().start()
+    try:
+        runs = {size: bench_pool(int(size), args.mints, args.workers, stub) for size in args.sizes.split(",") if size}
+    finally:
+        stub.stop()
+    base = runs.get("0", {}).get("mints_per_s")
+    for run in runs.values():
+        run["speedup"] = run["mints_per_s"] / base if base else None
+    emit({"workers": args.workers, "call_delay_s": args.call_delay, "by_pool_size": runs}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Holder indexer and owner tracking throughput, and holder / portfolio / owner lookups.
+
+Seeds a scratch database with N tokens whose creators hold the initial supply and
+the TreasuryCap on the stub fullnode, then appends checkpoints of random transfers
+between holders (plus unrelated SUI gas changes), with every tenth transaction also
+transferring a TreasuryCap. HolderIndexer rounds are timed until the last
+checkpoint. Afterwards every indexed balance and token owner is compared with the
+stub, and the lookups behind /api/tokens/{package_id}/holders, /api/portfolio/{address}
+and /my_owned_tokens are timed.
+
+    python benchmarks/bench_holders.py --tokens 200 --checkpoints 200 --txs-per-checkpoint 50
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmarks.common import emit, time_ops
+from benchmarks.stub_fullnode import StubFullnode
+
+NETWORK = "testnet"
+SUPPLY = 10 ** 15
+
+
+def _address(i):
+    return "0x" + format(i + 1, "064x")
+
+
+def _coin_type(package_id):
+    return f"{package_id}::token::TOKEN"
+
+
+def bench_holders(tokens, checkpoints, txs_per_checkpoint, holders, db_file, seed=7):
+    os.environ["TOKENS_DB_FILE"] = db_file
+    from database import add_token_records, get_holder_coverage, get_portfolio, get_token, get_token_holders, get_tokens_by_owner
+    from scripts.holder_indexer import HolderIndexer
+    rng = random.Random(seed)
+
+    stub = StubFullnode().start()
+    packages = ["0x" + format(10 ** 6 + i, "064x") for i in range(tokens)]
+    caps = {p: "0x" + format(2 * 10 ** 6 + i, "064x") for i, p in enumerate(packages)}
+    add_token_records([
+        {"package_id": p, "creator": _address(i % holders), "network": NETWORK, "name": f"Holder {i}", "symbol": f"H{i}",
+         "decimals": 9, "treasury_cap_id": caps[p]}
+        for i, p in enumerate(packages)
+    ])
+    for i, p in enumerate(packages):
+        stub.objects[p] = {"objectId": p, "previousTransaction": f"publish-{i}"}
+        stub.objects[caps[p]] = {"objectId": caps[p], "type": f"0x2::coin::TreasuryCap<{_coin_type(p)}>",
+                                 "owner": {"AddressOwner": _address(i % holders)}}
+    # Checkpoint 0: every package is published and its creator receives the initial supply
+    stub.add_checkpoint([
+        {"digest": f"publish-{i}", "balanceChanges": [
+            {"owner": {"AddressOwner": _address(i % holders)}, "coinType": _coin_type(p), "amount": str(SUPPLY)}
+        ]}
+        for i, p in enumerate(packages)
+    ])
+    # (holder, coin type) pairs with enough balance to send from
+    held = sorted({(_address(i % holders), _coin_type(p)) for i, p in enumerate(packages)})
+    for c in range(checkpoints):
+        txs = []
+        for t in range(txs_per_checkpoint):
+            sender, coin_type = rng.choice(held)
+            recipient = _address(rng.randrange(holders))
+            amount = rng.randint(1, stub.balances[(sender, coin_type)] // 4)
+            gas = {"owner": {"AddressOwner": sender}, "coinType": "0x2::sui::SUI", "amount": "-2500000"}
+            tx = {"digest": f"tx-{c}-{t}", "balanceChanges": [
+                gas,
+                {"owner": {"AddressOwner": sender}, "coinType": coin_type, "amount": str(-amount)},
+                {"owner": {"AddressOwner": recipient}, "coinType": coin_type, "amount": str(amount)},
+            ], "objectChanges": []}
+            if t % 10 == 0:
+                cap = caps[coin_type.split("::")[0]]
+                stub.objects[cap]["owner"] = {"AddressOwner": recipient}
+                tx["objectChanges"].append({"type": "transferred", "objectId": cap, "recipient": {"AddressOwner": recipient}})
+            txs.append(tx)
+        stub.add_checkpoint(txs)
+        held = sorted(k for k, balance in stub.balances.items() if balance >= 4 and k[1] != "0x2::sui::SUI")
+
+    indexer = HolderIndexer(NETWORK, stub.url)
+    indexer.checkpoint = -1  # index from the publish checkpoint, so every package is complete
+    start = time.perf_counter()
+    indexer.run_round()
+    seed_seconds = time.perf_counter() - start
+    while indexer.checkpoint < len(stub.checkpoints) - 1:
+        indexer.run_round()
+    elapsed = time.perf_counter() - start
+    calls = dict(stub.call_counts)
+    stub.stop()
+
+    mismatches = 0
+    for (owner, coin_type), balance in stub.balances.items():
+        if coin_type == "0x2::sui::SUI":
+            continue
+        package_id = coin_type.split("::")[0]
+        indexed = {e["package_id"]: int(e["balance"]) for e in get_portfolio(owner)}
+        mismatches += indexed.get(package_id, 0) != balance
+    owner_mismatches = sum(
+        get_token(p)["owner"] != stub.objects[caps[p]]["owner"]["AddressOwner"] for p in packages
+    )
+    sample = [(rng.choice(packages), 100, 0) for _ in range(2000)]
+    return {
+        "tokens": tokens,
+        "checkpoints": checkpoints,
+        "transactions": checkpoints * txs_per_checkpoint,
+        "seed_seconds": seed_seconds,
+        "seconds": elapsed,
+        "checkpoints_per_s": checkpoints / elapsed if elapsed else None,
+        "transactions_per_s": checkpoints * txs_per_checkpoint / elapsed if elapsed else None,
+        "rpc_calls": calls,
+        "balance_mismatches": mismatches,
+        "owner_mismatches": owner_mismatches,
+        "complete_packages": sum(get_holder_coverage(p)["complete"] for p in packages),
+        "holders_query": time_ops(get_token_holders, sample),
+        "portfolio_query": time_ops(get_portfolio, [(_address(rng.randrange(holders)),) for _ in range(2000)]),
+        "owned_tokens_query": time_ops(get_tokens_by_owner, [(_address(rng.randrange(holders)),) for _ in range(2000)]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the holder indexer and holder queries.")
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--checkpoints", type=int, default=200)
+    parser.add_argument("--txs-per-checkpoint", type=int, default=50)
+    parser.add_argument("--holders", type=int, default=2000, help="Distinct addresses transfers go between")
+    parser.add_argument("--output", help="Write the JSON result to this file as well as stdout")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        result = bench_holders(args.tokens, args.checkpoints, args.txs_per_checkpoint, args.holders,
+                               os.path.join(tmp, "bench_tokens.db"))
+    emit(result, args.output)
+
+
+if __name__ == "__main__":
+    main()
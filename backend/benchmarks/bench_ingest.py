@@ -0,0 +1,74 @@
+"""
+Event ingestion throughput against the stub fullnode.
+
+Starts a ListenerSupervisor on a stub fullnode, then publishes N TokenCreationEvents
+at once and times how long the listener takes to page through them, reserve each
+one and enqueue its deploy job (deploy workers are not started). Polling runs with
+short intervals so the result reflects per-page cost rather than sleep time.
+
+    python benchmarks/bench_ingest.py --events 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmarks.common import emit
+from benchmarks.stub_fullnode import StubFullnode, make_token_creation_event
+
+PACKAGE_ID = "0x" + "11" * 32
+
+
+def bench_ingest(events, db_file, page_size=50, latency=0.0, timeout=600):
+    os.environ["TOKENS_DB_FILE"] = db_file
+    import scripts.event_listener as event_listener
+
+    # Keep the supervisor polling instead of backing off while the stub is idle
+    event_listener.EVENT_PAGE_SIZE = page_size
+    event_listener.LISTENER_MIN_POLL_INTERVAL = 0.01
+    event_listener.LISTENER_BASE_POLL_INTERVAL = 0.01
+    event_listener.LISTENER_MAX_POLL_INTERVAL = 0.05
+
+    stub = StubFullnode(latency=latency).start()
+    supervisor = event_listener.ListenerSupervisor(resume=False, streaming=False)
+    sub = supervisor.add("testnet", stub.url, PACKAGE_ID, event_listener.MODULE_NAME,
+                         event_listener.EVENT_STRUCT, event_listener.handle_token_creation_event)
+    supervisor.start()
+    while sub.last_poll_at is None:
+        time.sleep(0.01)
+
+    stub.add_events([make_token_creation_event(PACKAGE_ID, i) for i in range(events)])
+    queries_before = stub.call_counts.get("suix_queryEvents", 0)
+    start = time.perf_counter()
+    deadline = start + timeout
+    while sub.events_processed < events and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    elapsed = time.perf_counter() - start
+    stub.stop()
+    return {
+        "events": events,
+        "processed": sub.events_processed,
+        "page_size": page_size,
+        "rpc_latency_s": latency,
+        "seconds": elapsed,
+        "events_per_s": sub.events_processed / elapsed if elapsed else None,
+        "query_events_calls": stub.call_counts.get("suix_queryEvents", 0) - queries_before,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TokenCreationEvent ingestion throughput.")
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0, help="Added stub latency per RPC request (seconds)")
+    parser.add_argument("--output", help="Write the JSON result to this file as well as stdout")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        result = bench_ingest(args.events, os.path.join(tmp, "bench_tokens.db"), args.page_size, args.latency)
+    emit(result, args.output)
+
+
+if __name__ == "__main__":
+    main()
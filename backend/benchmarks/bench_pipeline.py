@@ -0,0 +1,102 @@
+"""
+Template render and deploy pipeline throughput.
+
+Render: the precompiled Move template engine vs. chained str.replace (bench_render).
+Deploy: enqueues N deploy jobs and runs them through the deploy worker pool with
+benchmarks/fake_sui.py as the sui CLI, timing generate -> build -> publish -> record
+end to end. Only `distinct` different token specs are used, so with distinct < jobs
+the build cache is exercised as well.
+
+    python benchmarks/bench_pipeline.py --jobs 40 --workers 4 --build-delay 0.5 --publish-delay 1
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmarks.common import FAKE_SUI, emit, summarize
+
+CREATOR = "0x" + "ab" * 32
+
+
+def bench_deploy(jobs, workers, distinct, workdir, timeout=1800):
+    os.environ["TOKENS_DB_FILE"] = os.path.join(workdir, "bench_tokens.db")
+    os.environ.setdefault("SUI_CLI_PATH", FAKE_SUI)
+    import scripts.build_cache as build_cache
+    import scripts.move_package_utils as move_package_utils
+    from database import count_deploy_jobs_by_state, get_deploy_job
+    from scripts.deploy_queue import enqueue_deployment, start_deploy_workers
+
+    # Scratch caches so earlier runs cannot produce build-cache hits
+    build_cache.BUILD_CACHE_DIR = os.path.join(workdir, "build_cache")
+    move_package_utils.PACKAGE_WORKSPACE_DIR = os.path.join(workdir, "packages")
+
+    start = time.perf_counter()
+    job_ids = [
+        enqueue_deployment("testnet", {
+            "creator": CREATOR,
+            "name": f"Pipeline Token {i % distinct}",
+            "symbol": f"PIPE{i % distinct}",
+            "decimals": 9,
+            "description": "bench_pipeline.py",
+            "metadata_uri": "https://example.com/icon.png",
+            "initial_supply": "1000000000",
+        })
+        for i in range(jobs)
+    ]
+    start_deploy_workers(workers)
+    deadline = start + timeout
+    while time.perf_counter() < deadline:
+        states = count_deploy_jobs_by_state()
+        if states.get("done", 0) + states.get("failed", 0) >= jobs:
+            break
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - start
+
+    latencies = []
+    for job_id in job_ids:
+        job = get_deploy_job(job_id)
+        if job and job["state"] == "done":
+            latencies.append((job["updated_at"] - job["created_at"]) * 1000)
+    return {
+        "jobs": jobs,
+        "distinct_packages": distinct,
+        "workers": workers,
+        "sui_delays_s": {
+            "build": float(os.environ.get("FAKE_SUI_BUILD_DELAY", 0.5)),
+            "publish": float(os.environ.get("FAKE_SUI_PUBLISH_DELAY", 1.0)),
+        },
+        "states": count_deploy_jobs_by_state(),
+        "seconds": elapsed,
+        "jobs_per_s": len(latencies) / elapsed if elapsed else None,
+        "job_latency": summarize(latencies),
+        "build_cache": build_cache.build_cache_stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark template rendering and the deploy pipeline.")
+    parser.add_argument("--render-count", type=int, default=10000)
+    parser.add_argument("--jobs", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--distinct", type=int, default=0, help="Distinct token specs (default: one per job)")
+    parser.add_argument("--build-delay", type=float, default=None, help="fake sui move build time (seconds)")
+    parser.add_argument("--publish-delay", type=float, default=None, help="fake sui client publish time (seconds)")
+    parser.add_argument("--output", help="Write the JSON result to this file as well as stdout")
+    args = parser.parse_args()
+    if args.build_delay is not None:
+        os.environ["FAKE_SUI_BUILD_DELAY"] = str(args.build_delay)
+    if args.publish_delay is not None:
+        os.environ["FAKE_SUI_PUBLISH_DELAY"] = str(args.publish_delay)
+
+    from benchmarks.bench_render import bench_render
+    result = {"render": bench_render(args.render_count)}
+    with tempfile.TemporaryDirectory() as tmp:
+        result["deploy"] = bench_deploy(args.jobs, args.workers, args.distinct or args.jobs, tmp)
+    emit(result, args.output)
+
+
+if __name__ == "__main__":
+    main()
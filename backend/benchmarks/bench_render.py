@@ -0,0 +1,82 @@
+"""
+Micro-benchmark for Move template rendering.
+
+Compares the precompiled engine (scripts/move_template.py) with the previous
+approach of reading the template from disk and chaining str.replace calls, and
+reports renders per second as JSON.
+
+    python benchmarks/bench_render.py --count 10000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from scripts.move_template import TOKEN_TEMPLATE_PATH, load_template, token_template_context
+
+
+def make_params(i):
+    return {
+        "package_name": "token_contract",
+        "module_name": f"TK{i}",
+        "name": f"Benchmark Token {i}",
+        "symbol": f"TK{i}",
+        "description": "Rendered by bench_render.py",
+        "icon_url": "https://example.com/icon.png",
+        "decimals": 9,
+        "initial_supply": "1000000000",
+        "deployer_address": "0x" + "ab" * 32,
+    }
+
+
+def render_chained_replace(params):
+    with open(TOKEN_TEMPLATE_PATH, "r") as f:
+        template = f.read()
+    return (
+        template
+        .replace("{{package_name}}", params["package_name"])
+        .replace("{{token_name}}", params["module_name"].lower())
+        .replace("{{token_name_upper}}", params["module_name"].upper())
+        .replace("{{name}}", params["name"])
+        .replace("{{symbol}}", params["symbol"])
+        .replace("{{description}}", params["description"])
+        .replace("{{icon_url}}", params["icon_url"])
+        .replace("{{decimals}}", str(params["decimals"]))
+        .replace("{{initial_supply}}", str(params["initial_supply"]))
+        .replace("{{deployer_address}}", params["deployer_address"])
+    )
+
+
+def bench_render(count):
+    params = [make_params(i) for i in range(count)]
+
+    start = time.perf_counter()
+    for p in params:
+        render_chained_replace(p)
+    chained = time.perf_counter() - start
+
+    start = time.perf_counter()
+    template = load_template()
+    for _ in template.render_many(token_template_context(**p) for p in params):
+        pass
+    engine = time.perf_counter() - start
+
+    return {
+        "count": count,
+        "chained_replace_per_s": count / chained,
+        "engine_per_s": count / engine,
+        "speedup": chained / engine,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Move template rendering throughput.")
+    parser.add_argument("--count", type=int, default=10000)
+    args = parser.parse_args()
+    print(json.dumps(bench_render(args.count), indent=2))
+
+
+if __name__ == "__main__":
+    main()
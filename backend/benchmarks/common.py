@@ -0,0 +1,67 @@
+"""Shared helpers for the benchmark scripts: percentiles, timing, output and environment info."""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+FAKE_SUI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_sui.py")
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Latency summary of samples given in milliseconds."""
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 50),
+        "p90_ms": percentile(samples, 90),
+        "p99_ms": percentile(samples, 99),
+        "max_ms": max(samples) if samples else None,
+    }
+
+
+def time_ops(fn, args_list):
+    """Call fn(*args) for each args tuple; returns throughput and latency summary."""
+    samples = []
+    start = time.perf_counter()
+    for args in args_list:
+        op_start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - op_start) * 1000)
+    elapsed = time.perf_counter() - start
+    return {"ops_per_s": len(samples) / elapsed if elapsed else None, **summarize(samples)}
+
+
+def environment():
+    """Where a result came from, so runs can be compared across versions."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "git_commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.time(),
+    }
+
+
+def emit(result, output=None):
+    """Print a result as JSON and optionally write it to output."""
+    text = json.dumps(result, indent=2)
+    print(text)
+    if output:
+        with open(output, "w") as f:
+            f.write(text)
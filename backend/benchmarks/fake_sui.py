@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the `sui` CLI, for benchmarks and local runs without a Sui client.
+
+Implements the subcommands the backend shells out to and answers with JSON shaped
+like the real CLI's --json output. Each command sleeps for a configurable time so
+runs can model a real build/publish; set the delays (seconds) with environment
+variables:
+
+    FAKE_SUI_BUILD_DELAY    sui move build            (default 0.5)
+    FAKE_SUI_PUBLISH_DELAY  sui client publish        (default 1.0)
+    FAKE_SUI_CALL_DELAY     sui client call / ptb     (default 0.5)
+    FAKE_SUI_PTB_COMMAND_DELAY  extra per PTB command (default 0.0005)
+    FAKE_SUI_QUERY_DELAY    read-only client commands (default 0.1)
+    FAKE_SUI_DRY_RUN_DELAY  publish / call / ptb with --dry-run (default 0.2)
+    FAKE_SUI_FAIL_RATE      fraction of build/publish/call runs that fail (default 0)
+    FAKE_SUI_ADDRESS        address printed by `client active-address`
+    FAKE_SUI_GAS_LOCK       if set, publish/call/ptb runs paying with the same gas coin
+                            (--gas / --gas-coin, or the CLI default coin when neither is
+                            given) are serialized, as a real fullnode serializes
+                            transactions on one owned object
+
+Point the backend at it with SUI_CLI_PATH=backend/benchmarks/fake_sui.py.
+"""
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+
+def _delay(name, default):
+    time.sleep(float(os.environ.get(name, default)))
+
+
+def _maybe_fail(what):
+    if random.random() < float(os.environ.get("FAKE_SUI_FAIL_RATE", 0)):
+        sys.stderr.write(f"fake sui: simulated {what} failure\n")
+        sys.exit(1)
+
+
+@contextmanager
+def _gas_coin_lock(args):
+    if not os.environ.get("FAKE_SUI_GAS_LOCK"):
+        yield
+        return
+    import fcntl
+    coin = "default"
+    for flag in ("--gas", "--gas-coin"):
+        if flag in args:
+            coin = args[args.index(flag) + 1].lstrip("@")
+    path = os.path.join(tempfile.gettempdir(), f"fake_sui_gas_{hashlib.sha1(coin.encode()).hexdigest()[:16]}.lock")
+    with open(path, "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def _object_id(*parts):
+    return "0x" + hashlib.sha256("/".join(parts).encode() + os.urandom(8)).hexdigest()
+
+
+def _digest():
+    return hashlib.sha256(os.urandom(16)).hexdigest()[:44]
+
+
+def _package_dir(args):
+    paths = [a for a in args if os.path.isdir(a)]
+    return paths[-1] if paths else None
+
+
+def _package_bytes(package_dir):
+    sources = os.path.join(package_dir, "sources")
+    paths = [os.path.join(package_dir, "Move.toml")] + [os.path.join(sources, n) for n in os.listdir(sources)]
+    return sum(os.path.getsize(p) for p in paths if os.path.isfile(p))
+
+
+def _gas_used(publish=False, package_dir=None):
+    if publish:
+        # Storage is charged per byte of the published modules and objects
+        storage = 10_000 * _package_bytes(package_dir) if package_dir else 25_000_000
+        return {"computationCost": "1000000", "storageCost": str(storage), "storageRebate": "0",
+                "nonRefundableStorageFee": "0"}
+    return {"computationCost": "1000000", "storageCost": "2000000", "storageRebate": "500000",
+            "nonRefundableStorageFee": "10000"}
+
+
+def _effects(status="success", publish=False, package_dir=None):
+    return {"status": {"status": status}, "gasUsed": _gas_used(publish, package_dir)}
+
+
+def _check_budget(args, publish=False):
+    """Dry-run output for --dry-run; otherwise fail like the CLI when the budget is too small."""
+    package_dir = _package_dir(args) if publish else None
+    if "--dry-run" in args:
+        _delay("FAKE_SUI_DRY_RUN_DELAY", 0.2)
+        print(json.dumps({"effects": _effects(publish=publish, package_dir=package_dir), "objectChanges": [],
+                          "balanceChanges": []}))
+        sys.exit(0)
+    used = _gas_used(publish, package_dir)
+    if "--gas-budget" in args and int(args[args.index("--gas-budget") + 1]) < int(used["computationCost"]) + int(used["storageCost"]):
+        sys.stderr.write("fake sui: InsufficientGas\n")
+        sys.exit(1)
+
+
+def move_build(args):
+    package_dir = args[args.index("--path") + 1] if "--path" in args else os.getcwd()
+    _delay("FAKE_SUI_BUILD_DELAY", 0.5)
+    _maybe_fail("build")
+    out_dir = os.path.join(package_dir, "build", os.path.basename(os.path.abspath(package_dir)))
+    os.makedirs(os.path.join(out_dir, "bytecode_modules"), exist_ok=True)
+    with open(os.path.join(out_dir, "BuildInfo.yaml"), "w") as f:
+        f.write("compiled_package_info: fake\n")
+    print("BUILDING fake package")
+
+
+def client_publish(args):
+    _check_budget(args, publish=True)
+    with _gas_coin_lock(args):
+        _delay("FAKE_SUI_PUBLISH_DELAY", 1.0)
+    _maybe_fail("publish")
+    package_id = _object_id("package")
+    module = "token"
+    package_dir = _package_dir(args)
+    sources = os.path.join(package_dir, "sources") if package_dir else None
+    if sources and os.path.isdir(sources):
+        names = [n[:-5] for n in os.listdir(sources) if n.endswith(".move")]
+        module = names[0] if names else module
+    print(json.dumps({
+        "digest": _digest(),
+        "effects": _effects(publish=True, package_dir=package_dir),
+        "objectChanges": [
+            {"type": "published", "packageId": package_id, "modules": [module]},
+            {
+                "type": "created",
+                "objectType": f"0x2::coin::TreasuryCap<{package_id}::{module}::{module.upper()}>",
+                "objectId": _object_id("treasury"),
+            },
+        ],
+    }))
+
+
+def client_call(args):
+    _check_budget(args)
+    commands = sum(1 for a in args if a in ("--move-call", "--split-coins", "--transfer-objects", "--merge-coins"))
+    with _gas_coin_lock(args):
+        _delay("FAKE_SUI_CALL_DELAY", 0.5)
+        time.sleep(commands * float(os.environ.get("FAKE_SUI_PTB_COMMAND_DELAY", 0.0005)))
+    _maybe_fail("call")
+    print(json.dumps({"digest": _digest(), "effects": _effects(), "objectChanges": [], "balanceChanges": []}))
+
+
+def client_query(args):
+    _delay("FAKE_SUI_QUERY_DELAY", 0.1)
+    print(json.dumps({"data": []} if "objects" in args[:1] else []))
+
+
+def client_gas(args):
+    _delay("FAKE_SUI_QUERY_DELAY", 0.1)
+    print(json.dumps([{"gasCoinId": _object_id("gas", str(i)), "mistBalance": 10 ** 10} for i in range(4)]))
+
+
+def main(argv):
+    if argv[:2] == ["move", "build"]:
+        return move_build(argv[2:])
+    if argv[:1] == ["client"] and len(argv) > 1:
+        command, rest = argv[1], argv[2:]
+        if command == "publish":
+            return client_publish(rest)
+        if command in ("call", "ptb", "pay", "split-coin", "merge-coin", "transfer"):
+            return client_call(rest)
+        if command == "gas":
+            return client_gas(rest)
+        if command == "active-address":
+            return print(os.environ.get("FAKE_SUI_ADDRESS", "0x" + "ab" * 32))
+        if command in ("objects", "transactions", "transaction", "object"):
+            return client_query(argv[1:])
+    sys.stderr.write(f"fake sui: unsupported command: {' '.join(argv)}\n")
+    sys.exit(2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
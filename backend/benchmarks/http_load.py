@@ -0,0 +1,90 @@
+"""
+HTTP load test: read latency while chain writes are in flight.
+
+Fires a steady stream of slow write requests (/mint by default) and, at the same
+time, many concurrent cheap reads spread over the --read-path endpoints
+(/api/all_tokens by default). Read latency percentiles, overall and per path, are
+reported as JSON, so runs before and after a change can be compared.
+
+Start the backend first (benchmarks/serve_app.py runs it against a scratch database
+and benchmarks/fake_sui.py), then:
+
+    python benchmarks/http_load.py --base-url http://127.0.0.1:8000 --duration 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmarks.common import emit, summarize
+
+MINT_BODY = {
+    "package_id": "0x" + "11" * 32,
+    "module_name": "bench",
+    "treasury_cap_id": "0x" + "22" * 32,
+    "amount": 1,
+    "recipient": "0x" + "33" * 32,
+    "sender_address": "0x" + "44" * 32,
+}
+
+
+async def _worker(client, method, path, body, deadline, samples, errors):
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            resp = await client.request(method, path, json=body)
+            if resp.status_code >= 500 and method == "GET":
+                errors.append(resp.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        samples.append((time.perf_counter() - start) * 1000)
+
+
+async def run_load(base_url, duration, readers, writers, read_paths=("/api/all_tokens",), write_path="/mint"):
+    deadline = time.monotonic() + duration
+    samples_by_path = {path: [] for path in read_paths}
+    write_samples, errors = [], []
+    limits = httpx.Limits(max_connections=readers + writers)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        tasks = [
+            _worker(client, "GET", read_paths[i % len(read_paths)], None, deadline,
+                    samples_by_path[read_paths[i % len(read_paths)]], errors)
+            for i in range(readers)
+        ] + [
+            _worker(client, "POST", write_path, MINT_BODY, deadline, write_samples, errors)
+            for _ in range(writers)
+        ]
+        await asyncio.gather(*tasks)
+    return {
+        "base_url": base_url,
+        "duration_s": duration,
+        "readers": readers,
+        "writers": writers,
+        "reads": summarize([ms for samples in samples_by_path.values() for ms in samples]),
+        "reads_by_path": {path: summarize(samples) for path, samples in samples_by_path.items()},
+        "writes": summarize(write_samples),
+        "read_errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure read latency under concurrent chain writes.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--readers", type=int, default=50)
+    parser.add_argument("--writers", type=int, default=40)
+    parser.add_argument("--read-path", action="append", dest="read_paths",
+                        help="GET path to read (repeatable; default: /api/all_tokens)")
+    parser.add_argument("--output", help="Write the JSON result to this file as well as stdout")
+    args = parser.parse_args()
+
+    read_paths = tuple(args.read_paths or ["/api/all_tokens"])
+    result = asyncio.run(run_load(args.base_url, args.duration, args.readers, args.writers, read_paths))
+    emit(result, args.output)
+
+
+if __name__ == "__main__":
+    main()
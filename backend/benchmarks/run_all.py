@@ -0,0 +1,261 @@
+"""
+Run the whole benchmark suite and write one JSON result file.
+
+Each benchmark runs in its own process against a scratch database, with the stub
+fullnode (stub_fullnode.py) standing in for Sui RPC and fake_sui.py for the sui CLI:
+
+    db        bench_db.py at each --sizes table size (default 1k, 100k, 1M records)
+    ingest    bench_ingest.py: TokenCreationEvent ingestion throughput
+    pipeline  bench_pipeline.py: template render and deploy pipeline throughput
+    http      serve_app.py + http_load.py: endpoint latency under concurrent load
+    batch     bench_batch.py: bulk mint, per-recipient calls vs. PTB batches
+    gas       bench_gas_pool.py: concurrent mint throughput by gas pool size
+    holders   bench_holders.py: holder indexer throughput and holder/portfolio lookups
+    backfill  bench_backfill.py: TokenCreationEvent backfill and reconcile throughput
+
+Results carry the git commit and machine details. Pass --baseline with an earlier
+result file to compare: throughputs (*_per_s) that dropped, or latencies (p50/p99)
+and durations that grew, by more than --tolerance are listed as regressions.
+
+    python benchmarks/run_all.py --quick
+    python benchmarks/run_all.py --output results/new.json --baseline results/old.json --fail-on-regression
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmarks.common import BACKEND_DIR, FAKE_SUI, environment
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SUITES = ("db", "ingest", "pipeline", "http", "batch", "gas", "holders", "backfill")
+
+DEFAULTS = {
+    "sizes": "1000,100000,1000000",
+    "events": 5000,
+    "jobs": 40,
+    "http_duration": 20,
+    "http_readers": 50,
+    "http_writers": 8,
+    "http_seed": 10000,
+    "batch_recipients": 5000,
+    "gas_mints": 64,
+    "holder_checkpoints": 200,
+    "backfill_events": 5000,
+}
+QUICK = {
+    "sizes": "1000,10000",
+    "events": 1000,
+    "jobs": 8,
+    "http_duration": 5,
+    "http_readers": 20,
+    "http_writers": 2,
+    "http_seed": 1000,
+    "batch_recipients": 1000,
+    "gas_mints": 16,
+    "holder_checkpoints": 40,
+    "backfill_events": 500,
+}
+
+HTTP_READ_PATHS = [
+    "/api/all_tokens?limit=100",
+    "/api/all_tokens?limit=100&network=mainnet",
+    "/api/user_tokens?address=0x" + format(1, "064x"),
+    "/api/deploy_jobs",
+]
+
+
+def _child_env(**extra):
+    env = {**os.environ, "LOG_LEVEL": "WARNING", **extra}
+    env.setdefault("SUI_CLI_PATH", FAKE_SUI)
+    # Only bench_gas_pool.py serves coins from a stub fullnode
+    env.setdefault("GAS_POOL_ENABLED", "0")
+    return env
+
+
+def run_script(name, args, timeout=None, **env):
+    """Run benchmarks/<name> in a fresh process and return its JSON result."""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "result.json")
+        proc = subprocess.run(
+            [sys.executable, os.path.join(BENCH_DIR, name), *map(str, args), "--output", output],
+            cwd=BACKEND_DIR, env=_child_env(**env), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+            text=True, timeout=timeout,
+        )
+        if proc.returncode != 0 or not os.path.exists(output):
+            return {"error": f"{name} exited with {proc.returncode}", "stderr": proc.stderr[-4000:]}
+        with open(output) as f:
+            return json.load(f)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run_http(duration, readers, writers, seed, call_delay):
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(BENCH_DIR, "serve_app.py"), "--port", str(port), "--seed", str(seed)],
+        cwd=BACKEND_DIR, env=_child_env(FAKE_SUI_CALL_DELAY=str(call_delay)),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 120
+        while True:
+            try:
+                urllib.request.urlopen(f"{base_url}/api/deploy_jobs", timeout=2)
+                break
+            except OSError:
+                if server.poll() is not None or time.monotonic() > deadline:
+                    return {"error": "serve_app.py did not start"}
+                time.sleep(0.2)
+        args = ["--base-url", base_url, "--duration", duration, "--readers", readers, "--writers", writers]
+        for path in HTTP_READ_PATHS:
+            args += ["--read-path", path]
+        result = run_script("http_load.py", args, timeout=duration + 300)
+        result.update(seed_records=seed, mint_call_delay_s=call_delay)
+        return result
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def _flatten(value, prefix=""):
+    if isinstance(value, dict):
+        flat = {}
+        for key, item in value.items():
+            flat.update(_flatten(item, f"{prefix}.{key}" if prefix else key))
+        return flat
+    if isinstance(value, list):
+        return {}
+    return {prefix: value} if isinstance(value, (int, float)) and not isinstance(value, bool) else {}
+
+
+def _direction(key):
+    """+1 if bigger is better, -1 if smaller is better, None if not a tracked metric."""
+    leaf = key.rsplit(".", 1)[-1]
+    if leaf.endswith("_per_s") or leaf == "speedup":
+        return 1
+    if leaf in ("p50_ms", "p99_ms", "seconds", "index_load_seconds"):
+        return -1
+    return None
+
+
+def compare(current, baseline, tolerance):
+    """Relative change of every tracked metric present in both results."""
+    now, before = _flatten(current["results"]), _flatten(baseline["results"])
+    changes, regressions = {}, []
+    for key in sorted(now.keys() & before.keys()):
+        direction = _direction(key)
+        if direction is None or not before[key]:
+            continue
+        change = (now[key] - before[key]) / before[key]
+        changes[key] = {"baseline": before[key], "current": now[key], "change": change}
+        if direction * change < -tolerance:
+            regressions.append(key)
+    return {
+        "baseline_commit": baseline.get("environment", {}).get("git_commit"),
+        "tolerance": tolerance,
+        "changes": changes,
+        "regressions": regressions,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the backend benchmark suite.")
+    parser.add_argument("--suite", action="append", choices=SUITES, help="Run only these suites (repeatable)")
+    parser.add_argument("--quick", action="store_true", help="Small sizes and short runs, for a smoke check")
+    parser.add_argument("--sizes", help="Comma-separated record counts for the db suite")
+    parser.add_argument("--events", type=int)
+    parser.add_argument("--jobs", type=int)
+    parser.add_argument("--http-duration", type=float)
+    parser.add_argument("--build-delay", type=float, default=0.5, help="fake sui move build time (seconds)")
+    parser.add_argument("--publish-delay", type=float, default=1.0, help="fake sui client publish time (seconds)")
+    parser.add_argument("--call-delay", type=float, default=0.5, help="fake sui client call time (seconds)")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<commit>-<time>.json)")
+    parser.add_argument("--baseline", help="Earlier result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative change counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    settings = dict(QUICK if args.quick else DEFAULTS)
+    for key in ("sizes", "events", "jobs", "http_duration"):
+        if getattr(args, key) is not None:
+            settings[key] = getattr(args, key)
+    suites = args.suite or SUITES
+    env = environment()
+    results = {}
+
+    if "db" in suites:
+        results["db"] = {}
+        for size in [int(s) for s in str(settings["sizes"]).split(",") if s]:
+            print(f"db: {size} records ...", file=sys.stderr)
+            results["db"][str(size)] = run_script("bench_db.py", ["--size", size])
+    if "ingest" in suites:
+        print("ingest ...", file=sys.stderr)
+        results["ingest"] = run_script("bench_ingest.py", ["--events", settings["events"]])
+    if "pipeline" in suites:
+        print("pipeline ...", file=sys.stderr)
+        results["pipeline"] = run_script("bench_pipeline.py", [
+            "--jobs", settings["jobs"], "--distinct", max(1, settings["jobs"] // 2),
+            "--build-delay", args.build_delay, "--publish-delay", args.publish_delay,
+        ])
+    if "http" in suites:
+        print("http ...", file=sys.stderr)
+        results["http"] = run_http(settings["http_duration"], settings["http_readers"],
+                                   settings["http_writers"], settings["http_seed"], args.call_delay)
+
+    if "batch" in suites:
+        print("batch ...", file=sys.stderr)
+        results["batch"] = run_script("bench_batch.py", [
+            "--recipients", settings["batch_recipients"], "--call-delay", args.call_delay,
+        ])
+    if "gas" in suites:
+        print("gas ...", file=sys.stderr)
+        results["gas"] = run_script("bench_gas_pool.py", [
+            "--mints", settings["gas_mints"], "--call-delay", args.call_delay,
+        ])
+    if "holders" in suites:
+        print("holders ...", file=sys.stderr)
+        results["holders"] = run_script("bench_holders.py", ["--checkpoints", settings["holder_checkpoints"]])
+    if "backfill" in suites:
+        print("backfill ...", file=sys.stderr)
+        results["backfill"] = run_script("bench_backfill.py", ["--events", settings["backfill_events"], "--latency", 0.02])
+
+    report = {"environment": env, "settings": settings, "results": results}
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = compare(report, json.load(f), args.tolerance)
+
+    output = args.output or os.path.join(
+        BENCH_DIR, "results", f"{(env['git_commit'] or 'unknown')[:12]}-{int(env['timestamp'])}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}", file=sys.stderr)
+
+    failed = [name for name, result in results.items() if isinstance(result, dict) and "error" in result]
+    failed += [f"db.{size}" for size, result in results.get("db", {}).items() if "error" in result]
+    if failed:
+        print(f"Failed benchmarks: {', '.join(failed)}", file=sys.stderr)
+    regressions = report.get("comparison", {}).get("regressions", [])
+    for key in regressions:
+        change = report["comparison"]["changes"][key]
+        print(f"REGRESSION {key}: {change['baseline']:.4g} -> {change['current']:.4g} ({change['change']:+.0%})",
+              file=sys.stderr)
+    if failed or (regressions and args.fail_on_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Run the FastAPI app for load tests, isolated from real networks.
+
+Uses a scratch database (seeded with --seed synthetic token records), the fake sui
+CLI, and no event listener subscriptions, then serves on --port with uvicorn.
+
+    python benchmarks/serve_app.py --port 8000 --seed 10000
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmarks.common import FAKE_SUI
+
+SEED_CREATORS = ["0x" + format(i, "064x") for i in range(1, 101)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the backend against a scratch database and fake sui CLI.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--seed", type=int, default=10000, help="Synthetic token records to preload")
+    parser.add_argument("--db-file", help="Database path (default: a new temporary file)")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench_app_")
+    os.environ["TOKENS_DB_FILE"] = args.db_file or os.path.join(tmp, "bench_tokens.db")
+    os.environ.setdefault("SUI_CLI_PATH", FAKE_SUI)
+
+    import uvicorn
+    import scripts.event_listener as event_listener
+    from benchmarks.bench_db import make_token
+    from database import add_token_records
+    event_listener.NETWORK_CONFIGS = {}
+
+    for offset in range(0, args.seed, 10000):
+        add_token_records([make_token(i, SEED_CREATORS) for i in range(offset, min(args.seed, offset + 10000))])
+
+    from app import app
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+"""
+Local stand-in for a Sui fullnode JSON-RPC endpoint.
+
+Serves single and batched JSON-RPC requests over HTTP from in-memory state so the
+backend's RPC paths can be exercised and benchmarked without network access.
+Handlers for extra methods can be registered with StubFullnode.register().
+
+    stub = StubFullnode().start()
+    stub.add_events(events)
+    ... point NETWORK_CONFIGS / rpc_call at stub.url ...
+    stub.stop()
+
+StubEventStream adds a suix_subscribeEvent WebSocket endpoint on top of a stub
+(requires the 'websockets' package). publish() appends events to the stub, so
+polling sees them too, and pushes them to matching subscribers; drop_connections()
+simulates a fullnode disconnect.
+
+Run directly to serve on a fixed port: python benchmarks/stub_fullnode.py --port 9000
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubFullnode:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0):
+        self.latency = latency
+        self.events = []
+        self.transactions = {}
+        self.objects = {}
+        self.checkpoints = []  # digests per checkpoint
+        self.balances = {}  # (owner, coin type) -> balance
+        self.request_count = 0
+        self.call_counts = {}
+        self._lock = threading.Lock()
+        self._handlers = {
+            "suix_queryEvents": self._query_events,
+            "sui_getTransactionBlock": self._get_transaction_block,
+            "suix_queryTransactionBlocks": self._query_transaction_blocks,
+            "suix_getOwnedObjects": self._get_owned_objects,
+            "sui_multiGetObjects": self._multi_get_objects,
+            "sui_getObject": self._get_object,
+            "suix_getCoins": self._get_coins,
+            "sui_getLatestCheckpointSequenceNumber": self._latest_checkpoint,
+            "sui_getCheckpoint": self._get_checkpoint,
+            "sui_multiGetTransactionBlocks": self._multi_get_transaction_blocks,
+            "suix_getBalance": self._get_balance,
+            "suix_getAllBalances": self._get_all_balances,
+        }
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def register(self, method, handler):
+        """handler(params) -> result; raise StubRpcError for a JSON-RPC error."""
+        self._handlers[method] = handler
+
+    def add_gas_coins(self, owner, count, balance):
+        """Give owner `count` SUI coins of `balance` MIST; returns their object ids."""
+        ids = []
+        with self._lock:
+            for _ in range(count):
+                object_id = "0x" + format(len(self.objects) + 1, "064x")
+                self.objects[object_id] = {
+                    "objectId": object_id,
+                    "type": "0x2::coin::Coin<0x2::sui::SUI>",
+                    "owner": {"AddressOwner": owner},
+                    "content": {"fields": {"balance": str(balance)}},
+                }
+                ids.append(object_id)
+        return ids
+
+    def add_checkpoint(self, transactions):
+        """
+        Append a checkpoint of transactions (dicts with digest and balanceChanges);
+        their balance changes are applied to the stub's balances.
+        """
+        with self._lock:
+            for tx in transactions:
+                tx["checkpoint"] = str(len(self.checkpoints))
+                self.transactions[tx["digest"]] = tx
+                for change in tx.get("balanceChanges", []):
+                    key = (change["owner"]["AddressOwner"], change["coinType"])
+                    self.balances[key] = self.balances.get(key, 0) + int(change["amount"])
+            self.checkpoints.append([tx["digest"] for tx in transactions])
+            return len(self.checkpoints) - 1
+
+    def add_events(self, events):
+        with self._lock:
+            self.events.extend(events)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    # --- JSON-RPC dispatch ---
+
+    def _dispatch(self, request):
+        method = request.get("method")
+        with self._lock:
+            self.call_counts[method] = self.call_counts.get(method, 0) + 1
+        response = {"jsonrpc": "2.0", "id": request.get("id")}
+        handler = self._handlers.get(method)
+        if handler is None:
+            response["error"] = {"code": -32601, "message": f"Method not found: {method}"}
+            return response
+        try:
+            response["result"] = handler(request.get("params") or [])
+        except StubRpcError as e:
+            response["error"] = {"code": e.code, "message": str(e)}
+        return response
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                with stub._lock:
+                    stub.request_count += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if isinstance(body, list):
+                    payload = [stub._dispatch(item) for item in body]
+                else:
+                    payload = stub._dispatch(body)
+                data = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    # --- Default method handlers ---
+
+    def _query_events(self, params):
+        query, cursor, limit, descending = (list(params) + [None, None, None, False])[:4]
+        limit = limit or 50
+        event_type = query.get("MoveEventType") if isinstance(query, dict) else None
+        with self._lock:
+            events = [e for e in self.events if event_type is None or e.get("type") == event_type]
+        if descending:
+            events = list(reversed(events))
+        start = 0
+        if cursor is not None:
+            ids = [e["id"] for e in events]
+            start = ids.index(cursor) + 1 if cursor in ids else len(events)
+        page = events[start:start + limit]
+        next_cursor = page[-1]["id"] if page else cursor
+        return {"data": page, "nextCursor": next_cursor, "hasNextPage": start + limit < len(events)}
+
+    def _get_transaction_block(self, params):
+        tx = self.transactions.get(params[0])
+        if tx is None:
+            raise StubRpcError(-32602, f"Could not find the referenced transaction [{params[0]}]")
+        return tx
+
+    def _query_transaction_blocks(self, params):
+        query = params[0] if params else {}
+        tx_filter = (query or {}).get("filter") or {}
+        with self._lock:
+            txns = list(self.transactions.values())
+        if "FromAddress" in tx_filter:
+            txns = [tx for tx in txns if tx.get("transaction", {}).get("data", {}).get("sender") == tx_filter["FromAddress"]]
+        elif "ChangedObject" in tx_filter:
+            txns = [tx for tx in txns if any(
+                change.get("objectId") == tx_filter["ChangedObject"] for change in tx.get("objectChanges", [])
+            )]
+        elif tx_filter:
+            txns = []
+        cursor, limit, descending = (list(params[1:]) + [None, None, True])[:3]
+        limit = limit or 50
+        txns.sort(key=lambda tx: int(tx.get("timestampMs") or 0), reverse=descending is not False)
+        start = 0
+        if cursor is not None:
+            digests = [tx.get("digest") for tx in txns]
+            start = digests.index(cursor) + 1 if cursor in digests else len(txns)
+        page = txns[start:start + limit]
+        return {"data": page, "nextCursor": page[-1].get("digest") if page else cursor,
+                "hasNextPage": start + limit < len(txns)}
+
+    def _get_owned_objects(self, params):
+        owner = params[0]
+        with self._lock:
+            owned = [obj for obj in self.objects.values() if obj.get("owner", {}).get("AddressOwner") == owner]
+        return {"data": [{"data": obj} for obj in owned], "nextCursor": None, "hasNextPage": False}
+
+    def _get_coins(self, params):
+        owner, coin_type = params[0], (params[1] if len(params) > 1 and params[1] else "0x2::sui::SUI")
+        with self._lock:
+            coins = [
+                {"coinType": coin_type, "coinObjectId": obj["objectId"], "balance": obj["content"]["fields"]["balance"]}
+                for obj in self.objects.values()
+                if obj.get("type") == f"0x2::coin::Coin<{coin_type}>" and obj.get("owner", {}).get("AddressOwner") == owner
+            ]
+        return {"data": coins, "nextCursor": None, "hasNextPage": False}
+
+    def _latest_checkpoint(self, params):
+        return str(len(self.checkpoints) - 1)
+
+    def _get_checkpoint(self, params):
+        seq = int(params[0])
+        if not 0 <= seq < len(self.checkpoints):
+            raise StubRpcError(-32602, f"Checkpoint {seq} not found")
+        return {"sequenceNumber": str(seq), "transactions": self.checkpoints[seq]}
+
+    def _multi_get_transaction_blocks(self, params):
+        return [self.transactions.get(digest) for digest in params[0]]
+
+    def _get_balance(self, params):
+        owner, coin_type = params[0], (params[1] if len(params) > 1 and params[1] else "0x2::sui::SUI")
+        return {"coinType": coin_type, "totalBalance": str(self.balances.get((owner, coin_type), 0))}
+
+    def _get_all_balances(self, params):
+        with self._lock:
+            return [
+                {"coinType": coin_type, "totalBalance": str(balance)}
+                for (owner, coin_type), balance in self.balances.items() if owner == params[0] and balance
+            ]
+
+    def _get_object(self, params):
+        obj = self.objects.get(params[0])
+        if obj is None:
+            return {"error": {"code": "notExists", "object_id": params[0]}}
+        return {"data": obj}
+
+    def _multi_get_objects(self, params):
+        return [self._get_object([object_id]) for object_id in params[0]]
+
+
+class StubRpcError(Exception):
+    def __init__(self, code, message):
+        self.code = code
+        super().__init__(message)
+
+
+class StubEventStream:
+    def __init__(self, stub, host="127.0.0.1", port=0):
+        self.stub = stub
+        self.host = host
+        self.port = port
+        self.subscriptions = {}  # websocket -> {subscription id: MoveEventType}
+        self._ids = itertools.count(1)
+        self._loop = None
+        self._server = None
+        self._ready = threading.Event()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+
+    def publish(self, events):
+        """Append events to the stub fullnode and push them to subscribers."""
+        self.stub.add_events(events)
+        asyncio.run_coroutine_threadsafe(self._push(events), self._loop).result(5)
+
+    def drop_connections(self):
+        """Close every open subscription socket, as a fullnode restart would."""
+        async def close_all():
+            for ws in list(self.subscriptions):
+                await ws.close()
+        asyncio.run_coroutine_threadsafe(close_all(), self._loop).result(5)
+
+    def _run(self):
+        import websockets
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+
+        async def serve():
+            self._server = await websockets.serve(self._handle, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+            self._ready.set()
+            await self._server.wait_closed()
+
+        self._loop.run_until_complete(serve())
+
+    async def _handle(self, ws, *args):
+        self.subscriptions[ws] = {}
+        try:
+            async for message in ws:
+                request = json.loads(message)
+                response = {"jsonrpc": "2.0", "id": request.get("id")}
+                if request.get("method") == "suix_subscribeEvent":
+                    query = (request.get("params") or [{}])[0] or {}
+                    sub_id = next(self._ids)
+                    self.subscriptions[ws][sub_id] = query.get("MoveEventType")
+                    response["result"] = sub_id
+                else:
+                    response["error"] = {"code": -32601, "message": f"Method not found: {request.get('method')}"}
+                await ws.send(json.dumps(response))
+        except Exception:
+            pass
+        finally:
+            self.subscriptions.pop(ws, None)
+
+    async def _push(self, events):
+        for ws, subs in list(self.subscriptions.items()):
+            for sub_id, event_type in subs.items():
+                for event in events:
+                    if event_type is None or event.get("type") == event_type:
+                        notification = {
+                            "jsonrpc": "2.0",
+                            "method": "suix_subscribeEvent",
+                            "params": {"subscription": sub_id, "result": event},
+                        }
+                        try:
+                            await ws.send(json.dumps(notification))
+                        except Exception:
+                            pass
+
+
+def make_token_creation_event(package_id, seq, creator="0x" + "ab" * 32, symbol=None, name=None,
+                              decimals=9, initial_supply="1000000", timestamp_ms=None):
+    """A TokenCreationEvent shaped like suix_queryEvents output."""
+    symbol = symbol or f"TK{seq}"
+    name = name or f"Token {seq}"
+    return {
+        "id": {"txDigest": f"stubtx{seq}", "eventSeq": "0"},
+        "packageId": package_id,
+        "transactionModule": "factory",
+        "sender": creator,
+        "type": f"{package_id}::factory::TokenCreationEvent",
+        "parsedJson": {
+            "creator": creator,
+            "decimals": decimals,
+            "fee_paid": "0",
+            "initial_supply": initial_supply,
+            "metadata_uri": list(b"https://example.com/icon.png"),
+            "name": list(name.encode()),
+            "symbol": list(symbol.encode()),
+            "timestamp": str(timestamp_ms or int(time.time() * 1000)),
+        },
+        "timestampMs": str(timestamp_ms or int(time.time() * 1000)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a stub Sui fullnode JSON-RPC endpoint.")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--package-id", default="0x" + "11" * 32)
+    parser.add_argument("--events", type=int, default=0, help="Number of TokenCreationEvents to preload")
+    parser.add_argument("--latency", type=float, default=0.0, help="Added latency per HTTP request (seconds)")
+    parser.add_argument("--ws-port", type=int, default=None, help="Also serve suix_subscribeEvent over WebSocket on this port")
+    args = parser.parse_args()
+
+    stub = StubFullnode(port=args.port, latency=args.latency)
+    stub.add_events([make_token_creation_event(args.package_id, i) for i in range(args.events)])
+    print(f"Stub fullnode serving {args.events} events for {args.package_id} on {stub.url}")
+    stub.start()
+    if args.ws_port is not None:
+        stream = StubEventStream(stub, port=args.ws_port).start()
+        print(f"Event subscriptions on {stream.url}")
+    try:
+        stub._thread.join()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
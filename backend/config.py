@@ -1,5 +1,119 @@
 # Central config for backend
+import os
 
-# Path to Sui CLI binary
-SUI_CLI_PATH = "/Users/chris_reeder/.local/bin/sui"
+# Path to Sui CLI binary (SUI_CLI_PATH in the environment overrides it, e.g. benchmarks/fake_sui.py)
+SUI_CLI_PATH = os.environ.get("SUI_CLI_PATH", "/Users/chris_reeder/.local/bin/sui")
 # SUI_CLI_PATH = "/usr/local/bin/sui"
+
+# Deployment job queue (scripts/deploy_queue.py)
+# Each deploy builds in its own workspace, so builds can run in parallel across cores.
+DEPLOY_WORKERS = min(4, os.cpu_count() or 1)
+DEPLOY_MAX_ATTEMPTS = 3
+DEPLOY_RETRY_BASE_DELAY = 10  # seconds; doubles on each retry
+
+# Event listener (scripts/event_listener.py)
+# Resume from the last checkpointed cursor on startup instead of skipping to the newest event.
+EVENT_LISTENER_RESUME = True
+# Number of recent event ids remembered in memory to drop repeats across pages.
+EVENT_DEDUP_WINDOW = 10000
+EVENT_PAGE_SIZE = 50  # events per suix_queryEvents page
+# Adaptive poll interval (seconds): immediate re-poll after a full page, back off
+# up to the maximum while a subscription is idle.
+LISTENER_MIN_POLL_INTERVAL = 1
+LISTENER_BASE_POLL_INTERVAL = 5
+LISTENER_MAX_POLL_INTERVAL = 30
+# Push-based ingestion over suix_subscribeEvent WebSockets (needs the 'websockets' package).
+# Falls back to cursor polling on disconnect and retries the stream after this many seconds.
+EVENT_STREAMING = False
+EVENT_STREAM_RETRY_INTERVAL = 60
+
+# Token holder balance indexer (scripts/holder_indexer.py)
+# Follows checkpoints from HOLDER_INDEX_START ("latest", or a checkpoint number) on
+# every network in NETWORK_CONFIGS. Opt-in (HOLDER_INDEX_ENABLED=1): it reads every
+# checkpoint through the same fullnodes, and rate limits, as the event listener.
+HOLDER_INDEX_ENABLED = os.environ.get("HOLDER_INDEX_ENABLED", "0") != "0"
+HOLDER_INDEX_START = "latest"
+HOLDER_INDEX_POLL_INTERVAL = 2  # seconds, once caught up
+HOLDER_INDEX_CHECKPOINTS_PER_ROUND = 20
+HOLDER_INDEX_RPC_BATCH = 20  # JSON-RPC calls per HTTP batch
+HOLDER_INDEX_TOKEN_REFRESH = 30  # seconds between reloads of the tracked package set
+
+# TreasuryCap owner tracking (scripts/owner_tracker.py): every recorded cap is re-read
+# each OWNER_SWEEP_INTERVAL on its own thread. With HOLDER_INDEX_ENABLED the holder
+# indexer also re-reads caps touched by each checkpoint's transactions.
+OWNER_TRACKING_ENABLED = True
+OWNER_SWEEP_INTERVAL = 300  # seconds between full reconciliations of every cap
+
+# Sui fullnode JSON-RPC client (scripts/sui_rpc.py)
+SUI_RPC_TIMEOUT = 10  # seconds
+SUI_RPC_MAX_CONNECTIONS = 20  # pooled keep-alive connections per endpoint
+SUI_RPC_MAX_CONCURRENCY = 16  # in-flight requests per endpoint
+SUI_RPC_RETRIES = 3
+SUI_RPC_RETRY_BASE_DELAY = 0.5  # seconds; full jitter, doubles per attempt
+
+# Fullnode used for chain read queries (transactions, owned objects)
+SUI_RPC_URL = "https://fullnode.testnet.sui.io:443"
+
+# Transaction query caches (scripts/txn_cache.py)
+TX_DETAILS_CACHE_SIZE = 10000  # finalized transactions kept in memory
+TX_DETAILS_CACHE_PERSIST = True  # also keep them in the tx_cache table
+TX_CACHE_MAX_ROWS = 100000  # size bound for the tx_cache table
+TX_HISTORY_CACHE_SIZE = 2000  # by-object / by-address history lists
+TX_HISTORY_CACHE_TTL = 10  # seconds
+
+# Token database (database.py): how often the resident index picks up records that
+# another process (e.g. scripts/backfill.py) wrote to the same database file
+TOKEN_INDEX_REFRESH_INTERVAL = 5  # seconds
+
+# API worker pools (app.py)
+CHAIN_WRITE_WORKERS = 4  # concurrent mint/burn/transfer CLI calls
+DB_WORKERS = 4  # SQLite reads/writes issued by request handlers
+
+# Batched mint/transfer with programmable transaction blocks (scripts/ptb_batch.py)
+# A PTB may hold 1024 commands and 512 arguments per command; a transfer chunk uses
+# one SplitCoins argument and one TransferObjects command per recipient.
+PTB_MAX_RECIPIENTS = 500
+PTB_BATCH_CONCURRENCY = 4  # chunks in flight across different TreasuryCaps / coins
+PTB_MAX_BATCH_RECIPIENTS = 10000  # per request
+PTB_GAS_BUDGET_BASE = 10_000_000  # MIST
+PTB_GAS_BUDGET_PER_RECIPIENT = 2_000_000  # MIST
+
+# Gas coin pool for the backend signer (scripts/gas_pool.py)
+# Each in-flight transaction leases its own gas coin, so chain writes and publishes
+# run concurrently up to the pool size instead of queueing on one default coin.
+GAS_POOL_ENABLED = os.environ.get("GAS_POOL_ENABLED", "1") != "0"
+GAS_POOL_OWNER = os.environ.get("GAS_POOL_OWNER")  # default: `sui client active-address`
+GAS_POOL_SIZE = 8  # coins kept able to fund a transaction
+GAS_POOL_COIN_BALANCE = 2_000_000_000  # MIST per coin split off during a rebalance
+GAS_POOL_MIN_COIN_BALANCE = 200_000_000  # MIST; smaller coins are merged back
+GAS_POOL_REFRESH_INTERVAL = 60  # seconds between balance refreshes
+GAS_POOL_LEASE_TIMEOUT = 120  # seconds to wait for a coin before using CLI gas selection
+GAS_POOL_REBALANCE_BUDGET = 50_000_000  # MIST
+
+# Gas budget estimation by dry run (scripts/gas_estimate.py)
+# Estimates are cached per (template hash or package, operation) for GAS_ESTIMATE_TTL,
+# since the reference gas price can change every epoch.
+GAS_ESTIMATE_MARGIN = 0.2  # on top of the simulated computation + storage cost
+GAS_ESTIMATE_TTL = 3600  # seconds
+GAS_ESTIMATE_CACHE_SIZE = 1000
+GAS_BUDGET_MIN = 2_000_000  # MIST
+GAS_BUDGET_MAX = 5_000_000_000  # MIST
+GAS_DRY_RUN_BUDGET = 100_000_000  # MIST; budget the simulation itself runs with
+
+# Move build cache (scripts/build_cache.py)
+BUILD_CACHE_DIR = "/tmp/sui_move_build_cache"
+BUILD_CACHE_MAX_ENTRIES = 500
+# Shared MOVE_HOME for every sui invocation so git dependencies are fetched once
+MOVE_HOME_DIR = "/tmp/sui_move_home"
+
+# Per-deployment package workspaces (scripts/move_package_utils.py)
+PACKAGE_WORKSPACE_DIR = "/tmp/sui_move_packages"
+WORKSPACE_MAX_AGE = 6 * 3600  # seconds; older leftovers are garbage-collected
+WORKSPACE_MAX_BYTES = 2 * 1024 ** 3  # total size bound for leftover workspaces
+WORKSPACE_GC_INTERVAL = 300  # seconds between collections
+
+# Logging (logger.py): level, "json" or "text" output, and the minimum interval
+# between repeats of a sampled message
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")
+LOG_SAMPLE_INTERVAL = 60
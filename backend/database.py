@@ -1,64 +1,787 @@
 import json
+import math
 import os
+import sqlite3
+import threading
+import time
 from threading import Lock
+from config import TX_CACHE_MAX_ROWS, TOKEN_INDEX_REFRESH_INTERVAL
+from metrics import DB_LOCK_WAIT_SECONDS, DB_LOCK_HOLD_SECONDS
+from logger import get_logger
 
-DB_FILE = os.path.join(os.path.dirname(__file__), 'tokens_db.json')
-_db_lock = Lock()
+logger = get_logger(__name__)
 
-# Ensure the DB file exists
-if not os.path.exists(DB_FILE):
-    with open(DB_FILE, 'w') as f:
-        json.dump([], f)
+DB_FILE = os.environ.get('TOKENS_DB_FILE') or os.path.join(os.path.dirname(__file__), 'tokens.db')
+# Old flat-file store; imported once into DB_FILE when the database is empty
+LEGACY_JSON_FILE = os.path.join(os.path.dirname(__file__), 'tokens_db.json')
+
+class _TimedLock:
+    """Lock whose wait and hold times are recorded in the db_lock_* histograms."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._acquired_at = 0.0
+
+    def __enter__(self):
+        requested = time.perf_counter()
+        self._lock.acquire()
+        self._acquired_at = time.perf_counter()
+        DB_LOCK_WAIT_SECONDS.observe(self._acquired_at - requested)
+        return self
+
+    def __exit__(self, *exc):
+        held = time.perf_counter() - self._acquired_at
+        self._lock.release()
+        DB_LOCK_HOLD_SECONDS.observe(held)
+        return False
+
+# SQLite in WAL mode lets readers run while a write is in progress, so the lock
+# only serializes writers. Every thread gets its own connection.
+_db_lock = _TimedLock()
+_local = threading.local()
+
+# Resident index over every record, keyed by row id and by canonical creator/owner
+# address. Loaded once at startup and updated in place by each mutation (while the
+# writer still holds _db_lock), so lookups never touch the database. Records inserted
+# by other processes are added by refresh_index (see start_index_refresh).
+_index_lock = Lock()
+_records = {}
+_by_creator = {}
+_by_owner = {}
+_row_by_package = {}
+_index_loaded_id = 0  # highest row id read from the table by _load_index / refresh_index
+_index_data_version = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tokens (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    package_id TEXT UNIQUE,
+    creator TEXT,
+    owner TEXT,
+    network TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tokens_creator ON tokens(creator);
+CREATE INDEX IF NOT EXISTS idx_tokens_owner ON tokens(owner);
+CREATE INDEX IF NOT EXISTS idx_tokens_network ON tokens(network, id);
+CREATE INDEX IF NOT EXISTS idx_tokens_symbol ON tokens(json_extract(data, '$.symbol'));
+
+-- One token per (network, creator, symbol, name); reserved before deploying
+CREATE TABLE IF NOT EXISTS token_keys (
+    network TEXT NOT NULL,
+    creator TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    name TEXT NOT NULL,
+    package_id TEXT,
+    PRIMARY KEY (network, creator, symbol, name)
+);
+
+-- TokenCreationEvent ids that have already been handled
+CREATE TABLE IF NOT EXISTS processed_events (
+    tx_digest TEXT NOT NULL,
+    event_seq TEXT NOT NULL,
+    network TEXT,
+    PRIMARY KEY (tx_digest, event_seq)
+);
+
+-- Deployment jobs handed from the event listener to the deploy workers
+CREATE TABLE IF NOT EXISTS deploy_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    network TEXT NOT NULL,
+    params TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_run_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_deploy_jobs_state ON deploy_jobs(state, next_run_at);
+
+-- Last fully processed suix_queryEvents cursor per (network, package)
+CREATE TABLE IF NOT EXISTS event_cursors (
+    network TEXT NOT NULL,
+    package_id TEXT NOT NULL,
+    cursor TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (network, package_id)
+);
+
+-- Coin balances per (token, holder) from scripts/holder_indexer.py. u64 balances can
+-- exceed SQLite's signed INTEGER, so they are stored zero-padded to 20 digits and
+-- ORDER BY balance is numeric.
+CREATE TABLE IF NOT EXISTS token_holders (
+    package_id TEXT NOT NULL,
+    address TEXT NOT NULL,
+    coin_type TEXT NOT NULL,
+    balance TEXT NOT NULL,
+    checkpoint INTEGER,
+    PRIMARY KEY (package_id, address)
+);
+CREATE INDEX IF NOT EXISTS idx_token_holders_balance ON token_holders(package_id, balance DESC);
+CREATE INDEX IF NOT EXISTS idx_token_holders_address ON token_holders(address);
+
+-- Packages seeded into token_holders: the indexer's checkpoint at seeding and the
+-- package's publish checkpoint. Holders are complete only for packages published
+-- after their seed checkpoint; earlier holders appear once they transact again.
+CREATE TABLE IF NOT EXISTS holder_index_packages (
+    package_id TEXT PRIMARY KEY,
+    network TEXT NOT NULL,
+    seeded_checkpoint INTEGER,
+    publish_checkpoint INTEGER
+);
+
+-- Last checkpoint folded into token_holders per network
+CREATE TABLE IF NOT EXISTS holder_index_state (
+    network TEXT PRIMARY KEY,
+    checkpoint INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+-- Finalized transaction details (immutable once checkpointed), see scripts/txn_cache.py
+CREATE TABLE IF NOT EXISTS tx_cache (
+    digest TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+def normalize_address(addr):
+    """Canonical form used for the creator/owner indexes: lowercase with 0x prefix."""
+    if not addr:
+        return ''
+    addr = addr.lower()
+    if not addr.startswith('0x'):
+        addr = '0x' + addr
+    return addr
+
+def _connect():
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(DB_FILE, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _local.conn = conn
+    return conn
+
+def _insert_token(conn, token):
+    row = conn.execute(
+        """
+        INSERT INTO tokens (package_id, creator, owner, network, data)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(package_id) DO UPDATE SET
+            creator = excluded.creator,
+            owner = excluded.owner,
+            network = excluded.network,
+            data = excluded.data
+        RETURNING id
+        """,
+        (
+            token.get('package_id'),
+            normalize_address(token.get('creator')),
+            normalize_address(token.get('owner')),
+            token.get('network'),
+            json.dumps(token),
+        ),
+    ).fetchone()
+    conn.execute(
+        """
+        INSERT INTO token_keys (network, creator, symbol, name, package_id)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(network, creator, symbol, name) DO UPDATE SET package_id = excluded.package_id
+        """,
+        _token_key(token.get('network'), token.get('creator'), token.get('symbol'), token.get('name'))
+        + (token.get('package_id'),),
+    )
+    return row[0]
+
+def _token_key(network, creator, symbol, name):
+    return (network or '', normalize_address(creator), symbol or '', name or '')
+
+def _index_add(row_id, rec):
+    with _index_lock:
+        _index_remove_locked(row_id)
+        _records[row_id] = rec
+        _by_creator.setdefault(normalize_address(rec.get('creator')), {})[row_id] = rec
+        _by_owner.setdefault(normalize_address(rec.get('owner')), {})[row_id] = rec
+        if rec.get('package_id'):
+            _row_by_package[rec['package_id']] = row_id
+
+def _index_remove_locked(row_id):
+    rec = _records.pop(row_id, None)
+    if rec is None:
+        return
+    for index, key in ((_by_creator, rec.get('creator')), (_by_owner, rec.get('owner'))):
+        bucket = index.get(normalize_address(key))
+        if bucket is not None:
+            bucket.pop(row_id, None)
+            if not bucket:
+                del index[normalize_address(key)]
+    if _row_by_package.get(rec.get('package_id')) == row_id:
+        del _row_by_package[rec['package_id']]
+
+def _load_index(conn, after_id=0):
+    global _index_loaded_id
+    rows = conn.execute("SELECT id, data FROM tokens WHERE id > ? ORDER BY id", (after_id,)).fetchall()
+    for row_id, data in rows:
+        _index_add(row_id, json.loads(data))
+    if rows:
+        _index_loaded_id = max(_index_loaded_id, rows[-1][0])
+    return len(rows)
+
+def refresh_index():
+    """
+    Add records inserted by other processes since the last load to the resident index.
+    Cheap when nothing changed: PRAGMA data_version only moves when another connection
+    commits. Returns the number of rows read.
+    """
+    global _index_data_version
+    conn = _connect()
+    version = conn.execute("PRAGMA data_version").fetchone()[0]
+    if version == _index_data_version:
+        return 0
+    with _db_lock:
+        loaded = _load_index(conn, _index_loaded_id)
+    _index_data_version = version
+    return loaded
+
+def start_index_refresh(interval=TOKEN_INDEX_REFRESH_INTERVAL):
+    """Run refresh_index every `interval` seconds on a daemon thread."""
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                loaded = refresh_index()
+                if loaded:
+                    logger.info("Loaded token records written by another process", extra={"count": loaded})
+            except Exception as e:
+                logger.warning("Token index refresh failed: %s", e)
+    threading.Thread(target=loop, name="token-index-refresh", daemon=True).start()
+
+def _init_db():
+    conn = _connect()
+    with _db_lock, conn:
+        conn.executescript(SCHEMA)
+        empty = conn.execute("SELECT 1 FROM tokens LIMIT 1").fetchone() is None
+        if empty and os.path.exists(LEGACY_JSON_FILE):
+            with open(LEGACY_JSON_FILE, 'r') as f:
+                legacy = json.load(f)
+            for token in legacy:
+                _insert_token(conn, token)
+            if legacy:
+                logger.info("Imported legacy token records", extra={"count": len(legacy), "path": LEGACY_JSON_FILE})
+        _load_index(conn)
+        if conn.execute("SELECT 1 FROM token_keys LIMIT 1").fetchone() is None:
+            conn.executemany(
+                "INSERT OR IGNORE INTO token_keys (network, creator, symbol, name, package_id) VALUES (?, ?, ?, ?, ?)",
+                [
+                    _token_key(rec.get('network'), rec.get('creator'), rec.get('symbol'), rec.get('name'))
+                    + (rec.get('package_id'),)
+                    for rec in _records.values()
+                ],
+            )
+
+_init_db()
 
 def add_token_record(token):
+    # Ensure owner is set to creator if not provided
+    if 'owner' not in token or not token['owner']:
+        token['owner'] = token.get('creator')
+    conn = _connect()
     with _db_lock:
-        # Ensure owner is set to creator if not provided
-        if 'owner' not in token or not token['owner']:
+        with conn:
+            row_id = _insert_token(conn, token)
+        _index_add(row_id, dict(token))
+
+def add_token_records(tokens):
+    """Insert or update many records in one transaction."""
+    for token in tokens:
+        if not token.get('owner'):
             token['owner'] = token.get('creator')
-        with open(DB_FILE, 'r') as f:
-            data = json.load(f)
-        data.append(token)
-        with open(DB_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
+    conn = _connect()
+    with _db_lock:
+        with conn:
+            row_ids = [_insert_token(conn, token) for token in tokens]
+        for row_id, token in zip(row_ids, tokens):
+            _index_add(row_id, dict(token))
+
+def get_token(package_id):
+    with _index_lock:
+        rec = _records.get(_row_by_package.get(package_id))
+        return dict(rec) if rec else None
 
 def get_tokens_by_deployer(deployer_address):
-    with _db_lock:
-        with open(DB_FILE, 'r') as f:
-            data = json.load(f)
-        # Normalize both addresses for comparison (lowercase, with 0x prefix)
-        norm_addr = deployer_address.lower()
-        def norm(a):
-            a = a.lower()
-            if not a.startswith('0x'):
-                a = '0x' + a
-            return a
-        return [rec for rec in data if norm(rec.get('creator', '')) == norm(norm_addr)]
+    with _index_lock:
+        bucket = _by_creator.get(normalize_address(deployer_address), {})
+        return [dict(rec) for rec in bucket.values()]
 
 def get_tokens_by_owner(owner_address):
-    with _db_lock:
-        with open(DB_FILE, 'r') as f:
-            data = json.load(f)
-        return [rec for rec in data if rec.get('owner') == owner_address]
+    with _index_lock:
+        bucket = _by_owner.get(normalize_address(owner_address), {})
+        return [dict(rec) for rec in bucket.values()]
 
 def get_all_tokens():
-    with _db_lock:
-        with open(DB_FILE, 'r') as f:
-            return json.load(f)
+    with _index_lock:
+        return [dict(rec) for rec in _records.values()]
+
+def get_token_packages(network=None):
+    """package_id -> (creator, owner) for every record on network (or without one)."""
+    with _index_lock:
+        return {
+            rec['package_id']: (rec.get('creator'), rec.get('owner'))
+            for rec in _records.values()
+            if rec.get('package_id') and (network is None or rec.get('network') in (network, None))
+        }
+
+def get_treasury_caps(network=None):
+    """treasury_cap_id -> (package_id, owner) for every record on network (or without one)."""
+    with _index_lock:
+        return {
+            rec['treasury_cap_id']: (rec.get('package_id'), rec.get('owner'))
+            for rec in _records.values()
+            if rec.get('treasury_cap_id') and (network is None or rec.get('network') in (network, None))
+        }
+
+def list_tokens(after_id=0, limit=100, network=None, creator=None, symbol_prefix=None):
+    """
+    One page of token records in insertion order, starting after row id `after_id`.
+    Returns (records, last_row_id); last_row_id is None when there are no more rows.
+    """
+    conn = _connect()
+    id_clause = "id > ?"
+    if symbol_prefix:
+        # Range form of a prefix match, served by the expression index on symbol. The
+        # index wins for a selective prefix; a dense one fills the page sooner walking
+        # rowids. Count matches up to sqrt(rows * page), which bounds both plans to
+        # about that many rows: below it, keep the planner off the rowid range (+id).
+        symbol_range = (symbol_prefix, symbol_prefix + '\U0010ffff')
+        rows_total = conn.execute("SELECT MAX(id) FROM tokens").fetchone()[0] or 0
+        probe = max(limit + 1, math.isqrt((limit + 1) * rows_total))
+        matches = conn.execute(
+            """
+            SELECT COUNT(*) FROM (
+                SELECT 1 FROM tokens WHERE json_extract(data, '$.symbol') >= ? AND json_extract(data, '$.symbol') < ? LIMIT ?
+            )
+            """,
+            (*symbol_range, probe),
+        ).fetchone()[0]
+        symbol_clause = "json_extract(data, '$.symbol') >= ? AND json_extract(data, '$.symbol') < ?"
+        if matches < probe:
+            id_clause = "+id > ?"
+        else:
+            symbol_clause = "+json_extract(data, '$.symbol') >= ? AND +json_extract(data, '$.symbol') < ?"
+    clauses = [id_clause]
+    args = [after_id]
+    if network:
+        clauses.append("network = ?")
+        args.append(network)
+    if creator:
+        clauses.append("creator = ?")
+        args.append(normalize_address(creator))
+    if symbol_prefix:
+        clauses.append(symbol_clause)
+        args.extend(symbol_range)
+    rows = conn.execute(
+        f"SELECT id, data FROM tokens WHERE {' AND '.join(clauses)} ORDER BY id LIMIT ?",
+        (*args, limit + 1),
+    ).fetchall()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return [json.loads(data) for _, data in rows], (rows[-1][0] if more else None)
+
+def iter_tokens(batch_size=500, **filters):
+    """Yield every matching record in insertion order, reading batch_size rows at a time."""
+    after_id = 0
+    while True:
+        records, after_id = list_tokens(after_id, batch_size, **filters)
+        yield from records
+        if after_id is None:
+            return
 
 def delete_token_record(package_id):
+    """Delete the record and free its (network, creator, symbol, name) key for a redeploy."""
+    conn = _connect()
     with _db_lock:
-        with open(DB_FILE, 'r') as f:
-            data = json.load(f)
-        data = [rec for rec in data if rec.get('package_id') != package_id]
-        with open(DB_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
+        with conn:
+            conn.execute("DELETE FROM tokens WHERE package_id = ?", (package_id,))
+            conn.execute("DELETE FROM token_keys WHERE package_id = ?", (package_id,))
+        with _index_lock:
+            row_id = _row_by_package.get(package_id)
+            if row_id is not None:
+                _index_remove_locked(row_id)
 
 def update_token_owner(package_id, new_owner):
+    conn = _connect()
     with _db_lock:
-        with open(DB_FILE, 'r') as f:
-            data = json.load(f)
-        for rec in data:
-            if rec.get('package_id') == package_id:
+        row = conn.execute("SELECT id, data FROM tokens WHERE package_id = ?", (package_id,)).fetchone()
+        if row is None:
+            return
+        row_id, data = row
+        rec = json.loads(data)
+        rec['owner'] = new_owner
+        with conn:
+            conn.execute(
+                "UPDATE tokens SET owner = ?, data = ? WHERE id = ?",
+                (normalize_address(new_owner), json.dumps(rec), row_id),
+            )
+        _index_add(row_id, rec)
+
+def update_token_owners(changes):
+    """Apply many (package_id, new_owner) updates in one transaction."""
+    conn = _connect()
+    with _db_lock:
+        updated = []
+        with conn:
+            for package_id, new_owner in changes:
+                row = conn.execute("SELECT id, data FROM tokens WHERE package_id = ?", (package_id,)).fetchone()
+                if row is None:
+                    continue
+                row_id, data = row
+                rec = json.loads(data)
                 rec['owner'] = new_owner
-        with open(DB_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
+                conn.execute(
+                    "UPDATE tokens SET owner = ?, data = ? WHERE id = ?",
+                    (normalize_address(new_owner), json.dumps(rec), row_id),
+                )
+                updated.append((row_id, rec))
+        for row_id, rec in updated:
+            _index_add(row_id, rec)
+        return len(updated)
+
+def _reserve_token_event_locked(conn, network, creator, symbol, name, event_id):
+    tx_digest, event_seq = event_id
+    cur = conn.execute(
+        "INSERT OR IGNORE INTO processed_events (tx_digest, event_seq, network) VALUES (?, ?, ?)",
+        (tx_digest, str(event_seq), network),
+    )
+    if cur.rowcount == 0:
+        return False
+    cur = conn.execute(
+        "INSERT OR IGNORE INTO token_keys (network, creator, symbol, name) VALUES (?, ?, ?, ?)",
+        _token_key(network, creator, symbol, name),
+    )
+    return cur.rowcount == 1
+
+def reserve_token_event(network, creator, symbol, name, event_id):
+    """
+    Atomically claim a TokenCreationEvent for deployment.
+    Marks event_id ((txDigest, eventSeq)) as processed and reserves the
+    (network, creator, symbol, name) key. Returns False if either was already
+    taken, in which case the caller must not deploy.
+    """
+    conn = _connect()
+    with _db_lock, conn:
+        return _reserve_token_event_locked(conn, network, creator, symbol, name, event_id)
+
+def reserve_token_event_job(network, params, event_id):
+    """
+    reserve_token_event and enqueue_deploy_job in one transaction, so a claimed
+    event always has its deploy job. Returns the job id, or None if the event or
+    key was already taken.
+    """
+    conn = _connect()
+    with _db_lock, conn:
+        if not _reserve_token_event_locked(conn, network, params['creator'], params['symbol'], params['name'], event_id):
+            return None
+        return _insert_deploy_job(conn, network, params)
+
+def get_token_key_packages(keys):
+    """
+    Look up (network, creator, symbol, name) keys in token_keys. Returns
+    {key: package_id} for reserved keys; package_id is None while undeployed.
+    """
+    conn = _connect()
+    found = {}
+    for key in keys:
+        row = conn.execute(
+            "SELECT package_id FROM token_keys WHERE network = ? AND creator = ? AND symbol = ? AND name = ?",
+            _token_key(*key),
+        ).fetchone()
+        if row is not None:
+            found[key] = row[0]
+    return found
+
+LIVE_DEPLOY_JOB_STATES = ('queued', 'building', 'publishing')
+
+def _live_deploy_job_keys(conn, networks):
+    marks = ', '.join('?' * len(LIVE_DEPLOY_JOB_STATES))
+    live = set()
+    for network in networks:
+        rows = conn.execute(
+            f"SELECT params FROM deploy_jobs WHERE network = ? AND state IN ({marks})",
+            (network, *LIVE_DEPLOY_JOB_STATES),
+        ).fetchall()
+        for (params,) in rows:
+            params = json.loads(params)
+            live.add(_token_key(network, params.get('creator'), params.get('symbol'), params.get('name')))
+    return live
+
+def get_live_deploy_jobs(keys):
+    """The (network, creator, symbol, name) keys that have a queued or running deploy job."""
+    keys = list(keys)
+    live = _live_deploy_job_keys(_connect(), {key[0] for key in keys})
+    return {key for key in keys if _token_key(*key) in live}
+
+def requeue_token_event(network, params, event_id):
+    """
+    Queue a deploy job for an event whose key is free or reserved without a
+    package and without a live job (a stale reservation), marking the event
+    processed. One transaction; returns the job id, or None if the key has a
+    package or a live job.
+    """
+    tx_digest, event_seq = event_id
+    key = _token_key(network, params['creator'], params['symbol'], params['name'])
+    conn = _connect()
+    with _db_lock, conn:
+        row = conn.execute(
+            "SELECT package_id FROM token_keys WHERE network = ? AND creator = ? AND symbol = ? AND name = ?", key
+        ).fetchone()
+        if (row is not None and row[0]) or key in _live_deploy_job_keys(conn, [network]):
+            return None
+        conn.execute("INSERT OR IGNORE INTO token_keys (network, creator, symbol, name) VALUES (?, ?, ?, ?)", key)
+        conn.execute(
+            "INSERT OR IGNORE INTO processed_events (tx_digest, event_seq, network) VALUES (?, ?, ?)",
+            (tx_digest, str(event_seq), network),
+        )
+        return _insert_deploy_job(conn, network, params)
+
+def save_backfill_page(network, cursor_key, cursor, tokens, event_ids):
+    """
+    One backfill page in a single transaction: insert recovered token records, mark
+    event_ids ((txDigest, eventSeq)) processed and store the page cursor under cursor_key.
+    """
+    for token in tokens:
+        if not token.get('owner'):
+            token['owner'] = token.get('creator')
+    conn = _connect()
+    with _db_lock:
+        with conn:
+            row_ids = [_insert_token(conn, token) for token in tokens]
+            conn.executemany(
+                "INSERT OR IGNORE INTO processed_events (tx_digest, event_seq, network) VALUES (?, ?, ?)",
+                [(tx_digest, str(event_seq), network) for tx_digest, event_seq in event_ids],
+            )
+            conn.execute(
+                """
+                INSERT INTO event_cursors (network, package_id, cursor, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(network, package_id) DO UPDATE SET cursor = excluded.cursor, updated_at = excluded.updated_at
+                """,
+                (network, cursor_key, json.dumps(cursor), time.time()),
+            )
+        for row_id, token in zip(row_ids, tokens):
+            _index_add(row_id, dict(token))
+
+def release_token_reservation(network, creator, symbol, name):
+    """Drop a reservation that never produced a deployed package."""
+    conn = _connect()
+    with _db_lock, conn:
+        conn.execute(
+            """
+            DELETE FROM token_keys
+            WHERE network = ? AND creator = ? AND symbol = ? AND name = ? AND package_id IS NULL
+            """,
+            _token_key(network, creator, symbol, name),
+        )
+
+def _deploy_job_from_row(row):
+    job_id, network, params, state, attempts, next_run_at, last_error, result, created_at, updated_at = row
+    return {
+        'id': job_id,
+        'network': network,
+        'params': json.loads(params),
+        'state': state,
+        'attempts': attempts,
+        'next_run_at': next_run_at,
+        'last_error': last_error,
+        'result': json.loads(result) if result else None,
+        'created_at': created_at,
+        'updated_at': updated_at,
+    }
+
+def _insert_deploy_job(conn, network, params):
+    now = time.time()
+    cur = conn.execute(
+        "INSERT INTO deploy_jobs (network, params, created_at, updated_at) VALUES (?, ?, ?, ?)",
+        (network, json.dumps(params), now, now),
+    )
+    return cur.lastrowid
+
+def enqueue_deploy_job(network, params):
+    conn = _connect()
+    with _db_lock, conn:
+        return _insert_deploy_job(conn, network, params)
+
+def claim_deploy_job(state='building'):
+    """Move the oldest due queued job to `state` and return it, or None if nothing is due."""
+    now = time.time()
+    conn = _connect()
+    with _db_lock, conn:
+        row = conn.execute(
+            """
+            UPDATE deploy_jobs SET state = ?, attempts = attempts + 1, updated_at = ?
+            WHERE id = (
+                SELECT id FROM deploy_jobs
+                WHERE state = 'queued' AND next_run_at <= ?
+                ORDER BY next_run_at, id LIMIT 1
+            )
+            RETURNING *
+            """,
+            (state, now, now),
+        ).fetchone()
+    return _deploy_job_from_row(row) if row else None
+
+def next_deploy_job_time():
+    row = _connect().execute("SELECT MIN(next_run_at) FROM deploy_jobs WHERE state = 'queued'").fetchone()
+    return row[0]
+
+def update_deploy_job(job_id, state, next_run_at=None, last_error=None, result=None):
+    fields = {'state': state, 'updated_at': time.time()}
+    if next_run_at is not None:
+        fields['next_run_at'] = next_run_at
+    if last_error is not None:
+        fields['last_error'] = last_error
+    if result is not None:
+        fields['result'] = json.dumps(result)
+    assignments = ', '.join(f"{name} = ?" for name in fields)
+    conn = _connect()
+    with _db_lock, conn:
+        conn.execute(f"UPDATE deploy_jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+def get_deploy_job(job_id):
+    row = _connect().execute("SELECT * FROM deploy_jobs WHERE id = ?", (job_id,)).fetchone()
+    return _deploy_job_from_row(row) if row else None
+
+def requeue_interrupted_deploy_jobs():
+    """
+    Jobs left mid-build by a previous process go back to the queue. Jobs left
+    mid-publish are not requeued: the publish may have reached the chain.
+    """
+    conn = _connect()
+    with _db_lock, conn:
+        cur = conn.execute(
+            "UPDATE deploy_jobs SET state = 'queued', updated_at = ? WHERE state = 'building'",
+            (time.time(),),
+        )
+        return cur.rowcount
+
+def get_deploy_jobs(state):
+    rows = _connect().execute("SELECT * FROM deploy_jobs WHERE state = ? ORDER BY id", (state,)).fetchall()
+    return [_deploy_job_from_row(row) for row in rows]
+
+def count_deploy_jobs_by_state():
+    rows = _connect().execute("SELECT state, COUNT(*) FROM deploy_jobs GROUP BY state").fetchall()
+    return dict(rows)
+
+def get_event_cursor(network, package_id):
+    row = _connect().execute(
+        "SELECT cursor FROM event_cursors WHERE network = ? AND package_id = ?",
+        (network, package_id),
+    ).fetchone()
+    return json.loads(row[0]) if row else None
+
+def save_event_cursor(network, package_id, cursor):
+    conn = _connect()
+    with _db_lock, conn:
+        conn.execute(
+            """
+            INSERT INTO event_cursors (network, package_id, cursor, updated_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(network, package_id) DO UPDATE SET cursor = excluded.cursor, updated_at = excluded.updated_at
+            """,
+            (network, package_id, json.dumps(cursor), time.time()),
+        )
+
+def get_holder_checkpoint(network):
+    row = _connect().execute("SELECT checkpoint FROM holder_index_state WHERE network = ?", (network,)).fetchone()
+    return row[0] if row else None
+
+def _store_holder_balances(conn, balances, checkpoint):
+    for package_id, address, coin_type, balance in balances:
+        if int(balance) > 0:
+            conn.execute(
+                """
+                INSERT INTO token_holders (package_id, address, coin_type, balance, checkpoint) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(package_id, address) DO UPDATE SET
+                    coin_type = excluded.coin_type, balance = excluded.balance, checkpoint = excluded.checkpoint
+                """,
+                (package_id, address, coin_type, f"{int(balance):020d}", checkpoint),
+            )
+        else:
+            conn.execute("DELETE FROM token_holders WHERE package_id = ? AND address = ?", (package_id, address))
+
+def save_holder_balances(network, balances, checkpoint):
+    """
+    Store current balances, given as (package_id, address, coin_type, balance) tuples,
+    and advance the network's checkpoint in one transaction. Zero balances are removed.
+    """
+    conn = _connect()
+    with _db_lock, conn:
+        _store_holder_balances(conn, balances, checkpoint)
+        if checkpoint is not None:
+            conn.execute(
+                """
+                INSERT INTO holder_index_state (network, checkpoint, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(network) DO UPDATE SET checkpoint = excluded.checkpoint, updated_at = excluded.updated_at
+                """,
+                (network, checkpoint, time.time()),
+            )
+
+def save_holder_seed(network, balances, publish_checkpoints, seeded_checkpoint):
+    """
+    Store seed balances for newly tracked packages and record them as seeded at
+    seeded_checkpoint; publish_checkpoints maps package_id -> publish checkpoint (or None).
+    """
+    conn = _connect()
+    with _db_lock, conn:
+        _store_holder_balances(conn, balances, None)
+        conn.executemany(
+            """
+            INSERT INTO holder_index_packages (package_id, network, seeded_checkpoint, publish_checkpoint) VALUES (?, ?, ?, ?)
+            ON CONFLICT(package_id) DO UPDATE SET
+                seeded_checkpoint = excluded.seeded_checkpoint, publish_checkpoint = excluded.publish_checkpoint
+            """,
+            [(package_id, network, seeded_checkpoint, published) for package_id, published in publish_checkpoints.items()],
+        )
+
+def get_indexed_packages():
+    """Package ids already seeded into token_holders."""
+    return {row[0] for row in _connect().execute("SELECT package_id FROM holder_index_packages")}
+
+def get_holder_coverage(package_id):
+    """
+    indexed_since (seed checkpoint, None if never indexed) and complete: True when the
+    package was published after it, so every holder was seen by the index.
+    """
+    row = _connect().execute(
+        "SELECT seeded_checkpoint, publish_checkpoint FROM holder_index_packages WHERE package_id = ?", (package_id,)
+    ).fetchone()
+    seeded, published = row if row else (None, None)
+    return {"indexed_since": seeded, "complete": seeded is not None and published is not None and published > seeded}
+
+def get_token_holders(package_id, limit=100, offset=0):
+    """Holders of package_id by descending balance; returns (holders, total holder count)."""
+    conn = _connect()
+    rows = conn.execute(
+        "SELECT address, balance, checkpoint FROM token_holders WHERE package_id = ? ORDER BY balance DESC LIMIT ? OFFSET ?",
+        (package_id, limit, offset),
+    ).fetchall()
+    total = conn.execute("SELECT COUNT(*) FROM token_holders WHERE package_id = ?", (package_id,)).fetchone()[0]
+    return [{"address": a, "balance": str(int(b)), "checkpoint": c} for a, b, c in rows], total
+
+def get_portfolio(address):
+    """Indexed token balances held by address."""
+    rows = _connect().execute(
+        "SELECT package_id, coin_type, balance, checkpoint FROM token_holders WHERE address = ? ORDER BY package_id",
+        (normalize_address(address),),
+    ).fetchall()
+    return [{"package_id": p, "coin_type": t, "balance": str(int(b)), "checkpoint": c} for p, t, b, c in rows]
+
+def get_cached_transaction(digest):
+    row = _connect().execute("SELECT data FROM tx_cache WHERE digest = ?", (digest,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+def save_cached_transaction(digest, data, max_rows=TX_CACHE_MAX_ROWS):
+    conn = _connect()
+    with _db_lock, conn:
+        conn.execute("INSERT OR REPLACE INTO tx_cache (digest, data) VALUES (?, ?)", (digest, json.dumps(data)))
+        # Keep the table size-bounded by dropping the oldest rows
+        conn.execute("DELETE FROM tx_cache WHERE rowid <= (SELECT MAX(rowid) FROM tx_cache) - ?", (max_rows,))
@@ -0,0 +1,159 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from config import LOG_LEVEL, LOG_FORMAT, LOG_SAMPLE_INTERVAL
+
+# Structured logging for the backend. Records are handed to a QueueHandler, so the
+# calling thread only enqueues; a QueueListener thread formats them (one JSON object
+# per line by default) and writes them to stdout.
+#
+# Correlation ids (event_id, job_id, package_id, ...) bound with correlate() are stored
+# in a ContextVar and attached to every record logged inside the block, so one
+# TokenCreationEvent can be followed through its deploy job to the stored token record.
+#
+# Repetitive messages can pass extra={"sample": key}: each key is emitted at most once
+# per LOG_SAMPLE_INTERVAL seconds and the next emitted record carries a "suppressed" count.
+
+_correlation = ContextVar("log_correlation", default={})
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+# Libraries that log every request at INFO
+QUIET_LOGGERS = ("httpx", "httpcore", "websockets")
+
+_setup_lock = threading.Lock()
+_listener = None
+
+
+def current_correlation():
+    return _correlation.get()
+
+
+@contextmanager
+def correlate(**ids):
+    """Attach ids (e.g. event_id=..., job_id=...) to every record logged inside the block."""
+    token = _correlation.set({**_correlation.get(), **{k: v for k, v in ids.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _correlation.reset(token)
+
+
+class CorrelationFilter(logging.Filter):
+    """Copies the current correlation ids onto the record; runs in the logging thread's caller."""
+
+    def filter(self, record):
+        ids = _correlation.get()
+        if ids:
+            record.correlation = ids
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Rate-limits records that carry a `sample` key to one per interval per key."""
+
+    def __init__(self, interval=LOG_SAMPLE_INTERVAL):
+        super().__init__()
+        self.interval = interval
+        self._last = {}
+        self._suppressed = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        key = getattr(record, "sample", None)
+        if key is None or self.interval <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last.get(key, float("-inf")) < self.interval:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return False
+            self._last[key] = now
+            suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Merge args and render the traceback now (the caller's objects may change),
+        # but leave formatting to the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "correlation", {}))
+        for key, value in vars(record).items():
+            if key not in _RESERVED and key not in ("correlation", "sample"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        fields = {**getattr(record, "correlation", {})}
+        fields.update(
+            (k, v) for k, v in vars(record).items()
+            if k not in _RESERVED and k not in ("correlation", "sample")
+        )
+        line = f"{self.formatTime(record)} {record.levelname} [{record.name}] {record.getMessage()}"
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+
+def setup_logging(level=LOG_LEVEL, fmt=LOG_FORMAT, stream=None):
+    """Route the root logger through a queue to a single writer thread. Idempotent."""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+        log_queue = queue.SimpleQueue()
+        queue_handler = _QueueHandler(log_queue)
+        queue_handler.addFilter(CorrelationFilter())
+        queue_handler.addFilter(SamplingFilter())
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+        root = logging.getLogger()
+        root.handlers[:] = [queue_handler]
+        root.setLevel(level)
+        for name in QUIET_LOGGERS:
+            logging.getLogger(name).setLevel(logging.WARNING)
+        _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+        return _listener
+
+
+def get_logger(name):
+    setup_logging()
+    return logging.getLogger(name)
@@ -3,7 +3,7 @@ from app import app
 from scripts.event_listener import start_event_listener
 
 if __name__ == "__main__":
-    # Start the event listener in a background thread
+    # Start the event listener supervisor (a no-op if the app startup hook already did)
     start_event_listener()
     # Start the FastAPI server
     uvicorn.run(app, host="0.0.0.0", port=8000)
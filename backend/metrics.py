@@ -0,0 +1,184 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Minimal Prometheus-style metrics, rendered in the text exposition format at /metrics.
+# Each metric keeps its samples in a dict keyed by label values behind its own lock,
+# so recording is a dict lookup and a few additions; nothing is exported until scraped.
+
+_registry = []
+_registry_lock = threading.Lock()
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+LAG_BUCKETS = (0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+SUBPROCESS_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape_label(v)}"' for n, v in zip(names, values)]
+    pairs += [f'{n}="{_escape_label(v)}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._samples = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self):
+        lines = self._header()
+        with self._lock:
+            samples = list(self._samples.items())
+        for key, value in samples:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._samples[key] = self._samples.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._samples[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._samples[key] = self._samples.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            sample = self._samples.get(key)
+            if sample is None:
+                # per-bucket counts (+Inf last), sum, count
+                sample = self._samples[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            sample[0][index] += 1
+            sample[1] += value
+            sample[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with-block, including when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = self._header()
+        with self._lock:
+            samples = [(key, list(counts), total, count) for key, (counts, total, count) in self._samples.items()]
+        for key, counts, total, count in samples:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+def render_metrics():
+    """All registered metrics in the Prometheus text exposition format (version 0.0.4)."""
+    with _registry_lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- Backend metrics ---
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+DB_LOCK_WAIT_SECONDS = Histogram(
+    "db_lock_wait_seconds", "Time spent waiting for the SQLite writer lock.",
+)
+DB_LOCK_HOLD_SECONDS = Histogram(
+    "db_lock_hold_seconds", "Time the SQLite writer lock was held.",
+)
+SUI_COMMAND_SECONDS = Histogram(
+    "sui_command_duration_seconds", "Duration of sui CLI subprocesses by command.",
+    ("command",), buckets=SUBPROCESS_BUCKETS,
+)
+RPC_REQUEST_SECONDS = Histogram(
+    "sui_rpc_request_duration_seconds", "Fullnode JSON-RPC latency by method, including retries.",
+    ("method", "batch"),
+)
+RPC_ERRORS = Counter(
+    "sui_rpc_errors_total", "Fullnode JSON-RPC calls that failed, by method.",
+    ("method",),
+)
+EVENT_INGESTION_LAG_SECONDS = Histogram(
+    "event_ingestion_lag_seconds", "Delay between an event's timestampMs and its processing.",
+    ("network",), buckets=LAG_BUCKETS,
+)
+EVENTS_PROCESSED = Counter(
+    "events_processed_total", "TokenCreationEvents handed to the event handler.",
+    ("network",),
+)
+DEPLOY_QUEUE_DEPTH = Gauge(
+    "deploy_queue_depth", "Deploy jobs by state, sampled at scrape time.",
+    ("state",),
+)
+DEPLOY_JOB_SECONDS = Histogram(
+    "deploy_job_duration_seconds", "Wall time of one deploy job attempt by outcome.",
+    ("outcome",), buckets=SUBPROCESS_BUCKETS,
+)
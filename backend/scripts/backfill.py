@@ -0,0 +1,209 @@
+"""
+Backfill / reindex of TokenCreationEvents.
+
+Walks suix_queryEvents for the factory's TokenCreationEvent on each network from
+genesis (or from the progress saved by an earlier run) and reconciles every event
+with the token database:
+
+    existing   the (network, creator, symbol, name) key already has a package_id;
+               the event is only marked processed
+    recovered  --recover-packages found the package this backend published for it;
+               the token record is written without redeploying
+    pending    the key has a queued or running deploy job; left alone
+    missing    no package known and no live deploy job (including reservations
+               orphaned by a failed or lost job); queued for deployment only with
+               --deploy-missing (picked up by the running backend's deploy workers)
+
+--recover-packages walks the publisher's transactions (suix_queryTransactionBlocks
+FromAddress) and matches each published package to an event by the TreasuryCap's
+initial owner (the creator) and the CoinMetadata symbol and name.
+
+Event pages are cursor-chained, so one network's history is walked as a single
+sequence: the next page is fetched while the previous one is written, and networks
+run in parallel up to --concurrency. Each page is written in one transaction
+together with its cursor, so an interrupted run resumes where it stopped (--reset
+starts over). --from-checkpoint skips events older than that checkpoint's timestamp.
+It can run alongside the backend on the same database file: the server adds the
+recovered records to its resident index within TOKEN_INDEX_REFRESH_INTERVAL.
+
+    python -m scripts.backfill --network testnet --recover-packages
+    python -m scripts.backfill --from-checkpoint 1200000 --deploy-missing
+"""
+import argparse
+import asyncio
+import json
+import time
+from database import get_event_cursor, get_live_deploy_jobs, get_token_key_packages, normalize_address, save_backfill_page
+from scripts.event_listener import (
+    EVENT_STRUCT,
+    MODULE_NAME,
+    NETWORK_CONFIGS,
+    parse_token_creation_event,
+)
+from scripts.deploy_queue import enqueue_token_event
+from scripts.sui_rpc import get_rpc_client, run_sync
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+PAGE_SIZE = 50  # suix_queryEvents / suix_queryTransactionBlocks maximum
+
+
+def _recovery_key(creator, symbol, name):
+    return (normalize_address(creator), symbol or '', name or '')
+
+
+async def recover_packages(client, publisher, since_ms=None):
+    """
+    (creator, symbol, name) -> package fields for every token package published by
+    publisher; with since_ms, only transactions from that time on (newest first).
+    """
+    found = {}
+    cursor = None
+    query = {"filter": {"FromAddress": publisher}, "options": {"showObjectChanges": True}}
+    descending = since_ms is not None
+    while True:
+        page = await client.call("suix_queryTransactionBlocks", [query, cursor, PAGE_SIZE, descending]) or {}
+        published = []
+        reached_since = False
+        for tx in page.get('data', []):
+            if descending and int(tx.get('timestampMs') or 0) < since_ms:
+                reached_since = True
+                break
+            changes = tx.get('objectChanges') or []
+            package = next((c for c in changes if c.get('type') == 'published'), None)
+            created = [c for c in changes if c.get('type') == 'created']
+            cap = next((c for c in created if c.get('objectType', '').startswith('0x2::coin::TreasuryCap<')), None)
+            metadata = next((c for c in created if c.get('objectType', '').startswith('0x2::coin::CoinMetadata<')), None)
+            if package and cap and metadata:
+                published.append((package, cap, metadata))
+        if published:
+            objects = await client.call("sui_multiGetObjects", [[m['objectId'] for _, _, m in published], {"showContent": True}])
+            for (package, cap, _), obj in zip(published, objects or []):
+                fields = (((obj or {}).get('data') or {}).get('content') or {}).get('fields') or {}
+                creator = (cap.get('owner') or {}).get('AddressOwner')
+                found[_recovery_key(creator, fields.get('symbol'), fields.get('name'))] = {
+                    "package_id": package['packageId'],
+                    "treasury_cap_id": cap['objectId'],
+                }
+        if reached_since or not page.get('hasNextPage'):
+            return found
+        cursor = page.get('nextCursor')
+
+
+def find_published_package(url, publisher, creator, symbol, name, since_ms):
+    """Package fields for the (creator, symbol, name) token if publisher published it since since_ms, else None."""
+    found = run_sync(lambda: recover_packages(get_rpc_client(url), publisher, since_ms))
+    return found.get(_recovery_key(creator, symbol, name))
+
+
+def reconcile_page(network, events, next_cursor, cursor_key, recovered, deploy_missing, min_timestamp_ms, stats):
+    """Reconcile one page of events and save it with its cursor (runs in a worker thread)."""
+    parsed = []
+    for event in events:
+        if min_timestamp_ms and int(event.get('timestampMs') or 0) < min_timestamp_ms:
+            stats["before_checkpoint"] += 1
+            continue
+        parsed.append((event, parse_token_creation_event(event)))
+    keys = [(network, p['creator'], p['symbol'], p['name']) for _, p in parsed]
+    reserved = get_token_key_packages(keys)
+    live = get_live_deploy_jobs(k for k in keys if k in reserved and not reserved[k])
+
+    tokens, done = [], []
+    for (event, params), key in zip(parsed, keys):
+        event_id = (event['id']['txDigest'], event['id']['eventSeq'])
+        package = recovered.get(_recovery_key(params['creator'], params['symbol'], params['name']))
+        if reserved.get(key):
+            stats["existing"] += 1
+            done.append(event_id)
+        elif package:
+            stats["recovered"] += 1
+            tokens.append({**params, **package, "network": network, "event_id": f"{event_id[0]}:{event_id[1]}"})
+            done.append(event_id)
+        elif key in live:
+            stats["pending"] += 1
+        elif deploy_missing:
+            # Reserves the key (or keeps a stale reservation) and marks the event processed
+            job_id = enqueue_token_event(network, {**params, "event_id": f"{event_id[0]}:{event_id[1]}"}, event_id,
+                                         requeue=True)
+            stats["queued" if job_id is not None else "pending"] += 1
+        else:
+            stats["missing"] += 1
+    save_backfill_page(network, cursor_key, next_cursor, tokens, done)
+    stats["events"] += len(events)
+    stats["pages"] += 1
+
+
+async def backfill_network(network, config, args, publisher, semaphore):
+    async with semaphore:
+        started = time.perf_counter()
+        client = get_rpc_client(config["url"])
+        cursor_key = f"backfill:{config['package_id']}"
+        query = {"MoveEventType": f"{config['package_id']}::{MODULE_NAME}::{EVENT_STRUCT}"}
+        cursor = None if args.reset else get_event_cursor(network, cursor_key)
+        stats = {key: 0 for key in ("events", "pages", "existing", "recovered", "pending", "missing", "queued",
+                                    "before_checkpoint")}
+
+        min_timestamp_ms = None
+        if args.from_checkpoint is not None:
+            checkpoint = await client.call("sui_getCheckpoint", [str(args.from_checkpoint)])
+            min_timestamp_ms = int(checkpoint['timestampMs'])
+
+        def fetch(after):
+            return asyncio.ensure_future(client.call("suix_queryEvents", [query, after, PAGE_SIZE, False]))
+
+        # The publisher walk and the first event page run concurrently
+        recovery = recover_packages(client, publisher) if publisher else asyncio.sleep(0, result={})
+        recovered, page = await asyncio.gather(recovery, fetch(cursor))
+        stats["packages_found"] = len(recovered)
+        loop = asyncio.get_running_loop()
+        while True:
+            events = page.get('data', [])
+            next_cursor = page.get('nextCursor') or cursor
+            has_next = page.get('hasNextPage') and events
+            prefetch = fetch(next_cursor) if has_next else None
+            await loop.run_in_executor(None, reconcile_page, network, events, next_cursor, cursor_key, recovered,
+                                       args.deploy_missing, min_timestamp_ms, stats)
+            logger.info("Backfill page saved", extra={"network": network, "events": stats["events"],
+                                                      "sample": f"backfill-{network}"})
+            cursor = next_cursor
+            if prefetch is None:
+                break
+            page = await prefetch
+        stats["seconds"] = time.perf_counter() - started
+        return stats
+
+
+async def backfill(args):
+    networks = args.network or list(NETWORK_CONFIGS)
+    publisher = None
+    if args.recover_packages:
+        from scripts.gas_pool import active_address
+        publisher = args.publisher or active_address()
+    semaphore = asyncio.Semaphore(max(1, args.concurrency))
+    results = await asyncio.gather(
+        *(backfill_network(n, NETWORK_CONFIGS[n], args, publisher, semaphore) for n in networks),
+        return_exceptions=True,
+    )
+    return {
+        network: ({"error": str(result)} if isinstance(result, Exception) else result)
+        for network, result in zip(networks, results)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill and reconcile TokenCreationEvents into the token database.")
+    parser.add_argument("--network", action="append", choices=sorted(NETWORK_CONFIGS), help="Network to walk (repeatable; default all)")
+    parser.add_argument("--from-checkpoint", type=int, help="Skip events older than this checkpoint")
+    parser.add_argument("--reset", action="store_true", help="Ignore saved progress and walk from genesis")
+    parser.add_argument("--recover-packages", action="store_true", help="Recover package ids from the publisher's transactions")
+    parser.add_argument("--publisher", help="Address that published token packages (default: sui client active-address)")
+    parser.add_argument("--deploy-missing", action="store_true", help="Queue deployments for events with no known package")
+    parser.add_argument("--concurrency", type=int, default=2, help="Networks walked at the same time")
+    args = parser.parse_args()
+    result = asyncio.run(backfill(args))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
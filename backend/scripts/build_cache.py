@@ -0,0 +1,92 @@
+import hashlib
+import os
+import shutil
+import threading
+from config import BUILD_CACHE_DIR, BUILD_CACHE_MAX_ENTRIES, MOVE_HOME_DIR
+
+# Generated token packages differ only in substituted literals, so most builds repeat
+# work. Build outputs are cached under a content hash of Move.toml + sources, and every
+# sui invocation shares one MOVE_HOME so the Sui framework dependency is fetched once.
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "build_seconds": 0.0, "saved_seconds": 0.0}
+
+def sui_env():
+    """Environment for sui CLI calls: shared, pre-resolved Move dependency directory."""
+    os.makedirs(MOVE_HOME_DIR, exist_ok=True)
+    return {**os.environ, "MOVE_HOME": MOVE_HOME_DIR}
+
+def _package_files(package_dir):
+    sources_dir = os.path.join(package_dir, "sources")
+    return [os.path.join(package_dir, "Move.toml")] + [
+        os.path.join(sources_dir, name) for name in sorted(os.listdir(sources_dir))
+    ]
+
+def package_hash(package_dir):
+    digest = hashlib.sha256()
+    for path in _package_files(package_dir):
+        digest.update(os.path.relpath(path, package_dir).encode())
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def package_size(package_dir):
+    """Bytes of Move.toml + sources; publish storage cost grows with it."""
+    return sum(os.path.getsize(path) for path in _package_files(package_dir))
+
+def _entry_dir(key):
+    return os.path.join(BUILD_CACHE_DIR, key)
+
+def _avg_build_seconds():
+    return _stats["build_seconds"] / _stats["misses"] if _stats["misses"] else 0.0
+
+def restore_build(key, package_dir):
+    """Copy a cached build into package_dir. Returns True on a cache hit."""
+    entry = _entry_dir(key)
+    if not os.path.isdir(os.path.join(entry, "build")):
+        with _stats_lock:
+            _stats["misses"] += 1
+        return False
+    shutil.copytree(os.path.join(entry, "build"), os.path.join(package_dir, "build"), dirs_exist_ok=True)
+    lock_file = os.path.join(entry, "Move.lock")
+    if os.path.exists(lock_file):
+        shutil.copy2(lock_file, os.path.join(package_dir, "Move.lock"))
+    os.utime(entry)
+    with _stats_lock:
+        _stats["hits"] += 1
+        _stats["saved_seconds"] += _avg_build_seconds()
+    return True
+
+def store_build(key, package_dir, build_seconds):
+    """Record a successful build of package_dir under key."""
+    with _stats_lock:
+        _stats["build_seconds"] += build_seconds
+    entry = _entry_dir(key)
+    staging = f"{entry}.{os.getpid()}.{threading.get_ident()}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    shutil.copytree(os.path.join(package_dir, "build"), os.path.join(staging, "build"))
+    lock_file = os.path.join(package_dir, "Move.lock")
+    if os.path.exists(lock_file):
+        shutil.copy2(lock_file, os.path.join(staging, "Move.lock"))
+    try:
+        os.rename(staging, entry)
+    except OSError:
+        # Another worker stored the same key first
+        shutil.rmtree(staging, ignore_errors=True)
+    _prune()
+
+def _prune():
+    entries = [e for e in os.scandir(BUILD_CACHE_DIR) if e.is_dir() and not e.name.endswith(".tmp")]
+    if len(entries) <= BUILD_CACHE_MAX_ENTRIES:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    for entry in entries[:len(entries) - BUILD_CACHE_MAX_ENTRIES]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+def build_cache_stats():
+    with _stats_lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            **_stats,
+            "hit_rate": _stats["hits"] / lookups if lookups else 0.0,
+        }
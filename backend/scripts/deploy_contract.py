@@ -1,8 +1,17 @@
 from config import SUI_CLI_PATH
 import subprocess
 import os
+import time
 import uuid
-from scripts.move_package_utils import create_move_package, cleanup_package
+from scripts.move_package_utils import create_move_package, cleanup_package, create_workspace
+from scripts.build_cache import package_hash, package_size, restore_build, store_build, sui_env
+from scripts.move_template import render_token_module
+from scripts.gas_pool import gas_lease, gas_spent
+from scripts.gas_estimate import GasEstimateError, estimate_gas_budget, publish_key, record_gas_used, invalidate_gas_estimate
+from metrics import SUI_COMMAND_SECONDS
+from logger import get_logger
+
+logger = get_logger(__name__)
 
 # def deploy_move_contract(move_code, module_name, deployer_address, private_key):
 #     """
@@ -42,71 +51,92 @@ from scripts.move_package_utils import create_move_package, cleanup_package
 def generate_token_contract(name, symbol, decimals, initial_supply, metadata_uri, description, deployer_address, module_name=None):
     """
     Generate a Move contract for a custom Sui token with the given parameters using the static template.
-    Returns the path to the contract directory.
+    Returns the path to the contract directory, inside a fresh per-deployment workspace
+    (see move_package_utils.create_workspace).
     """
-    import os
-    import re
-    # Read the Move template
-    template_path = os.path.join(os.path.dirname(__file__), "../templates/fungible_token_template.move")
-    with open(template_path, "r") as f:
-        template = f.read()
-
-    # Determine module_name (default: sanitized symbol)
+    # Determine module_name (default: token symbol; upper for witness, lower for module)
     if not module_name:
-        # Use token symbol for both module name and witness struct (upper for witness, lower for module)
-        token_name = symbol.lower()
-        token_name_upper = symbol.upper()
-        module_name = token_name
-    else:
-        token_name = module_name.lower()
-        token_name_upper = module_name.upper()
+        module_name = symbol
 
-    move_code = (
-        template
-        .replace("{{token_name}}", token_name)
-        .replace("{{token_name_upper}}", token_name_upper)
-        .replace("{{name}}", name)
-        .replace("{{symbol}}", symbol)
-        .replace("{{description}}", description)
-        .replace("{{icon_url}}", metadata_uri)
-        .replace("{{decimals}}", str(decimals))
-        .replace("{{initial_supply}}", str(initial_supply))
-        .replace("{{deployer_address}}", deployer_address)
+    file_name = "token_contract"
+    move_code = render_token_module(
+        package_name=file_name,
+        module_name=module_name,
+        name=name,
+        symbol=symbol,
+        description=description,
+        icon_url=metadata_uri,
+        decimals=decimals,
+        initial_supply=initial_supply,
+        deployer_address=deployer_address,
     )
 
-    file_name = "token_contract"
-    package_root = "/tmp/sui_move_packages"
-    os.makedirs(package_root, exist_ok=True)
+    package_root = create_workspace()
     package_dir = create_move_package(package_root, file_name, move_code)
     return package_dir
 
-def deploy_token_contract(contract_dir, creator_address):
+def deploy_token_contract(contract_dir, creator_address, on_publish=None):
     """
     Deploy the generated Move contract to Sui and return package_id.
+    on_publish, if given, is called once the build succeeded and publishing starts.
+    Failures from then on carry publish_attempted: the package may be on chain, so
+    the caller must not simply publish again.
     """
+    publish_attempted = False
     try:
-        # Build the Move package
-        build_cmd = [SUI_CLI_PATH, "move", "build", "--path", contract_dir]
-        build_result = subprocess.run(build_cmd, capture_output=True, text=True)
-        print(f"[DeployContract] Build stdout:\n{build_result.stdout}")
-        print(f"[DeployContract] Build stderr:\n{build_result.stderr}")
-        if build_result.returncode != 0:
-            return {'success': False, 'error': f"Build failed: {build_result.stderr}"}
+        env = sui_env()
+        # Build the Move package, unless an identical package was built before
+        build_key = package_hash(contract_dir)
+        if restore_build(build_key, contract_dir):
+            logger.info("Build cache hit; skipping sui move build", extra={"build_key": build_key[:12]})
+        else:
+            build_cmd = [SUI_CLI_PATH, "move", "build", "--skip-fetch-latest-git-deps", "--path", contract_dir]
+            build_started = time.monotonic()
+            with SUI_COMMAND_SECONDS.time(command="move build"):
+                build_result = subprocess.run(build_cmd, capture_output=True, text=True, env=env)
+            logger.debug("sui move build output", extra={"stdout": build_result.stdout, "stderr": build_result.stderr})
+            if build_result.returncode != 0:
+                logger.error("sui move build failed", extra={"stderr": build_result.stderr[-4000:]})
+                return {'success': False, 'error': f"Build failed: {build_result.stderr}"}
+            store_build(build_key, contract_dir, time.monotonic() - build_started)
         # Publish the package (NO --key-file, NO --path, just package_dir as positional argument)
         publish_cmd = [
             SUI_CLI_PATH, "client", "publish",
-            "--gas-budget", "100000000",
             "--json",
+            "--skip-fetch-latest-git-deps",
             contract_dir
         ]
-        publish_result = subprocess.run(publish_cmd, capture_output=True, text=True)
-        print(f"[DeployContract] Publish stdout:\n{publish_result.stdout}")
-        print(f"[DeployContract] Publish stderr:\n{publish_result.stderr}")
-        if publish_result.returncode != 0:
-            return {'success': False, 'error': f"Publish failed: {publish_result.stderr}"}
-        output = publish_result.stdout
-        import json
-        resp = json.loads(output)
+        # Gas budget from a dry run (cached per template, scaled by package size), which also
+        # catches a failing publish early
+        size = package_size(contract_dir)
+        try:
+            gas_budget = estimate_gas_budget(publish_key(), publish_cmd, env=env, size=size)
+        except GasEstimateError as e:
+            logger.error("sui client publish dry run failed", extra={"error": str(e)})
+            return {'success': False, 'error': f"Publish dry run failed: {e}"}
+        if on_publish:
+            on_publish()
+        publish_attempted = True
+        # Pay with a gas coin leased from the pool so concurrent publishes don't share one
+        with gas_lease(None, gas_budget) as lease:
+            with SUI_COMMAND_SECONDS.time(command="client publish"):
+                publish_result = subprocess.run(
+                    publish_cmd + ["--gas-budget", str(gas_budget), *lease.args()], capture_output=True, text=True, env=env
+                )
+            logger.debug("sui client publish output", extra={"stdout": publish_result.stdout, "stderr": publish_result.stderr})
+            if publish_result.returncode != 0:
+                logger.error("sui client publish failed", extra={"stderr": publish_result.stderr[-4000:]})
+                invalidate_gas_estimate(publish_key())
+                return {'success': False, 'publish_attempted': True, 'error': f"Publish failed: {publish_result.stderr}"}
+            output = publish_result.stdout
+            import json
+            resp = json.loads(output)
+            # Gas bookkeeping must not turn a published package into a failure
+            try:
+                lease.spent = gas_spent(resp)
+                record_gas_used(publish_key(), resp, size=size)
+            except Exception as e:
+                logger.warning("Publish gas accounting failed: %s", e)
         package_id = None
         treasury_cap_id = None
         # Find package_id and treasury_cap_id
@@ -117,8 +147,8 @@ def deploy_token_contract(contract_dir, creator_address):
                 treasury_cap_id = obj.get('objectId')
         return {'success': True, 'package_id': package_id, 'treasury_cap_id': treasury_cap_id}
     except Exception as e:
-        print(f"[DeployContract] Exception: {e}")
-        return {'success': False, 'error': str(e)}
+        logger.exception("Deploy failed: %s", e)
+        return {'success': False, 'publish_attempted': publish_attempted, 'error': str(e)}
     finally:
-        # cleanup_package(contract_dir)
+        # The workspace is released by the caller (deploy_queue) once the job is finished
         pass
@@ -0,0 +1,252 @@
+import random
+import threading
+import time
+from config import DEPLOY_WORKERS, DEPLOY_MAX_ATTEMPTS, DEPLOY_RETRY_BASE_DELAY
+from database import (
+    add_token_record,
+    claim_deploy_job,
+    enqueue_deploy_job,
+    get_deploy_jobs,
+    next_deploy_job_time,
+    release_token_reservation,
+    requeue_interrupted_deploy_jobs,
+    requeue_token_event,
+    reserve_token_event_job,
+    update_deploy_job,
+)
+from scripts.move_package_utils import release_workspace, workspace_of
+from metrics import DEPLOY_JOB_SECONDS
+from logger import get_logger, correlate
+
+logger = get_logger(__name__)
+
+# Job lifecycle: queued -> building -> publishing -> done
+#                                    \-> queued (retry with backoff) -> ... -> failed
+#
+# Only failures before publishing starts are retried. Once a job is publishing it
+# is never published again, since a publish that reached the chain would mint the
+# token twice: a returned package is recorded; otherwise (publish failed, crash or
+# restart) the package is looked up in the publisher's transactions since the job
+# started and either recorded (done) or the job fails with the key still reserved,
+# for scripts/backfill.py --deploy-missing to pick up.
+DEPLOY_JOB_STATES = ("queued", "building", "publishing", "done", "failed")
+
+_wakeup = threading.Condition()
+_workers = []
+_workers_lock = threading.Lock()
+
+def enqueue_deployment(network, token_params):
+    """
+    Persist a deployment job for a TokenCreationEvent and wake a worker.
+    token_params holds the decoded event fields (creator, name, symbol, decimals,
+    initial_supply, metadata_uri, description). Returns the job id.
+    """
+    job_id = enqueue_deploy_job(network, token_params)
+    with _wakeup:
+        _wakeup.notify()
+    return job_id
+
+def enqueue_token_event(network, token_params, event_id, requeue=False):
+    """
+    Claim a TokenCreationEvent (event_id is (txDigest, eventSeq)) and persist its
+    deployment job in one transaction, then wake a worker. Returns the job id, or
+    None if the event or its (network, creator, symbol, name) key was already taken.
+    requeue (backfill --deploy-missing) also takes already processed events and
+    stale reservations, skipping only keys with a package or a live job.
+    """
+    if requeue:
+        job_id = requeue_token_event(network, token_params, event_id)
+    else:
+        job_id = reserve_token_event_job(network, token_params, event_id)
+    if job_id is not None:
+        with _wakeup:
+            _wakeup.notify()
+    return job_id
+
+class PublishAttemptFailed(Exception):
+    """The publish was submitted but did not return a package; it may be on chain."""
+
+
+class PublishedNotRecorded(Exception):
+    """The package was published but its token record could not be written."""
+
+    def __init__(self, token_info, error):
+        super().__init__(str(error))
+        self.token_info = token_info
+
+def _retry_delay(attempts):
+    return DEPLOY_RETRY_BASE_DELAY * (2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+
+def _token_info(job, package):
+    params = job['params']
+    return {
+        "creator": params['creator'],
+        "name": params['name'],
+        "symbol": params['symbol'],
+        "decimals": params['decimals'],
+        "description": params['description'],
+        "metadata_uri": params['metadata_uri'],
+        "initial_supply": params['initial_supply'],
+        "network": job['network'],
+        "package_id": package.get('package_id'),
+        "treasury_cap_id": package.get('treasury_cap_id'),
+        # Correlation ids: the source event and the job that deployed it
+        "event_id": params.get('event_id'),
+        "deploy_job_id": job['id'],
+    }
+
+def _run_job(job):
+    from scripts.deploy_contract import generate_token_contract, deploy_token_contract
+    params = job['params']
+    creator = params['creator']
+
+    contract_dir = generate_token_contract(
+        name=params['name'],
+        symbol=params['symbol'],
+        decimals=params['decimals'],
+        initial_supply=params['initial_supply'],
+        metadata_uri=params['metadata_uri'],
+        description=params['description'],
+        deployer_address=creator,
+        module_name=None
+    )
+    logger.debug("Contract package generated", extra={"contract_dir": contract_dir})
+
+    try:
+        deploy_result = deploy_token_contract(
+            contract_dir,
+            creator,
+            on_publish=lambda: update_deploy_job(job['id'], 'publishing'),
+        )
+    finally:
+        release_workspace(workspace_of(contract_dir))
+    if not deploy_result.get('success'):
+        if deploy_result.get('publish_attempted'):
+            raise PublishAttemptFailed(deploy_result.get('error'))
+        raise RuntimeError(deploy_result.get('error'))
+
+    token_info = _token_info(job, deploy_result)
+    try:
+        add_token_record(token_info)
+    except Exception as e:
+        raise PublishedNotRecorded(token_info, e)
+    return token_info
+
+def _record_published(job, token_info, attempts=3):
+    """Record a published package, retrying the write; never republishes."""
+    for attempt in range(1, attempts + 1):
+        try:
+            add_token_record(token_info)
+            update_deploy_job(job['id'], 'done', result=token_info)
+            return True
+        except Exception as e:
+            error = e
+            time.sleep(attempt)
+    logger.error("Published package could not be recorded: %s", error, extra={"package_id": token_info['package_id']})
+    update_deploy_job(job['id'], 'failed', last_error=f"Published but not recorded: {error}", result=token_info)
+    return False
+
+def _resolve_publish(job, publisher, clock_skew=300):
+    """Find a job's package on chain after an uncertain publish and record it, or fail the job keeping its key."""
+    from scripts.backfill import find_published_package
+    from scripts.event_listener import NETWORK_CONFIGS
+    params = job['params']
+    package = find_published_package(
+        NETWORK_CONFIGS[job['network']]['url'], publisher, params['creator'], params['symbol'],
+        params['name'], (job['updated_at'] - clock_skew) * 1000,
+    )
+    if package:
+        logger.info("Found published package on chain", extra={"package_id": package['package_id']})
+        return _record_published(job, _token_info(job, package))
+    update_deploy_job(job['id'], 'failed', last_error="Publish not confirmed; no package found on chain")
+    logger.warning("Publish not found on chain; job failed with its key still reserved")
+    return False
+
+def reconcile_interrupted_publishes():
+    """Resolve jobs a previous process left in 'publishing' from the publisher's on-chain transactions."""
+    from scripts.gas_pool import active_address
+    jobs = get_deploy_jobs('publishing')
+    if not jobs:
+        return
+    publisher = active_address()
+    for job in jobs:
+        with correlate(job_id=job['id'], event_id=job['params'].get('event_id'), network=job['network']):
+            try:
+                _resolve_publish(job, publisher)
+            except Exception as e:
+                logger.warning("Could not reconcile interrupted publish: %s", e)
+
+def _process(job):
+    with correlate(job_id=job['id'], event_id=job['params'].get('event_id'), network=job['network']):
+        _process_job(job)
+
+def _process_job(job):
+    started = time.perf_counter()
+    try:
+        token_info = _run_job(job)
+    except PublishedNotRecorded as e:
+        recorded = _record_published(job, e.token_info)
+        DEPLOY_JOB_SECONDS.observe(time.perf_counter() - started, outcome="success" if recorded else "error")
+        return
+    except PublishAttemptFailed as e:
+        DEPLOY_JOB_SECONDS.observe(time.perf_counter() - started, outcome="error")
+        logger.warning("Publish failed after submission: %s; checking the chain instead of retrying", e)
+        try:
+            from scripts.gas_pool import active_address
+            _resolve_publish(job, active_address())
+        except Exception as e:
+            # Left in 'publishing'; reconcile_interrupted_publishes retries at the next start
+            logger.error("Could not check the chain for the publish: %s", e)
+        return
+    except Exception as e:
+        DEPLOY_JOB_SECONDS.observe(time.perf_counter() - started, outcome="error")
+        params = job['params']
+        if job['attempts'] < DEPLOY_MAX_ATTEMPTS:
+            delay = _retry_delay(job['attempts'])
+            logger.warning("Deploy attempt failed: %s; retrying in %.0fs", e, delay, extra={"attempt": job['attempts']})
+            update_deploy_job(job['id'], 'queued', next_run_at=time.time() + delay, last_error=str(e))
+        else:
+            logger.error("Deploy job failed: %s", e, extra={"attempt": job['attempts']})
+            update_deploy_job(job['id'], 'failed', last_error=str(e))
+            release_token_reservation(job['network'], params['creator'], params['symbol'], params['name'])
+        return
+    DEPLOY_JOB_SECONDS.observe(time.perf_counter() - started, outcome="success")
+    logger.info("Deploy job done", extra={"package_id": token_info['package_id']})
+    update_deploy_job(job['id'], 'done', result=token_info)
+
+def _worker_loop(worker_id, max_idle_wait=30):
+    while True:
+        try:
+            job = claim_deploy_job()
+            if job is None:
+                next_at = next_deploy_job_time()
+                wait = max_idle_wait if next_at is None else min(max(next_at - time.time(), 0.1), max_idle_wait)
+                with _wakeup:
+                    _wakeup.wait(wait)
+                continue
+            _process(job)
+        except Exception as e:
+            logger.exception("Deploy worker %s error: %s", worker_id, e)
+            time.sleep(1)
+
+def _reconcile_in_background():
+    try:
+        reconcile_interrupted_publishes()
+    except Exception as e:
+        logger.warning("Interrupted publish reconciliation failed: %s", e)
+
+def start_deploy_workers(num_workers=DEPLOY_WORKERS):
+    """Start the deploy worker pool once per process; re-queues jobs interrupted by a restart."""
+    with _workers_lock:
+        if _workers:
+            return _workers
+        requeued = requeue_interrupted_deploy_jobs()
+        if requeued:
+            logger.info("Re-queued interrupted deploy jobs", extra={"count": requeued})
+        threading.Thread(target=_reconcile_in_background, name="deploy-reconcile", daemon=True).start()
+        for worker_id in range(num_workers):
+            thread = threading.Thread(target=_worker_loop, args=(worker_id,), daemon=True)
+            _workers.append(thread)
+            thread.start()
+        logger.info("Started deploy workers", extra={"workers": num_workers})
+        return _workers
@@ -1,17 +1,41 @@
+import asyncio
+import json
 import time
 import threading
-from typing import Callable
-import requests
-from database import add_token_record, get_all_tokens
+from collections import OrderedDict
+from config import (
+    EVENT_LISTENER_RESUME,
+    EVENT_DEDUP_WINDOW,
+    EVENT_PAGE_SIZE,
+    LISTENER_MIN_POLL_INTERVAL,
+    LISTENER_BASE_POLL_INTERVAL,
+    LISTENER_MAX_POLL_INTERVAL,
+    EVENT_STREAMING,
+    EVENT_STREAM_RETRY_INTERVAL,
+)
+from database import get_event_cursor, save_event_cursor
+from scripts.sui_rpc import get_rpc_client
+from scripts.deploy_queue import enqueue_token_event, start_deploy_workers
+from metrics import EVENTS_PROCESSED, EVENT_INGESTION_LAG_SECONDS
+from logger import get_logger, correlate
+
+logger = get_logger(__name__)
+
+try:
+    import websockets  # optional: only needed for EVENT_STREAMING
+except ImportError:
+    websockets = None
 
 # A dictionary to hold the configurations for each network you want to watch
 NETWORK_CONFIGS = {
     "testnet": {
         "url": "https://fullnode.testnet.sui.io:443",
+        "ws_url": "wss://fullnode.testnet.sui.io:443",
         "package_id": "0x564792b9df6493b449f7c6e58431dbe6b286ad27e22075d0b6d188d8bb8ac6f4",
     },
     "mainnet": {
         "url": "https://fullnode.mainnet.sui.io:443",
+        "ws_url": "wss://fullnode.mainnet.sui.io:443",
         "package_id": "0x87674074df26ae54e80c328631a55b51e0122ada8a89a43a673c0f6be6bf7d51",  # TODO: Set after deployment on Mainnet
     }
 }
@@ -19,11 +43,9 @@ NETWORK_CONFIGS = {
 MODULE_NAME = "factory"
 EVENT_STRUCT = "TokenCreationEvent"
 
-# Callback signature now includes the network name
-def handle_token_creation_event(event: dict, network: str):
-    print(f"[EventListener][{network}] Callback received event: {event}")
+def parse_token_creation_event(event: dict):
+    """Decoded TokenCreationEvent fields (byte vectors as UTF-8 strings)."""
     event_fields = event.get('parsedJson', {})
-    print(f"[EventListener][{network}] Parsed fields: {event_fields}")
     creator = event_fields.get('creator')
     name = event_fields.get('name')
     symbol = event_fields.get('symbol')
@@ -48,137 +70,311 @@ def handle_token_creation_event(event: dict, network: str):
     if initial_supply is not None:
         initial_supply = str(initial_supply)
 
-    all_tokens = get_all_tokens()
-    duplicate = any(
-        t.get('creator') == creator and t.get('symbol') == symbol and t.get('name') == name
-        for t in all_tokens
-    )
-    if duplicate:
-        print(f"[EventListener][{network}][DEBUG] Duplicate token event detected for creator={creator}, symbol={symbol}, name={name}; skipping deploy and DB record.")
+    return {
+        "creator": creator,
+        "name": name,
+        "symbol": symbol,
+        "decimals": decimals,
+        "description": description,
+        "metadata_uri": metadata_uri,
+        "initial_supply": initial_supply,
+    }
+
+# Callback signature now includes the network name
+def handle_token_creation_event(event: dict, network: str):
+    logger.debug("Received TokenCreationEvent", extra={"network": network, "event": event})
+    params = parse_token_creation_event(event)
+    creator, name, symbol = params['creator'], params['name'], params['symbol']
+
+    event_id = (event.get('id', {}).get('txDigest'), event.get('id', {}).get('eventSeq'))
+    job_id = enqueue_token_event(network, {**params, "event_id": f"{event_id[0]}:{event_id[1]}"}, event_id)
+    if job_id is None:
+        logger.info("Duplicate token event; skipping deploy", extra={
+            "network": network, "creator": creator, "symbol": symbol, "token_name": name,
+        })
         return
 
-    try:
-        from scripts.deploy_contract import generate_token_contract, deploy_token_contract
-        print(f"[EventListener][{network}] Calling generate_token_contract...")
-        contract_dir = generate_token_contract(
-            name=name,
-            symbol=symbol,
-            decimals=decimals,
-            initial_supply=initial_supply,
-            metadata_uri=metadata_uri,
-            description=description,
-            deployer_address=creator,
-            module_name=None
-        )
-        print(f"[EventListener][{network}] Contract directory generated: {contract_dir}")
-
-        print(f"[EventListener][{network}] Calling deploy_token_contract...")
-        deploy_result = deploy_token_contract(contract_dir, creator)
-
-        if deploy_result.get('success'):
-            package_id = deploy_result.get('package_id')
-            treasury_cap_id = deploy_result.get('treasury_cap_id')
-            print(f"[EventListener][{network}][DEBUG] Contract deployed successfully! Package ID: {package_id}, TreasuryCap ID: {treasury_cap_id}")
-            token_info = {
-                "creator": creator,
-                "name": name,
-                "symbol": symbol,
-                "decimals": decimals,
-                "description": description,
-                "metadata_uri": metadata_uri,
-                "initial_supply": initial_supply,
-                "network": network,
-                "package_id": package_id,
-                "treasury_cap_id": treasury_cap_id
-            }
-            print(f"[EventListener][{network}][DEBUG] Token info: {token_info}")
-            add_token_record(token_info)
-        else:
-            print(f"[EventListener][{network}][DEBUG] Contract deployment failed: {deploy_result.get('error')}")
-    except Exception as e:
-        print(f"[EventListener][{network}] Failed to deploy contract: {e}")
-
-# This is the new, generic polling function
-def poll_events(network_name: str, fullnode_url: str, package_id: str, callback: Callable[[dict, str], None], poll_interval=5):
+    logger.info("Queued deploy job", extra={"network": network, "job_id": job_id, "symbol": symbol})
+
+class RecentEventIds:
+    """Bounded LRU of recently seen event ids; durable dedup lives in the database."""
+
+    def __init__(self, maxsize=EVENT_DEDUP_WINDOW):
+        self.maxsize = maxsize
+        self._ids = OrderedDict()
+
+    def __contains__(self, event_id):
+        if event_id in self._ids:
+            self._ids.move_to_end(event_id)
+            return True
+        return False
+
+    def add(self, event_id):
+        self._ids[event_id] = None
+        self._ids.move_to_end(event_id)
+        if len(self._ids) > self.maxsize:
+            self._ids.popitem(last=False)
+
+class Subscription:
     """
-    Polls a single Sui fullnode for TokenCreationEvent events.
+    One (network, package, event type) stream and its health.
+    The cursor is checkpointed per (network, event type) after every processed page.
     """
-    if package_id == "0x0":
-        print(f"[EventListener][{network_name}] WARNING: Package ID is a placeholder ('0x0'). Skipping event listener.")
-        return
 
-    print(f"[EventListener][{network_name}] Starting event listener for TokenCreationEvent...")
-    seen_event_ids = set()
-    cursor = None
-    
-    try:
-        payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "suix_queryEvents",
-            "params": [
-                {"MoveEventType": f"{package_id}::{MODULE_NAME}::{EVENT_STRUCT}"},
-                None,
-                1,
-                True
-            ]
+    def __init__(self, network, url, package_id, module, struct, handler, ws_url=None):
+        self.network = network
+        self.url = url
+        self.ws_url = ws_url
+        self.package_id = package_id
+        self.event_type = f"{package_id}::{module}::{struct}"
+        self.handler = handler
+        self.cursor = None
+        self.seen_event_ids = RecentEventIds()
+        self.interval = LISTENER_BASE_POLL_INTERVAL
+        self.status = "starting"
+        self.last_poll_at = None
+        self.last_event_at = None
+        self.last_error = None
+        self.consecutive_errors = 0
+        self.events_processed = 0
+
+    @property
+    def name(self):
+        return f"{self.network}:{self.event_type}"
+
+    def health(self):
+        return {
+            "network": self.network,
+            "event_type": self.event_type,
+            "status": self.status,
+            "cursor": self.cursor,
+            "poll_interval": self.interval,
+            "last_poll_at": self.last_poll_at,
+            "last_event_at": self.last_event_at,
+            "events_processed": self.events_processed,
+            "consecutive_errors": self.consecutive_errors,
+            "last_error": self.last_error,
         }
-        resp = requests.post(fullnode_url, json=payload, timeout=10)
-        resp.raise_for_status()
-        result = resp.json().get("result", {})
+
+
+def _next_interval(sub, events_fetched):
+    """Adaptive polling: no wait after a full page, minimum interval after a partial one, back off while idle."""
+    if events_fetched >= EVENT_PAGE_SIZE:
+        return 0
+    if events_fetched:
+        return LISTENER_MIN_POLL_INTERVAL
+    return min(max(sub.interval, LISTENER_MIN_POLL_INTERVAL) * 2, LISTENER_MAX_POLL_INTERVAL)
+
+
+class ListenerSupervisor:
+    """
+    Runs every subscription as a task on one asyncio event loop (in a single background
+    thread), sharing pooled RPC connections per fullnode. Handlers are sync and run in
+    worker threads so a slow handler only delays its own subscription.
+
+    With streaming enabled, subscriptions that have a ws_url receive events pushed over
+    a suix_subscribeEvent WebSocket. On disconnect they fall back to cursor polling from
+    the last checkpoint and retry the stream every EVENT_STREAM_RETRY_INTERVAL seconds.
+    """
+
+    def __init__(self, resume=EVENT_LISTENER_RESUME, streaming=EVENT_STREAMING):
+        self.resume = resume
+        self.streaming = streaming and websockets is not None
+        if streaming and websockets is None:
+            logger.warning("EVENT_STREAMING needs the 'websockets' package; using polling only")
+        self.subscriptions = []
+        self._thread = None
+
+    def add(self, network, url, package_id, module, struct, handler, ws_url=None):
+        if package_id == "0x0":
+            logger.warning("Package ID is a placeholder ('0x0'); skipping subscription",
+                           extra={"network": network, "event_type": f"{module}::{struct}"})
+            return None
+        sub = Subscription(network, url, package_id, module, struct, handler, ws_url)
+        self.subscriptions.append(sub)
+        return sub
+
+    async def _init_cursor(self, sub, client):
+        if self.resume:
+            sub.cursor = await asyncio.to_thread(get_event_cursor, sub.network, sub.event_type)
+            if sub.cursor is not None:
+                logger.info("Resuming from checkpointed cursor",
+                            extra={"network": sub.network, "event_type": sub.event_type, "cursor": sub.cursor})
+                return
+        result = await client.call("suix_queryEvents", [{"MoveEventType": sub.event_type}, None, 1, True]) or {}
         if result.get("data"):
-            cursor = result.get("nextCursor", None)
-            print(f"[EventListener][{network_name}] Initial cursor set to {cursor} (skipping historical events)")
-    except Exception as e:
-        print(f"[EventListener][{network_name}] Error initializing cursor: {e}")
-
-    while True:
-        try:
-            print(f"[EventListener][{network_name}] Polling for events with cursor: {cursor}")
-            payload = {
+            sub.cursor = result.get("nextCursor")
+            logger.info("Initial cursor set; skipping historical events",
+                        extra={"network": sub.network, "event_type": sub.event_type, "cursor": sub.cursor})
+            await asyncio.to_thread(save_event_cursor, sub.network, sub.event_type, sub.cursor)
+
+    def _handle_event(self, sub, event):
+        """Run the handler once per event id; returns False for repeats."""
+        event_id = (event.get("id", {}).get("txDigest"), event.get("id", {}).get("eventSeq"))
+        if event_id in sub.seen_event_ids:
+            return False
+        with correlate(event_id=f"{event_id[0]}:{event_id[1]}", network=sub.network):
+            sub.handler(event, sub.network)
+        sub.seen_event_ids.add(event_id)
+        sub.events_processed += 1
+        EVENTS_PROCESSED.inc(network=sub.network)
+        if event.get("timestampMs"):
+            EVENT_INGESTION_LAG_SECONDS.observe(time.time() - int(event["timestampMs"]) / 1000, network=sub.network)
+        return True
+
+    def _process_page(self, sub, events, next_cursor):
+        for event in events:
+            self._handle_event(sub, event)
+        if next_cursor is not None:
+            save_event_cursor(sub.network, sub.event_type, next_cursor)
+
+    async def _ensure_cursor(self, sub, client):
+        while True:
+            try:
+                await self._init_cursor(sub, client)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                sub.consecutive_errors += 1
+                sub.last_error = str(e)
+                logger.warning("Error initializing cursor: %s", e,
+                               extra={"network": sub.network, "event_type": sub.event_type, "sample": f"cursor:{sub.name}"})
+                await asyncio.sleep(min(LISTENER_BASE_POLL_INTERVAL * sub.consecutive_errors, LISTENER_MAX_POLL_INTERVAL))
+
+    async def _poll_once(self, sub, client):
+        """Fetch and process one page after the current cursor; returns the number of events fetched."""
+        result = await client.call(
+            "suix_queryEvents", [{"MoveEventType": sub.event_type}, sub.cursor, EVENT_PAGE_SIZE, False]
+        ) or {}
+        events = result.get("data", [])
+        next_cursor = result.get("nextCursor")
+        sub.last_poll_at = time.time()
+        if events:
+            logger.debug("Fetched events", extra={"network": sub.network, "event_type": sub.event_type, "count": len(events)})
+            sub.last_event_at = sub.last_poll_at
+        await asyncio.to_thread(self._process_page, sub, events, next_cursor)
+        if next_cursor is not None:
+            sub.cursor = next_cursor
+        return len(events)
+
+    async def poll_subscription(self, sub, client, until=None):
+        """Cursor polling with adaptive intervals; returns once `until` (monotonic time) has passed."""
+        while until is None or time.monotonic() < until:
+            try:
+                fetched = await self._poll_once(sub, client)
+                sub.interval = _next_interval(sub, fetched)
+                sub.status = "ok"
+                sub.consecutive_errors = 0
+                sub.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                sub.consecutive_errors += 1
+                sub.last_error = str(e)
+                sub.status = "error" if sub.consecutive_errors >= 3 else "degraded"
+                sub.interval = min(LISTENER_BASE_POLL_INTERVAL * sub.consecutive_errors, LISTENER_MAX_POLL_INTERVAL)
+                logger.warning("Error polling events: %s", e,
+                               extra={"network": sub.network, "event_type": sub.event_type, "sample": f"poll:{sub.name}"})
+            if until is None:
+                await asyncio.sleep(sub.interval)
+            else:
+                await asyncio.sleep(max(min(sub.interval, until - time.monotonic()), 0))
+
+    def _process_stream_event(self, sub, event):
+        """Handle one pushed event; returns False for repeats already seen while catching up."""
+        if not self._handle_event(sub, event):
+            return False
+        save_event_cursor(sub.network, sub.event_type, event["id"])
+        return True
+
+    async def stream_subscription(self, sub, client):
+        """
+        Receive events over a WebSocket subscription until the connection drops.
+        Subscribes first, then polls from the checkpoint until caught up, so events
+        emitted before or during the handshake are not missed; repeats are dropped.
+        """
+        async with websockets.connect(sub.ws_url, ping_interval=20, ping_timeout=20) as ws:
+            await ws.send(json.dumps({
                 "jsonrpc": "2.0",
                 "id": 1,
-                "method": "suix_queryEvents",
-                "params": [
-                    {"MoveEventType": f"{package_id}::{MODULE_NAME}::{EVENT_STRUCT}"},
-                    cursor,
-                    20,
-                    False
-                ]
-            }
-            resp = requests.post(fullnode_url, json=payload, timeout=10)
-            resp.raise_for_status()
-            result = resp.json().get("result", {})
-            events = result.get("data", [])
-            next_cursor = result.get("nextCursor", None)
-            print(f"[EventListener][{network_name}] Fetched {len(events)} events.")
-            new_event_processed = False
-            for event in events:
-                event_id = (event.get("id", {}).get("txDigest"), event.get("id", {}).get("eventSeq"))
-                if event_id and event_id not in seen_event_ids:
-                    print(f"[EventListener][{network_name}] New event detected: {event_id}")
-                    seen_event_ids.add(event_id)
-                    callback(event, network_name) # Pass the network name to the callback
-                    new_event_processed = True
-            cursor = next_cursor
-            if not new_event_processed:
-                time.sleep(poll_interval)
-        except Exception as e:
-            print(f"[EventListener][{network_name}] Error polling for events: {e}")
-            time.sleep(poll_interval)
-
-# This is the new entry point that starts all listeners
+                "method": "suix_subscribeEvent",
+                "params": [{"MoveEventType": sub.event_type}],
+            }))
+            ack = json.loads(await ws.recv())
+            if ack.get("error"):
+                raise RuntimeError(f"suix_subscribeEvent rejected: {ack['error']}")
+            while await self._poll_once(sub, client) >= EVENT_PAGE_SIZE:
+                pass
+            sub.status = "streaming"
+            sub.consecutive_errors = 0
+            sub.last_error = None
+            logger.info("Streaming events", extra={"network": sub.network, "event_type": sub.event_type, "ws_url": sub.ws_url})
+            async for message in ws:
+                event = json.loads(message).get("params", {}).get("result")
+                if not event:
+                    continue
+                sub.last_event_at = time.time()
+                if await asyncio.to_thread(self._process_stream_event, sub, event):
+                    sub.cursor = event["id"]
+
+    async def run_subscription(self, sub):
+        client = get_rpc_client(sub.url)
+        await self._ensure_cursor(sub, client)
+        if not (self.streaming and sub.ws_url):
+            await self.poll_subscription(sub, client)
+            return
+        while True:
+            try:
+                await self.stream_subscription(sub, client)
+                sub.last_error = "stream closed"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                sub.last_error = str(e)
+            sub.consecutive_errors += 1
+            sub.status = "polling"
+            sub.interval = LISTENER_MIN_POLL_INTERVAL
+            logger.warning("Event stream unavailable (%s); falling back to polling", sub.last_error,
+                           extra={"network": sub.network, "event_type": sub.event_type, "sample": f"stream:{sub.name}"})
+            await self.poll_subscription(sub, client, until=time.monotonic() + EVENT_STREAM_RETRY_INTERVAL)
+
+    async def run(self):
+        await asyncio.gather(*(self.run_subscription(sub) for sub in self.subscriptions))
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=asyncio.run, args=(self.run(),), name="event-listener", daemon=True)
+            self._thread.start()
+            logger.info("Listener supervisor started", extra={"subscriptions": len(self.subscriptions)})
+        return self._thread
+
+    def health(self):
+        return [sub.health() for sub in self.subscriptions]
+
+
+# Event types followed on every network in NETWORK_CONFIGS
+EVENT_SUBSCRIPTIONS = [
+    (MODULE_NAME, EVENT_STRUCT, handle_token_creation_event),
+]
+
+_supervisor = None
+_supervisor_lock = threading.Lock()
+
 def start_event_listener():
-    print("[EventListener] start_all_listeners() called. Launching threads...")
-    threads = []
-    for network_name, config in NETWORK_CONFIGS.items():
-        thread = threading.Thread(
-            target=poll_events,
-            args=(network_name, config["url"], config["package_id"], handle_token_creation_event,),
-            daemon=True
-        )
-        threads.append(thread)
-        thread.start()
-        print(f"[EventListener] Background listener thread for {network_name} started!")
-    
-    return threads # Return threads if you need to manage their lifecycle
\ No newline at end of file
+    """Start the deploy workers and one listener supervisor for all networks (once per process)."""
+    global _supervisor
+    with _supervisor_lock:
+        if _supervisor is not None:
+            return _supervisor
+        start_deploy_workers()
+        supervisor = ListenerSupervisor()
+        for network_name, config in NETWORK_CONFIGS.items():
+            for module, struct, handler in EVENT_SUBSCRIPTIONS:
+                supervisor.add(network_name, config["url"], config["package_id"], module, struct, handler, config.get("ws_url"))
+        supervisor.start()
+        _supervisor = supervisor
+        return supervisor
+
+def listener_health():
+    return _supervisor.health() if _supervisor is not None else []
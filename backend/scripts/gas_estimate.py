@@ -0,0 +1,109 @@
+import json
+import math
+import subprocess
+from config import (
+    GAS_ESTIMATE_MARGIN,
+    GAS_ESTIMATE_TTL,
+    GAS_ESTIMATE_CACHE_SIZE,
+    GAS_BUDGET_MIN,
+    GAS_BUDGET_MAX,
+    GAS_DRY_RUN_BUDGET,
+)
+from database import get_token
+from metrics import Counter, SUI_COMMAND_SECONDS
+from scripts.move_template import template_hash
+from scripts.lru_cache import LRUCache, MISSING
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Gas budgets from dry runs instead of a fixed --gas-budget.
+#
+# Before a transaction is sent, the same sui command is run with --dry-run and the
+# simulated computation + storage cost (the part a budget must cover; the storage
+# rebate is only refunded afterwards) plus GAS_ESTIMATE_MARGIN becomes its budget.
+# A dry run that fails raises GasEstimateError, so a package that will not publish
+# or a call that will abort fails before anything is submitted.
+#
+# Packages rendered from the token template share their code, so estimates are
+# cached per (template hash, operation) for them and per (package id, operation)
+# for any other package. A transaction that then runs out of gas drops its entry.
+# Publish storage cost still grows with the substituted name, symbol, description
+# and icon url, so publish estimates are cached with the package size they were
+# measured at and scaled up for larger packages (never down).
+
+GAS_ESTIMATES = Counter("gas_estimates_total", "Gas budget lookups by result.", ("result",))
+
+
+class GasEstimateError(Exception):
+    """The dry run of a transaction failed."""
+
+
+_cache = LRUCache(GAS_ESTIMATE_CACHE_SIZE, ttl=GAS_ESTIMATE_TTL)
+
+def publish_key():
+    return (template_hash(), "publish")
+
+def call_key(package_id, operation):
+    """Cache key for a call into package_id; template-built packages share one estimate."""
+    if get_token(package_id) is not None:
+        return (template_hash(), operation)
+    return (package_id, operation)
+
+def _gas_needed(resp):
+    used = ((resp or {}).get('effects') or {}).get('gasUsed')
+    if not used:
+        return None
+    return int(used['computationCost']) + int(used['storageCost'])
+
+def _scaled(entry, size):
+    needed, measured_size = entry
+    if size and measured_size and size > measured_size:
+        return math.ceil(needed * size / measured_size)
+    return needed
+
+def _budget(needed):
+    return min(GAS_BUDGET_MAX, max(GAS_BUDGET_MIN, math.ceil(needed * (1 + GAS_ESTIMATE_MARGIN))))
+
+def estimate_gas_budget(key, cmd, env=None, size=None):
+    """
+    Gas budget (MIST) for the sui command line `cmd`, given without --gas-budget.
+    Served from the cache for `key` (scaled by `size`, e.g. the package size, when
+    given), otherwise dry-runs cmd. Raises GasEstimateError.
+    """
+    cached = _cache.get(key)
+    if cached is not MISSING:
+        GAS_ESTIMATES.inc(result="hit")
+        return _budget(_scaled(cached, size))
+    dry_run = cmd + ["--dry-run", "--gas-budget", str(GAS_DRY_RUN_BUDGET)]
+    with SUI_COMMAND_SECONDS.time(command=" ".join(cmd[1:3]) + " --dry-run"):
+        result = subprocess.run(dry_run, capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        GAS_ESTIMATES.inc(result="failed")
+        raise GasEstimateError(result.stderr.strip()[-2000:] or f"sui exited with {result.returncode}")
+    resp = json.loads(result.stdout)
+    status = (resp.get('effects') or {}).get('status') or {}
+    if status.get('status') != 'success':
+        GAS_ESTIMATES.inc(result="failed")
+        raise GasEstimateError(status.get('error') or 'dry run failed')
+    needed = _gas_needed(resp)
+    if needed is None:
+        GAS_ESTIMATES.inc(result="failed")
+        raise GasEstimateError('dry run reported no gas usage')
+    _cache.set(key, (needed, size))
+    GAS_ESTIMATES.inc(result="miss")
+    logger.debug("Gas estimated by dry run", extra={"operation": key[1], "gas_needed": needed, "budget": _budget(needed)})
+    return _budget(needed)
+
+def record_gas_used(key, resp, size=None):
+    """Raise the cached estimate if a real transaction needed more than simulated."""
+    needed = _gas_needed(resp)
+    cached = _cache.get(key)
+    if needed is not None and cached is not MISSING and needed > _scaled(cached, size):
+        _cache.set(key, (needed, size))
+
+def invalidate_gas_estimate(key):
+    _cache.pop(key)
+
+def gas_estimate_stats():
+    return _cache.stats()
@@ -0,0 +1,261 @@
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from config import (
+    SUI_CLI_PATH,
+    SUI_RPC_URL,
+    GAS_POOL_ENABLED,
+    GAS_POOL_OWNER,
+    GAS_POOL_SIZE,
+    GAS_POOL_COIN_BALANCE,
+    GAS_POOL_MIN_COIN_BALANCE,
+    GAS_POOL_REFRESH_INTERVAL,
+    GAS_POOL_LEASE_TIMEOUT,
+    GAS_POOL_REBALANCE_BUDGET,
+)
+from database import normalize_address
+from metrics import Gauge, Histogram, SUI_COMMAND_SECONDS
+from scripts.sui_rpc import rpc_call
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Gas coins for the backend signer (the CLI's active address).
+#
+# Without an explicit --gas coin the sui CLI picks the same default coin for every
+# transaction, so concurrent submissions lock the same owned object and fail. The
+# pool tracks the signer's SUI coins and leases each in-flight transaction its own
+# coin. A maintenance thread refreshes balances from the fullnode and, when fewer
+# than GAS_POOL_SIZE coins can fund a transaction, rebalances in one PTB: small
+# coins are merged into the largest one, which is split into new coins of
+# GAS_POOL_COIN_BALANCE. If the pool cannot be loaded, leases are empty and the CLI
+# falls back to its own coin selection.
+
+GAS_POOL_FREE = Gauge("gas_pool_free_coins", "Gas coins available for lease.")
+GAS_POOL_LEASE_WAIT = Histogram("gas_pool_lease_wait_seconds", "Time spent waiting for a gas coin.")
+
+SUI_COIN_TYPE = "0x2::sui::SUI"
+
+
+def gas_spent(resp):
+    """Net gas charged by a transaction, from the CLI's --json effects (None if absent)."""
+    used = ((resp or {}).get('effects') or {}).get('gasUsed')
+    if not used:
+        return None
+    return int(used['computationCost']) + int(used['storageCost']) - int(used['storageRebate'])
+
+
+class GasLease:
+    """One leased coin (or none). Set `spent` after the transaction for accurate accounting."""
+
+    def __init__(self, coin_id, budget):
+        self.coin_id = coin_id
+        self.budget = budget
+        self.spent = None
+
+    def args(self, flag="--gas"):
+        """CLI arguments selecting the coin: --gas <id> for call/publish, --gas-coin @<id> for ptb."""
+        if self.coin_id is None:
+            return []
+        return [flag, f"@{self.coin_id}" if flag == "--gas-coin" else self.coin_id]
+
+
+class GasPool:
+    def __init__(self, owner, size=GAS_POOL_SIZE, coin_balance=GAS_POOL_COIN_BALANCE,
+                 min_balance=GAS_POOL_MIN_COIN_BALANCE, rpc_url=SUI_RPC_URL):
+        self.owner = normalize_address(owner)
+        self.size = size
+        self.coin_balance = coin_balance
+        self.min_balance = min_balance
+        self.rpc_url = rpc_url
+        self._balances = {}  # coin id -> last known balance (MIST)
+        self._leased = set()
+        self._cond = threading.Condition()
+        self._rebalance_wanted = threading.Event()
+        self._thread = None
+
+    # --- Coin state ---
+
+    def _fetch_coins(self):
+        coins = {}
+        cursor = None
+        while True:
+            page = rpc_call(self.rpc_url, "suix_getCoins", [self.owner, SUI_COIN_TYPE, cursor, None]) or {}
+            for coin in page.get('data', []):
+                coins[coin['coinObjectId']] = int(coin['balance'])
+            if not page.get('hasNextPage'):
+                return coins
+            cursor = page.get('nextCursor')
+
+    def refresh(self):
+        coins = self._fetch_coins()
+        with self._cond:
+            # Leased coins keep their local balance until released; coins merged away disappear
+            for coin_id in self._leased:
+                coins.setdefault(coin_id, self._balances.get(coin_id, 0))
+            self._balances = coins
+            self._update_gauge_locked()
+            self._cond.notify_all()
+        if self.usable_count() < self.size:
+            self._rebalance_wanted.set()
+
+    def _update_gauge_locked(self):
+        GAS_POOL_FREE.set(sum(1 for c, b in self._balances.items() if c not in self._leased and b >= self.min_balance))
+
+    def usable_count(self):
+        with self._cond:
+            return sum(1 for b in self._balances.values() if b >= self.min_balance)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "owner": self.owner,
+                "coins": len(self._balances),
+                "usable": sum(1 for b in self._balances.values() if b >= self.min_balance),
+                "leased": len(self._leased),
+                "total_balance": sum(self._balances.values()),
+            }
+
+    # --- Leasing ---
+
+    def _pick_locked(self, budget):
+        free = [(b, c) for c, b in self._balances.items() if c not in self._leased and b >= max(budget, self.min_balance)]
+        if not free:
+            return None
+        # Smallest coin that covers the budget keeps large coins for large transactions
+        return min(free)[1]
+
+    def acquire(self, budget, timeout=GAS_POOL_LEASE_TIMEOUT):
+        start = time.perf_counter()
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                coin_id = self._pick_locked(budget)
+                if coin_id is not None:
+                    self._leased.add(coin_id)
+                    self._update_gauge_locked()
+                    GAS_POOL_LEASE_WAIT.observe(time.perf_counter() - start)
+                    return coin_id
+                self._rebalance_wanted.set()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    GAS_POOL_LEASE_WAIT.observe(time.perf_counter() - start)
+                    return None
+                self._cond.wait(remaining)
+
+    def release(self, coin_id, spent):
+        with self._cond:
+            self._leased.discard(coin_id)
+            if coin_id in self._balances:
+                self._balances[coin_id] = max(0, self._balances[coin_id] - spent)
+            self._update_gauge_locked()
+            self._cond.notify_all()
+        if self.usable_count() < self.size:
+            self._rebalance_wanted.set()
+
+    # --- Rebalancing ---
+
+    def rebalance(self):
+        """Merge dust coins into the largest free coin and split new pool coins off it."""
+        with self._cond:
+            free = sorted(((b, c) for c, b in self._balances.items() if c not in self._leased), reverse=True)
+            if not free:
+                return False
+            source_balance, source = free[0]
+            dust = [c for b, c in free[1:] if b < self.min_balance][:500]
+            usable = sum(1 for b in self._balances.values() if b >= self.min_balance)
+            total = source_balance + sum(self._balances[c] for c in dust)
+            # The source coin stays in the pool, so it must keep at least min_balance
+            affordable = max(0, (total - GAS_POOL_REBALANCE_BUDGET - self.min_balance) // self.coin_balance)
+            new_coins = min(max(0, self.size - usable + (0 if source_balance >= self.min_balance else 1)), affordable)
+            if new_coins == 0 and len(dust) < 2:
+                if usable < self.size:
+                    logger.warning("Gas pool below target and signer balance too low to split",
+                                   extra={"usable": usable, "target": self.size, "sample": "gas-pool-low"})
+                return False
+            self._leased.add(source)
+
+        cmd = [SUI_CLI_PATH, "client", "ptb"]
+        if dust:
+            cmd += ["--merge-coins", "gas", "[" + ",".join(f"@{c}" for c in dust) + "]"]
+        if new_coins:
+            cmd += ["--split-coins", "gas", "[" + ",".join([str(self.coin_balance)] * new_coins) + "]", "--assign", "coins"]
+            cmd += ["--transfer-objects", "[" + ",".join(f"coins.{i}" for i in range(new_coins)) + "]", f"@{self.owner}"]
+        cmd += ["--gas-coin", f"@{source}", "--gas-budget", str(GAS_POOL_REBALANCE_BUDGET), "--json"]
+        try:
+            with SUI_COMMAND_SECONDS.time(command="client ptb rebalance"):
+                result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode != 0:
+                logger.error("Gas pool rebalance failed", extra={"stderr": result.stderr[-2000:]})
+                return False
+            logger.info("Gas pool rebalanced", extra={"merged": len(dust), "coins_created": new_coins})
+            return True
+        finally:
+            with self._cond:
+                self._leased.discard(source)
+            self.refresh()
+
+    def _maintain(self):
+        while True:
+            self._rebalance_wanted.wait(GAS_POOL_REFRESH_INTERVAL)
+            wanted = self._rebalance_wanted.is_set()
+            self._rebalance_wanted.clear()
+            try:
+                if wanted:
+                    self.rebalance()
+                else:
+                    self.refresh()
+            except Exception as e:
+                logger.warning("Gas pool maintenance error: %s", e, extra={"sample": "gas-pool-maintenance"})
+                time.sleep(1)
+
+    def start(self):
+        self.refresh()
+        self._thread = threading.Thread(target=self._maintain, name="gas-pool", daemon=True)
+        self._thread.start()
+        logger.info("Gas pool started", extra=self.stats())
+        return self
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_pool_failed_at = None
+
+def active_address():
+    result = subprocess.run([SUI_CLI_PATH, "client", "active-address"], capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+def get_gas_pool():
+    """The process-wide pool for the signer, or None when disabled or unavailable (retried after a minute)."""
+    global _pool, _pool_failed_at
+    if not GAS_POOL_ENABLED:
+        return None
+    with _pool_lock:
+        if _pool is None and (_pool_failed_at is None or time.monotonic() - _pool_failed_at > 60):
+            try:
+                _pool = GasPool(GAS_POOL_OWNER or active_address()).start()
+            except Exception as e:
+                _pool_failed_at = time.monotonic()
+                logger.warning("Gas pool unavailable (%s); using CLI default gas selection", e)
+        return _pool
+
+def gas_pool_stats():
+    return _pool.stats() if _pool is not None else None
+
+@contextmanager
+def gas_lease(sender=None, budget=100_000_000):
+    """
+    Lease a gas coin for one transaction signed by the pool owner. Yields a GasLease
+    whose args() are empty when no coin is available or `sender` is another address.
+    """
+    pool = get_gas_pool()
+    coin_id = None
+    if pool is not None and (sender is None or normalize_address(sender) == pool.owner):
+        coin_id = pool.acquire(budget)
+    lease = GasLease(coin_id, budget)
+    try:
+        yield lease
+    finally:
+        if coin_id is not None:
+            pool.release(coin_id, lease.spent if lease.spent is not None else budget)
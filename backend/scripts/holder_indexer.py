@@ -0,0 +1,194 @@
+import threading
+import time
+from config import (
+    HOLDER_INDEX_ENABLED,
+    HOLDER_INDEX_START,
+    HOLDER_INDEX_POLL_INTERVAL,
+    HOLDER_INDEX_CHECKPOINTS_PER_ROUND,
+    HOLDER_INDEX_RPC_BATCH,
+    HOLDER_INDEX_TOKEN_REFRESH,
+    OWNER_TRACKING_ENABLED,
+    OWNER_SWEEP_INTERVAL,
+)
+from database import (
+    get_holder_checkpoint,
+    get_indexed_packages,
+    normalize_address,
+    get_token_packages,
+    save_holder_balances,
+    save_holder_seed,
+)
+from metrics import Counter, Gauge
+from scripts.sui_rpc import rpc_batches, rpc_call
+from scripts.owner_tracker import OwnerTracker
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Holder balances for every token in the database, materialized in token_holders.
+#
+# One thread per network follows checkpoints: each round fetches the next
+# checkpoints, multi-gets their transactions with balanceChanges, and keeps the
+# (holder, coin type) pairs whose coin type belongs to a tracked package. Those
+# pairs are then re-read with suix_getBalance and stored together with the new
+# checkpoint, so the table holds absolute balances rather than summed deltas: a
+# replayed round or a holder whose history predates the index start cannot make it
+# drift. Newly tracked packages are seeded from the current balances of their
+# creator and owner, who receive the initial supply, and recorded with the seed
+# checkpoint and their publish checkpoint. Only packages published after their seed
+# checkpoint are complete; for older ones (e.g. imported tokens) holders who have not
+# transacted since are missing, which /api/tokens/{package_id}/holders reports.
+#
+# The same transactions drive TreasuryCap owner tracking (scripts/owner_tracker.py).
+
+HOLDER_INDEX_CHECKPOINT = Gauge("holder_index_checkpoint", "Last checkpoint folded into token_holders.", ("network",))
+HOLDER_INDEX_LAG = Gauge("holder_index_lag_checkpoints", "Checkpoints between the fullnode and the holder index.", ("network",))
+HOLDER_BALANCE_UPDATES = Counter("holder_balance_updates_total", "Holder balances re-read after a change.", ("network",))
+
+MULTI_GET_LIMIT = 50  # digests per sui_multiGetTransactionBlocks
+
+
+def _package_of(coin_type):
+    return normalize_address(coin_type.split("::", 1)[0])
+
+
+class HolderIndexer:
+    def __init__(self, network, url):
+        self.network = network
+        self.url = url
+        self.checkpoint = None
+        self.latest = None
+        self.tracked = {}  # package_id -> (creator, owner)
+        self._seeded = set()
+        self._tracked_at = 0
+        self.owners = OwnerTracker(network, url) if OWNER_TRACKING_ENABLED else None
+
+    def _batch(self, calls):
+        return rpc_batches(self.url, calls, HOLDER_INDEX_RPC_BATCH)
+
+    def _refresh_tracked(self):
+        if time.monotonic() - self._tracked_at < HOLDER_INDEX_TOKEN_REFRESH:
+            return
+        self._tracked_at = time.monotonic()
+        self.tracked = {normalize_address(p): holders for p, holders in get_token_packages(self.network).items()}
+        unseeded = self.tracked.keys() - self._seeded - get_indexed_packages()
+        if unseeded:
+            self._seed(unseeded)
+        self._seeded.update(unseeded)
+
+    def _publish_checkpoints(self, packages):
+        packages = sorted(packages)
+        calls = [
+            ("sui_multiGetObjects", [packages[i:i + MULTI_GET_LIMIT], {"showPreviousTransaction": True}])
+            for i in range(0, len(packages), MULTI_GET_LIMIT)
+        ]
+        objects = [obj for page in self._batch(calls) for obj in page or []]
+        digests = {p: ((obj or {}).get('data') or {}).get('previousTransaction') for p, obj in zip(packages, objects)}
+        known = sorted({d for d in digests.values() if d})
+        calls = [("sui_multiGetTransactionBlocks", [known[i:i + MULTI_GET_LIMIT], {}]) for i in range(0, len(known), MULTI_GET_LIMIT)]
+        checkpoints = {
+            tx['digest']: int(tx['checkpoint'])
+            for txs in self._batch(calls) for tx in txs or [] if tx and tx.get('checkpoint') is not None
+        }
+        return {p: checkpoints.get(d) for p, d in digests.items()}
+
+    def _seed(self, packages):
+        addresses = sorted({normalize_address(a) for p in packages for a in self.tracked[p] if a})
+        balances = []
+        for address, result in zip(addresses, self._batch([("suix_getAllBalances", [a]) for a in addresses])):
+            for balance in result or []:
+                package_id = _package_of(balance['coinType'])
+                if package_id in packages:
+                    balances.append((package_id, address, balance['coinType'], balance['totalBalance']))
+        published = self._publish_checkpoints(packages)
+        save_holder_seed(self.network, balances, published, self.checkpoint)
+        complete = sum(1 for cp in published.values() if cp is not None and cp > self.checkpoint)
+        logger.info("Seeded token holders", extra={
+            "network": self.network, "packages": len(packages), "holders": len(balances), "complete": complete,
+        })
+
+    def _transactions(self, first, last):
+        checkpoints = self._batch([("sui_getCheckpoint", [str(seq)]) for seq in range(first, last + 1)])
+        digests = [digest for cp in checkpoints for digest in (cp or {}).get('transactions', [])]
+        options = {"showBalanceChanges": True, "showObjectChanges": self.owners is not None}
+        calls = [
+            ("sui_multiGetTransactionBlocks", [digests[i:i + MULTI_GET_LIMIT], options])
+            for i in range(0, len(digests), MULTI_GET_LIMIT)
+        ]
+        return [tx for txs in self._batch(calls) for tx in txs or [] if tx]
+
+    def _changed_holders(self, transactions):
+        changed = {}
+        for tx in transactions:
+            for change in tx.get('balanceChanges') or []:
+                package_id = _package_of(change.get('coinType', ''))
+                owner = (change.get('owner') or {}).get('AddressOwner')
+                if owner and package_id in self.tracked:
+                    changed[(package_id, normalize_address(owner))] = change['coinType']
+        return changed
+
+    def run_round(self):
+        """Index the next checkpoints; returns how many were processed."""
+        self.latest = int(rpc_call(self.url, "sui_getLatestCheckpointSequenceNumber"))
+        if self.checkpoint is None:
+            self.checkpoint = get_holder_checkpoint(self.network)
+        if self.checkpoint is None:
+            self.checkpoint = self.latest if HOLDER_INDEX_START == "latest" else int(HOLDER_INDEX_START) - 1
+        self._refresh_tracked()
+        if self.owners is not None and (
+            self.owners.last_sweep is None or time.time() - self.owners.last_sweep >= OWNER_SWEEP_INTERVAL
+        ):
+            self.owners.sweep()
+        last = min(self.latest, self.checkpoint + HOLDER_INDEX_CHECKPOINTS_PER_ROUND)
+        if last > self.checkpoint:
+            transactions = self._transactions(self.checkpoint + 1, last)
+            if self.owners is not None:
+                self.owners.track(transactions)
+            pairs = list(self._changed_holders(transactions).items())
+            results = self._batch([("suix_getBalance", [address, coin_type]) for (_, address), coin_type in pairs])
+            balances = [
+                (package_id, address, coin_type, (result or {}).get('totalBalance', 0))
+                for ((package_id, address), coin_type), result in zip(pairs, results)
+            ]
+            save_holder_balances(self.network, balances, last)
+            HOLDER_BALANCE_UPDATES.inc(len(balances), network=self.network)
+        processed = last - self.checkpoint
+        self.checkpoint = last
+        HOLDER_INDEX_CHECKPOINT.set(last, network=self.network)
+        HOLDER_INDEX_LAG.set(self.latest - last, network=self.network)
+        return processed
+
+    def run(self):
+        while True:
+            try:
+                if self.run_round() < HOLDER_INDEX_CHECKPOINTS_PER_ROUND:
+                    time.sleep(HOLDER_INDEX_POLL_INTERVAL)
+            except Exception as e:
+                logger.warning("Holder indexer error: %s", e, extra={"network": self.network, "sample": f"holders-{self.network}"})
+                time.sleep(HOLDER_INDEX_POLL_INTERVAL * 5)
+
+
+_indexers = {}
+_indexers_lock = threading.Lock()
+
+def start_holder_indexer(networks):
+    """Start one indexer thread per network ({name: rpc url}), once per process."""
+    if not HOLDER_INDEX_ENABLED:
+        return
+    with _indexers_lock:
+        for network, url in networks.items():
+            if network in _indexers:
+                continue
+            indexer = _indexers[network] = HolderIndexer(network, url)
+            threading.Thread(target=indexer.run, name=f"holder-indexer-{network}", daemon=True).start()
+
+def holder_index_status():
+    return {
+        network: {
+            "checkpoint": indexer.checkpoint,
+            "latest": indexer.latest,
+            "tracked_tokens": len(indexer.tracked),
+            "owner_sweep_at": indexer.owners.last_sweep if indexer.owners else None,
+        }
+        for network, indexer in _indexers.items()
+    }
@@ -1,6 +1,18 @@
 import os
 import shutil
+import tempfile
+import threading
+import time
 import uuid
+from config import PACKAGE_WORKSPACE_DIR, WORKSPACE_MAX_AGE, WORKSPACE_MAX_BYTES, WORKSPACE_GC_INTERVAL
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Workspaces currently used by a deploy in this process; the GC never touches them.
+_active_workspaces = set()
+_workspace_lock = threading.Lock()
+_last_gc = 0.0
 
 def create_move_package(package_root, file_name, move_code):
     """
@@ -24,3 +36,72 @@ def create_move_package(package_root, file_name, move_code):
 
 def cleanup_package(package_dir):
     shutil.rmtree(package_dir, ignore_errors=True)
+
+def create_workspace():
+    """
+    Create a private directory for one deployment under PACKAGE_WORKSPACE_DIR, so
+    concurrent deploys never share package sources or build output.
+    Release it with release_workspace() when the deploy finishes.
+    """
+    os.makedirs(PACKAGE_WORKSPACE_DIR, exist_ok=True)
+    maybe_collect_workspaces()
+    workspace = tempfile.mkdtemp(prefix="job-", dir=PACKAGE_WORKSPACE_DIR)
+    with _workspace_lock:
+        _active_workspaces.add(workspace)
+    return workspace
+
+def workspace_of(package_dir):
+    return os.path.dirname(os.path.abspath(package_dir))
+
+def release_workspace(workspace):
+    with _workspace_lock:
+        _active_workspaces.discard(workspace)
+    shutil.rmtree(workspace, ignore_errors=True)
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+def collect_workspaces(max_age=WORKSPACE_MAX_AGE, max_bytes=WORKSPACE_MAX_BYTES):
+    """
+    Remove workspaces older than max_age seconds, then the oldest remaining ones
+    until the total size is under max_bytes. Active workspaces are skipped.
+    Returns the number of workspaces removed.
+    """
+    if not os.path.isdir(PACKAGE_WORKSPACE_DIR):
+        return 0
+    now = time.time()
+    with _workspace_lock:
+        active = set(_active_workspaces)
+    candidates = []
+    for entry in os.scandir(PACKAGE_WORKSPACE_DIR):
+        if entry.is_dir(follow_symlinks=False) and entry.path not in active:
+            candidates.append((entry.stat().st_mtime, entry.path, _dir_size(entry.path)))
+    candidates.sort()
+    total = sum(size for _, _, size in candidates)
+    removed = 0
+    for mtime, path, size in candidates:
+        if now - mtime <= max_age and total <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        removed += 1
+    return removed
+
+def maybe_collect_workspaces():
+    """Run collect_workspaces at most once per WORKSPACE_GC_INTERVAL."""
+    global _last_gc
+    now = time.monotonic()
+    with _workspace_lock:
+        if now - _last_gc < WORKSPACE_GC_INTERVAL:
+            return
+        _last_gc = now
+    removed = collect_workspaces()
+    if removed:
+        logger.info("Garbage-collected stale package workspaces", extra={"count": removed})
@@ -0,0 +1,110 @@
+import hashlib
+import os
+import re
+from functools import lru_cache
+
+# Shared Move source template engine, used by the backend deployer
+# (scripts/deploy_contract.py) and the standalone generate_token_contract.py CLI.
+#
+# Templates use {{name}} placeholders. A template is parsed once into a list of
+# literal chunks and placeholder slots, and rendering is a single join over that
+# list. Placeholders written inside a Move byte string literal (b"{{name}}") are
+# escaped so any text, including quotes, backslashes and non-ASCII, yields a valid
+# literal with exactly the UTF-8 bytes of the value. Anything that does not look
+# like {{identifier}} (e.g. {{#if mint}}) is kept as literal text.
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "..", "templates")
+TOKEN_TEMPLATE_PATH = os.path.join(TEMPLATE_DIR, "fungible_token_template.move")
+
+_PLACEHOLDER = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+# Move byte string escapes; every other byte outside printable ASCII becomes \xHH
+_BYTE_ESCAPES = {ord('"'): '\\"', ord('\\'): '\\\\', ord('\n'): '\\n', ord('\r'): '\\r', ord('\t'): '\\t', 0: '\\0'}
+_BYTE_TABLE = [
+    _BYTE_ESCAPES.get(b, chr(b) if 0x20 <= b < 0x7f else f"\\x{b:02x}")
+    for b in range(256)
+]
+
+
+class TemplateError(Exception):
+    pass
+
+
+def escape_move_bytes(value):
+    """Escape a value for use inside a Move b"..." literal."""
+    return ''.join([_BYTE_TABLE[b] for b in str(value).encode('utf-8')])
+
+
+def _plain(value):
+    return str(value)
+
+
+class MoveTemplate:
+    def __init__(self, source):
+        self.source = source
+        self.hash = hashlib.sha256(source.encode()).hexdigest()
+        self.literals = []
+        self.slots = []
+        position = 0
+        for match in _PLACEHOLDER.finditer(source):
+            before = source[position:match.start()]
+            in_bytes = before.endswith('b"') and source.startswith('"', match.end())
+            self.literals.append(before)
+            self.slots.append((match.group(1), escape_move_bytes if in_bytes else _plain))
+            position = match.end()
+        self.literals.append(source[position:])
+        self.variables = frozenset(name for name, _ in self.slots)
+
+    def render(self, context):
+        missing = self.variables.difference(context)
+        if missing:
+            raise TemplateError(f"Missing template variables: {', '.join(sorted(missing))}")
+        parts = [self.literals[0]]
+        for (name, escape), literal in zip(self.slots, self.literals[1:]):
+            parts.append(escape(context[name]))
+            parts.append(literal)
+        return ''.join(parts)
+
+    def render_many(self, contexts):
+        """Render a batch of contexts; yields sources in order."""
+        for context in contexts:
+            yield self.render(context)
+
+
+@lru_cache(maxsize=None)
+def _load(path, mtime):
+    with open(path, "r") as f:
+        return MoveTemplate(f.read())
+
+
+def load_template(path=TOKEN_TEMPLATE_PATH):
+    """Compiled template for path, cached in memory until the file changes."""
+    path = os.path.abspath(path)
+    return _load(path, os.path.getmtime(path))
+
+
+def template_hash(path=TOKEN_TEMPLATE_PATH):
+    """Content hash of the template, identifying the Move code every rendered package shares."""
+    return load_template(path).hash
+
+
+def token_template_context(package_name, module_name, name, symbol, description, icon_url,
+                           decimals, initial_supply, deployer_address):
+    """Context for fungible_token_template.move; module_name is lowercased, the witness uppercased."""
+    return {
+        "package_name": package_name,
+        "token_name": module_name.lower(),
+        "token_name_upper": module_name.upper(),
+        "name": name,
+        "symbol": symbol,
+        "description": description or "",
+        "icon_url": icon_url or "",
+        "decimals": int(decimals),
+        "initial_supply": initial_supply,
+        "deployer_address": deployer_address,
+    }
+
+
+def render_token_module(**params):
+    """Render the fungible token Move module; params as for token_template_context."""
+    return load_template().render(token_template_context(**params))
@@ -0,0 +1,118 @@
+import threading
+import time
+from config import (
+    HOLDER_INDEX_ENABLED,
+    HOLDER_INDEX_RPC_BATCH,
+    HOLDER_INDEX_TOKEN_REFRESH,
+    OWNER_TRACKING_ENABLED,
+    OWNER_SWEEP_INTERVAL,
+)
+from database import get_treasury_caps, normalize_address, update_token_owners
+from metrics import Counter
+from scripts.sui_rpc import rpc_batches
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Token owner = current owner of the token's TreasuryCap on chain.
+#
+# sweep() re-reads every recorded cap with batched sui_multiGetObjects and updates
+# records whose owner differs in place (database and owner index), so
+# /my_owned_tokens never queries the chain. It runs at startup and every
+# OWNER_SWEEP_INTERVAL on its own thread per network (start_owner_tracker). When the
+# holder indexer is enabled it drives the tracker instead: every checkpoint's
+# transactions go to track(), which re-reads just the caps in their objectChanges,
+# and the indexer runs the periodic sweep. Caps that are wrapped, shared, frozen or
+# deleted have no address owner and leave the record unchanged.
+
+OWNER_CHANGES = Counter("token_owner_changes_total", "Token owners updated from TreasuryCap ownership.", ("network",))
+
+MULTI_GET_LIMIT = 50  # object ids per sui_multiGetObjects
+
+
+class OwnerTracker:
+    def __init__(self, network, url):
+        self.network = network
+        self.url = url
+        self.caps = {}  # treasury_cap_id -> (package_id, owner)
+        self.last_sweep = None
+        self._caps_at = 0
+
+    def _refresh_caps(self):
+        if time.monotonic() - self._caps_at >= HOLDER_INDEX_TOKEN_REFRESH:
+            self._caps_at = time.monotonic()
+            self.caps = {normalize_address(cap): rec for cap, rec in get_treasury_caps(self.network).items()}
+
+    def touched_caps(self, transactions):
+        """Tracked cap ids appearing in the objectChanges of transactions."""
+        self._refresh_caps()
+        return {
+            normalize_address(change['objectId'])
+            for tx in transactions for change in (tx or {}).get('objectChanges') or []
+            if change.get('objectId') and normalize_address(change['objectId']) in self.caps
+        }
+
+    def refresh(self, cap_ids):
+        """Re-read the owners of cap_ids and update records that changed; returns the number updated."""
+        cap_ids = sorted(cap_ids)
+        calls = [
+            ("sui_multiGetObjects", [cap_ids[i:i + MULTI_GET_LIMIT], {"showOwner": True}])
+            for i in range(0, len(cap_ids), MULTI_GET_LIMIT)
+        ]
+        changes = []
+        for response in (obj for page in rpc_batches(self.url, calls, HOLDER_INDEX_RPC_BATCH) for obj in page or []):
+            data = (response or {}).get('data') or {}
+            owner = data.get('owner')
+            owner = owner.get('AddressOwner') if isinstance(owner, dict) else None
+            cap_id = normalize_address(data.get('objectId'))
+            if not owner or cap_id not in self.caps:
+                continue
+            package_id, current = self.caps[cap_id]
+            if normalize_address(owner) != normalize_address(current):
+                changes.append((package_id, owner))
+                self.caps[cap_id] = (package_id, owner)
+        if changes:
+            update_token_owners(changes)
+            OWNER_CHANGES.inc(len(changes), network=self.network)
+            logger.info("Token owners updated from chain", extra={"network": self.network, "updated": len(changes)})
+        return len(changes)
+
+    def track(self, transactions):
+        caps = self.touched_caps(transactions)
+        return self.refresh(caps) if caps else 0
+
+    def sweep(self):
+        self._caps_at = 0
+        self._refresh_caps()
+        updated = self.refresh(self.caps.keys())
+        self.last_sweep = time.time()
+        return updated
+
+    def run(self):
+        while True:
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.warning("Owner tracker error: %s", e, extra={"network": self.network, "sample": f"owners-{self.network}"})
+            time.sleep(OWNER_SWEEP_INTERVAL)
+
+
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+def start_owner_tracker(networks):
+    """Start one sweeping thread per network ({name: rpc url}), unless the holder indexer drives tracking."""
+    if not OWNER_TRACKING_ENABLED or HOLDER_INDEX_ENABLED:
+        return
+    with _trackers_lock:
+        for network, url in networks.items():
+            if network in _trackers:
+                continue
+            tracker = _trackers[network] = OwnerTracker(network, url)
+            threading.Thread(target=tracker.run, name=f"owner-tracker-{network}", daemon=True).start()
+
+def owner_tracker_status():
+    return {
+        network: {"tracked_caps": len(tracker.caps), "last_sweep": tracker.last_sweep}
+        for network, tracker in _trackers.items()
+    }
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import subprocess
+import weakref
+from config import (
+    SUI_CLI_PATH,
+    PTB_MAX_RECIPIENTS,
+    PTB_BATCH_CONCURRENCY,
+    PTB_GAS_BUDGET_BASE,
+    PTB_GAS_BUDGET_PER_RECIPIENT,
+)
+from metrics import SUI_COMMAND_SECONDS
+from scripts.gas_pool import gas_lease, gas_spent
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Bulk mint / transfer with programmable transaction blocks (`sui client ptb`).
+# Recipients are packed into chunks of at most PTB_MAX_RECIPIENTS, one PTB per chunk:
+#   mint:     one <package>::<module>::mint move call per recipient
+#   transfer: one SplitCoins of the source coin into every amount, then a
+#             TransferObjects per recipient
+# A PTB is atomic, so every recipient in a chunk shares its outcome.
+#
+# The TreasuryCap (mint) and the source coin (transfer) are owned objects, and two
+# transactions cannot use the same owned object version at once. Chunks that share
+# one are therefore run in order; up to PTB_BATCH_CONCURRENCY chunks for different
+# objects run at the same time, each paying with its own coin from the gas pool.
+
+_object_locks = weakref.WeakValueDictionary()  # dropped once no chunk holds or awaits the lock
+_semaphore = None
+
+def chunk_recipients(recipients, size=PTB_MAX_RECIPIENTS):
+    size = max(1, min(size, PTB_MAX_RECIPIENTS))
+    return [recipients[i:i + size] for i in range(0, len(recipients), size)]
+
+def _gas_budget(count):
+    return str(PTB_GAS_BUDGET_BASE + PTB_GAS_BUDGET_PER_RECIPIENT * count)
+
+def build_mint_ptb(package_id, module_name, treasury_cap_id, recipients, sender_address):
+    """recipients: list of (address, amount)."""
+    cmd = [SUI_CLI_PATH, "client", "ptb"]
+    for address, amount in recipients:
+        cmd += ["--move-call", f"{package_id}::{module_name}::mint", f"@{treasury_cap_id}", str(amount), f"@{address}"]
+    cmd += ["--sender", f"@{sender_address}", "--gas-budget", _gas_budget(len(recipients)), "--json"]
+    return cmd
+
+def build_transfer_ptb(coin_object_id, recipients, sender_address):
+    """recipients: list of (address, amount); amounts are split off coin_object_id."""
+    amounts = ",".join(str(amount) for _, amount in recipients)
+    cmd = [SUI_CLI_PATH, "client", "ptb", "--split-coins", f"@{coin_object_id}", f"[{amounts}]", "--assign", "parts"]
+    for i, (address, _) in enumerate(recipients):
+        cmd += ["--transfer-objects", f"[parts.{i}]", f"@{address}"]
+    cmd += ["--sender", f"@{sender_address}", "--gas-budget", _gas_budget(len(recipients)), "--json"]
+    return cmd
+
+def run_ptb(cmd):
+    """Execute one PTB with a leased gas coin; returns (digest, error). error is None on success."""
+    sender = cmd[cmd.index("--sender") + 1].lstrip("@")
+    budget = int(cmd[cmd.index("--gas-budget") + 1])
+    with gas_lease(sender, budget) as lease:
+        with SUI_COMMAND_SECONDS.time(command="client ptb"):
+            result = subprocess.run(cmd + lease.args("--gas-coin"), capture_output=True, text=True)
+        if result.returncode != 0:
+            return None, result.stderr.strip()[-2000:] or f"sui exited with {result.returncode}"
+        resp = json.loads(result.stdout)
+        lease.spent = gas_spent(resp)
+    status = (resp.get('effects') or {}).get('status') or {}
+    if status and status.get('status') != 'success':
+        return resp.get('digest'), status.get('error') or 'transaction failed'
+    return resp.get('digest'), None
+
+def _lock_for(object_id):
+    lock = _object_locks.get(object_id)
+    if lock is None:
+        lock = _object_locks[object_id] = asyncio.Lock()
+    return lock
+
+async def run_batch(owned_object_id, recipients, build_cmd, run_blocking, chunk_size=PTB_MAX_RECIPIENTS):
+    """
+    Run build_cmd(chunk) for each chunk of (address, amount) recipients, serialized on
+    owned_object_id and bounded by PTB_BATCH_CONCURRENCY overall. run_blocking(fn, *args)
+    runs the CLI call off the event loop. Returns one result dict per recipient, in order.
+    """
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(PTB_BATCH_CONCURRENCY)
+    chunks = chunk_recipients(recipients, chunk_size)
+
+    async def run_chunk(index, chunk):
+        async with _lock_for(owned_object_id), _semaphore:
+            try:
+                digest, error = await run_blocking(run_ptb, build_cmd(chunk))
+            except Exception as e:
+                digest, error = None, str(e)
+        if error:
+            logger.warning("PTB chunk failed: %s", error, extra={"chunk": index, "recipients": len(chunk)})
+        return [
+            {
+                "recipient": address,
+                "amount": amount,
+                "status": "failed" if error else "success",
+                "tx_digest": digest,
+                "chunk": index,
+                **({"error": error} if error else {}),
+            }
+            for address, amount in chunk
+        ]
+
+    results = await asyncio.gather(*(run_chunk(i, chunk) for i, chunk in enumerate(chunks)))
+    return [item for chunk_results in results for item in chunk_results]
@@ -0,0 +1,186 @@
+import asyncio
+import itertools
+import random
+import threading
+import time
+import httpx
+from config import (
+    SUI_RPC_TIMEOUT,
+    SUI_RPC_MAX_CONNECTIONS,
+    SUI_RPC_MAX_CONCURRENCY,
+    SUI_RPC_RETRIES,
+    SUI_RPC_RETRY_BASE_DELAY,
+)
+from metrics import RPC_REQUEST_SECONDS, RPC_ERRORS
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx when installed)
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RpcError(Exception):
+    """JSON-RPC level error returned by the fullnode."""
+
+    def __init__(self, method, error):
+        self.method = method
+        self.code = error.get('code') if isinstance(error, dict) else None
+        message = error.get('message') if isinstance(error, dict) else str(error)
+        super().__init__(f"{method}: {message}")
+
+
+class SuiRpcClient:
+    """
+    Async JSON-RPC client for one Sui fullnode endpoint.
+    Keeps a pooled keep-alive connection set, caps in-flight requests with a
+    semaphore, and retries transport errors and 429/5xx with jittered backoff.
+    Must be used from the event loop it was created on; see get_rpc_client().
+    """
+
+    def __init__(self, url, timeout=SUI_RPC_TIMEOUT, max_connections=SUI_RPC_MAX_CONNECTIONS,
+                 max_concurrency=SUI_RPC_MAX_CONCURRENCY, retries=SUI_RPC_RETRIES):
+        self.url = url
+        self.retries = retries
+        self._ids = itertools.count(1)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            http2=_HTTP2,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def _post(self, payload):
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    resp = await self._client.post(self.url, json=payload)
+                if resp.status_code in RETRY_STATUS_CODES and attempt < self.retries:
+                    raise httpx.HTTPStatusError(f"HTTP {resp.status_code}", request=resp.request, response=resp)
+                resp.raise_for_status()
+                return resp.json()
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                status = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+                if attempt >= self.retries or (status is not None and status not in RETRY_STATUS_CODES):
+                    raise
+                delay = SUI_RPC_RETRY_BASE_DELAY * (2 ** attempt)
+                await asyncio.sleep(random.uniform(0, delay))
+                attempt += 1
+
+    def _request(self, method, params):
+        return {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+
+    async def call(self, method, params=None):
+        start = time.perf_counter()
+        try:
+            body = await self._post(self._request(method, params or []))
+        except Exception:
+            RPC_ERRORS.inc(method=method)
+            raise
+        finally:
+            RPC_REQUEST_SECONDS.observe(time.perf_counter() - start, method=method, batch="false")
+        if body.get('error'):
+            RPC_ERRORS.inc(method=method)
+            raise RpcError(method, body['error'])
+        return body.get('result')
+
+    async def batch(self, calls, return_exceptions=False):
+        """
+        Send several (method, params) calls in one HTTP round-trip.
+        Results come back in call order. A failed call raises RpcError, or is
+        returned in place when return_exceptions is True.
+        """
+        if not calls:
+            return []
+        requests = [self._request(method, params or []) for method, params in calls]
+        methods = {req['method'] for req in requests}
+        batch_method = methods.pop() if len(methods) == 1 else "mixed"
+        start = time.perf_counter()
+        try:
+            body = await self._post(requests)
+        except Exception:
+            RPC_ERRORS.inc(method=batch_method)
+            raise
+        finally:
+            RPC_REQUEST_SECONDS.observe(time.perf_counter() - start, method=batch_method, batch="true")
+        if isinstance(body, dict):
+            # Some nodes answer a rejected batch with a single error object
+            RPC_ERRORS.inc(method=batch_method)
+            raise RpcError(requests[0]['method'], body.get('error', body))
+        by_id = {item.get('id'): item for item in body}
+        results = []
+        for req in requests:
+            item = by_id.get(req['id'], {'error': {'message': 'missing response'}})
+            if item.get('error'):
+                RPC_ERRORS.inc(method=req['method'])
+                err = RpcError(req['method'], item['error'])
+                if not return_exceptions:
+                    raise err
+                results.append(err)
+            else:
+                results.append(item.get('result'))
+        return results
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+# One client per (event loop, endpoint): httpx connections are bound to the loop that opened them.
+# Clients per event loop. A client's semaphore and connections are bound to its loop
+# (and keep it alive), so entries are keyed by the loop object itself and dropped once
+# it has closed; a new loop never inherits a pool from a dead one.
+_clients = {}  # loop -> {url: SuiRpcClient}
+_clients_lock = threading.Lock()
+
+def get_rpc_client(url):
+    """Shared SuiRpcClient for `url` on the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        clients = _clients.get(loop)
+        if clients is None:
+            for closed in [l for l in _clients if l.is_closed()]:
+                del _clients[closed]
+            clients = _clients[loop] = {}
+        client = clients.get(url)
+        if client is None:
+            client = clients[url] = SuiRpcClient(url)
+        return client
+
+
+# Sync callers (listener threads, FastAPI sync routes) share one background loop,
+# so they still reuse pooled connections across threads.
+_loop = None
+_loop_lock = threading.Lock()
+
+def _background_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="sui-rpc-loop", daemon=True).start()
+            _loop = loop
+        return _loop
+
+def run_sync(coro_fn, timeout=None):
+    """Run coro_fn() on the shared RPC loop and block for its result."""
+    async def runner():
+        return await coro_fn()
+    return asyncio.run_coroutine_threadsafe(runner(), _background_loop()).result(timeout)
+
+def rpc_call(url, method, params=None):
+    return run_sync(lambda: get_rpc_client(url).call(method, params))
+
+def rpc_batch(url, calls, return_exceptions=False):
+    return run_sync(lambda: get_rpc_client(url).batch(calls, return_exceptions=return_exceptions))
+
+def rpc_batches(url, calls, batch_size):
+    """Split calls into JSON-RPC batches of batch_size sent concurrently; results in call order."""
+    chunks = [calls[i:i + batch_size] for i in range(0, len(calls), batch_size)]
+
+    async def send():
+        client = get_rpc_client(url)
+        return await asyncio.gather(*(client.batch(chunk) for chunk in chunks))
+    return [result for chunk in run_sync(send) for result in chunk]
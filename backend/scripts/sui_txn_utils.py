@@ -1,24 +1,78 @@
-import subprocess
+import asyncio
 import json
-from config import SUI_CLI_PATH
+from config import SUI_CLI_PATH, SUI_RPC_URL
+from scripts.sui_rpc import get_rpc_client, run_sync
+from metrics import SUI_COMMAND_SECONDS
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Read paths go over JSON-RPC; the Sui CLI is only used when the fullnode is unreachable.
+# The *_async functions run on the caller's event loop; the plain functions are
+# blocking wrappers for threaded callers.
+TX_QUERY_LIMIT = 50
+TX_LIST_OPTIONS = {"showInput": True, "showEffects": True, "showBalanceChanges": True}
+TX_DETAIL_OPTIONS = {
+    "showInput": True,
+    "showRawInput": False,
+    "showEffects": True,
+    "showEvents": True,
+    "showObjectChanges": True,
+    "showBalanceChanges": True,
+}
+
+async def _query_transactions(filters):
+    """Run one suix_queryTransactionBlocks per filter in a single batch; newest first, deduplicated."""
+    calls = [
+        ("suix_queryTransactionBlocks", [{"filter": f, "options": TX_LIST_OPTIONS}, None, TX_QUERY_LIMIT, True])
+        for f in filters
+    ]
+    seen = set()
+    txns = []
+    for page in await get_rpc_client(SUI_RPC_URL).batch(calls):
+        for tx in page.get('data', []):
+            if tx['digest'] not in seen:
+                seen.add(tx['digest'])
+                txns.append(tx)
+    txns.sort(key=lambda tx: int(tx.get('timestampMs') or 0), reverse=True)
+    return txns
+
+async def _run_cli(cmd):
+    with SUI_COMMAND_SECONDS.time(command=" ".join(cmd[1:3])):
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise Exception(stderr.decode())
+    return json.loads(stdout)
+
+async def get_transactions_by_object_async(object_id):
+    try:
+        return await _query_transactions([{"ChangedObject": object_id}])
+    except Exception as e:
+        logger.warning("RPC query failed (%s); falling back to Sui CLI", e, extra={"sample": "txn-rpc-fallback"})
+        return await _run_cli([SUI_CLI_PATH, "client", "transactions", "--object", object_id, "--json"])
+
+async def get_transactions_by_address_async(address):
+    try:
+        return await _query_transactions([{"FromAddress": address}, {"ToAddress": address}])
+    except Exception as e:
+        logger.warning("RPC query failed (%s); falling back to Sui CLI", e, extra={"sample": "txn-rpc-fallback"})
+        return await _run_cli([SUI_CLI_PATH, "client", "transactions", "--address", address, "--json"])
+
+async def get_transaction_details_async(tx_digest):
+    try:
+        return await get_rpc_client(SUI_RPC_URL).call("sui_getTransactionBlock", [tx_digest, TX_DETAIL_OPTIONS])
+    except Exception as e:
+        logger.warning("RPC query failed (%s); falling back to Sui CLI", e, extra={"sample": "txn-rpc-fallback"})
+        return await _run_cli([SUI_CLI_PATH, "client", "transaction", tx_digest, "--json"])
 
 def get_transactions_by_object(object_id):
-    cmd = [SUI_CLI_PATH, "client", "transactions", "--object", object_id, "--json"]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        raise Exception(result.stderr)
-    return json.loads(result.stdout)
+    return run_sync(lambda: get_transactions_by_object_async(object_id))
 
 def get_transactions_by_address(address):
-    cmd = [SUI_CLI_PATH, "client", "transactions", "--address", address, "--json"]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        raise Exception(result.stderr)
-    return json.loads(result.stdout)
+    return run_sync(lambda: get_transactions_by_address_async(address))
 
 def get_transaction_details(tx_digest):
-    cmd = [SUI_CLI_PATH, "client", "transaction", tx_digest, "--json"]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        raise Exception(result.stderr)
-    return json.loads(result.stdout)
+    return run_sync(lambda: get_transaction_details_async(tx_digest))
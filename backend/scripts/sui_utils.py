@@ -1,13 +1,42 @@
 import subprocess
 import json
-from config import SUI_CLI_PATH
+from config import SUI_CLI_PATH, SUI_RPC_URL
+from scripts.sui_rpc import rpc_call
+from scripts.gas_pool import gas_lease, gas_spent
+from scripts.gas_estimate import estimate_gas_budget, call_key, record_gas_used, invalidate_gas_estimate
+from metrics import SUI_COMMAND_SECONDS
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+def _get_owned_coins_rpc(address):
+    """All 0x2::coin::Coin objects owned by address, via suix_getOwnedObjects pagination."""
+    coins = []
+    cursor = None
+    while True:
+        page = rpc_call(SUI_RPC_URL, "suix_getOwnedObjects", [
+            address,
+            {"filter": {"StructType": "0x2::coin::Coin"}, "options": {"showType": True, "showContent": True}},
+            cursor,
+            None
+        ])
+        for item in page.get('data', []):
+            obj = item.get('data') or {}
+            if obj.get('type', '').startswith('0x2::coin::Coin'):
+                coins.append(obj)
+        if not page.get('hasNextPage'):
+            return coins
+        cursor = page.get('nextCursor')
 
 def get_user_tokens(address):
     """
     Returns a list of tokens (Move coins) deployed/owned by the given address.
-    This is a stub; in production, query Sui indexer or use Sui CLI for richer info.
+    Served over JSON-RPC; falls back to the Sui CLI if the fullnode is unreachable.
     """
-    # Example: use sui client objects --address <address> --json
+    try:
+        return _get_owned_coins_rpc(address)
+    except Exception as e:
+        logger.warning("RPC query failed (%s); falling back to Sui CLI", e, extra={"sample": "coins-rpc-fallback"})
     cmd = [
         SUI_CLI_PATH,
         "client",
@@ -15,13 +44,34 @@ def get_user_tokens(address):
         "--address", address,
         "--json"
     ]
-    result = subprocess.run(cmd, capture_output=True, check=True)
+    with SUI_COMMAND_SECONDS.time(command="client objects"):
+        result = subprocess.run(cmd, capture_output=True, check=True)
     output = result.stdout.decode()
     objs = json.loads(output)
     # Filter for coins
     coins = [obj for obj in objs.get('data', []) if obj.get('type', '').startswith('0x2::coin::Coin')]
     return coins
 
+def _execute_call(cmd, command, gas_key, sender_address):
+    """
+    Run a `sui client call` with a dry-run gas budget (see gas_estimate) and a gas coin
+    leased from the pool; returns the parsed --json response.
+    """
+    budget = estimate_gas_budget(gas_key, cmd)
+    with gas_lease(sender_address, budget) as lease:
+        with SUI_COMMAND_SECONDS.time(command=command):
+            try:
+                result = subprocess.run(cmd + ["--gas-budget", str(budget), *lease.args()], capture_output=True, check=True)
+            except subprocess.CalledProcessError:
+                # Possibly out of gas; re-estimate next time
+                invalidate_gas_estimate(gas_key)
+                raise
+        output = result.stdout.decode()
+        resp = json.loads(output)
+        lease.spent = gas_spent(resp)
+    record_gas_used(gas_key, resp)
+    return resp
+
 def mint_token(params):
     # Assumes Sui CLI is installed and configured for testnet
     cmd = [
@@ -31,13 +81,10 @@ def mint_token(params):
         "--module", params.module_name,
         "--function", "mint",
         "--args", params.treasury_cap_id, str(params.amount), params.recipient,
-        "--gas-budget", "100000000",
         "--json",
         "--sender", params.sender_address
     ]
-    result = subprocess.run(cmd, capture_output=True, check=True)
-    output = result.stdout.decode()
-    resp = json.loads(output)
+    resp = _execute_call(cmd, "client call mint", call_key(params.package_id, "mint"), params.sender_address)
     return resp.get('digest')
 
 def burn_token(params):
@@ -48,13 +95,10 @@ def burn_token(params):
         "--module", params.module_name,
         "--function", "burn",
         "--args", params.treasury_cap_id, str(params.amount),
-        "--gas-budget", "100000000",
         "--json",
         "--sender", params.sender_address
     ]
-    result = subprocess.run(cmd, capture_output=True, check=True)
-    output = result.stdout.decode()
-    resp = json.loads(output)
+    resp = _execute_call(cmd, "client call burn", call_key(params.package_id, "burn"), params.sender_address)
     return resp.get('digest')
 
 def transfer_token(params):
@@ -65,13 +109,10 @@ def transfer_token(params):
         "--module", params.module_name,
         "--function", "transfer",
         "--args", params.coin_object_id, params.recipient, str(params.amount),
-        "--gas-budget", "100000000",
         "--json",
         "--sender", params.sender_address
     ]
-    result = subprocess.run(cmd, capture_output=True, check=True)
-    output = result.stdout.decode()
-    resp = json.loads(output)
+    resp = _execute_call(cmd, "client call transfer", call_key(params.package_id, "transfer"), params.sender_address)
     return resp.get('digest')
 
 def transfer_token_capabilities(package_id, creator_address):
@@ -84,7 +125,8 @@ def transfer_token_capabilities(package_id, creator_address):
         SUI_CLI_PATH,
         "client", "objects", "--address", creator_address, "--json"
     ]
-    result = subprocess.run(cmd, capture_output=True, check=True)
+    with SUI_COMMAND_SECONDS.time(command="client objects"):
+        result = subprocess.run(cmd, capture_output=True, check=True)
     output = result.stdout.decode()
     objs = json.loads(output)
     treasury_caps = [
@@ -92,10 +134,10 @@ def transfer_token_capabilities(package_id, creator_address):
         if obj.get('type', '').startswith(f"0x2::coin::TreasuryCap<{package_id}")
     ]
     if not treasury_caps:
-        print(f"No TreasuryCap found for package {package_id}")
+        logger.warning("No TreasuryCap found", extra={"package_id": package_id})
         return False
     treasury_cap_id = treasury_caps[0]['objectId']
     # Optionally, transfer minted coins if needed
     # This is a stub: in production, you may want to mint initial supply and transfer to creator here
-    print(f"TreasuryCap for package {package_id} is at {treasury_cap_id} and owned by {creator_address}")
+    logger.info("TreasuryCap located", extra={"package_id": package_id, "treasury_cap_id": treasury_cap_id, "owner": creator_address})
     return True
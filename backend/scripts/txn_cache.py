@@ -0,0 +1,80 @@
+import asyncio
+from config import TX_DETAILS_CACHE_SIZE, TX_DETAILS_CACHE_PERSIST, TX_HISTORY_CACHE_SIZE, TX_HISTORY_CACHE_TTL
+from database import get_cached_transaction, save_cached_transaction
+from scripts import sui_txn_utils
+from scripts.lru_cache import LRUCache, MISSING
+
+
+class RequestCoalescer:
+    """Concurrent awaits for the same key on one event loop share a single upstream fetch."""
+
+    def __init__(self):
+        self.coalesced = 0
+        self._inflight = {}
+
+    async def run(self, key, fetch):
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+        task = self._inflight[key] = asyncio.ensure_future(fetch())
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+
+
+_details_cache = LRUCache(TX_DETAILS_CACHE_SIZE)
+_history_cache = LRUCache(TX_HISTORY_CACHE_SIZE, ttl=TX_HISTORY_CACHE_TTL)
+_coalescer = RequestCoalescer()
+
+def _is_final(details):
+    # A transaction is immutable once it is included in a checkpoint
+    return isinstance(details, dict) and details.get('checkpoint') is not None
+
+async def _cached_history(key, fetch):
+    txns = _history_cache.get(key)
+    if txns is MISSING:
+        async def fetch_and_store():
+            result = await fetch()
+            _history_cache.set(key, result)
+            return result
+        txns = await _coalescer.run(key, fetch_and_store)
+    return txns
+
+async def get_transactions_by_object(object_id):
+    return await _cached_history(
+        ('object', object_id), lambda: sui_txn_utils.get_transactions_by_object_async(object_id)
+    )
+
+async def get_transactions_by_address(address):
+    return await _cached_history(
+        ('address', address), lambda: sui_txn_utils.get_transactions_by_address_async(address)
+    )
+
+async def get_transaction_details(tx_digest):
+    details = _details_cache.get(tx_digest)
+    if details is not MISSING:
+        return details
+    if TX_DETAILS_CACHE_PERSIST:
+        details = await asyncio.to_thread(get_cached_transaction, tx_digest)
+        if details is not None:
+            _details_cache.set(tx_digest, details)
+            return details
+
+    async def fetch_and_store():
+        result = await sui_txn_utils.get_transaction_details_async(tx_digest)
+        if _is_final(result):
+            _details_cache.set(tx_digest, result)
+            if TX_DETAILS_CACHE_PERSIST:
+                await asyncio.to_thread(save_cached_transaction, tx_digest, result)
+        return result
+    return await _coalescer.run(('details', tx_digest), fetch_and_store)
+
+def cache_stats():
+    return {
+        "transaction_details": _details_cache.stats(),
+        "transaction_history": _history_cache.stats(),
+        "coalesced_requests": _coalescer.coalesced,
+    }
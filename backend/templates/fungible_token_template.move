@@ -1,4 +1,4 @@
-module token_contract::{{token_name}} {
+module {{package_name}}::{{token_name}} {
     use std::option;
     use sui::coin;
     use sui::transfer;
@@ -1,7 +1,17 @@
 import argparse
+import csv
+import json
 import os
 import re
 import math
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# The Move template and its renderer live in the backend so both produce identical packages
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from scripts.move_template import render_token_module
 
 def sanitize_name(name):
     """Converts a token name to a valid Move module/identifier format."""
@@ -14,74 +24,24 @@ def sanitize_name(name):
     return name
 
 def generate_move_contract(args):
-    """Generates the Move contract code."""
+    """Generates the Move contract code from the shared backend template."""
     module_name = sanitize_name(args.token_name)
-    witness_name = module_name.upper()
     raw_initial_supply = args.initial_supply * (10**args.decimals)
 
     # Ensure integer representation for large numbers if needed
     raw_initial_supply_str = str(int(raw_initial_supply))
 
-    # Format description and image URL as byte strings
-    description_bytes = args.description.encode('utf-8').hex()
-    image_url_bytes = args.image_url.encode('utf-8').hex()
-    symbol_bytes = args.token_symbol.encode('utf-8').hex()
-    name_bytes = args.token_name.encode('utf-8').hex() # Use original name for metadata
-
-    move_code = f"""\
-module {module_name}::{module_name} {{
-    use std::option;
-    use sui::coin;
-    use sui::transfer;
-    use sui::tx_context::{{Self, TxContext}};
-    use sui::url::{{Self, Url}};
-
-    /// Witness struct for the {args.token_name} coin. Matches the module name in uppercase.
-    public struct {witness_name} has drop {{}}
-
-    /// Module initializer called once on module publish.
-    fun init(witness: {witness_name}, ctx: &mut TxContext) {{
-        let (mut treasury, metadata) = coin::create_currency(
-            witness,
-            {args.decimals}, // decimals
-            b"{args.token_symbol}", // symbol
-            b"{args.token_name}", // name
-            b"{args.description}", // description
-            option::some(url::new_unsafe_from_bytes(b"{args.image_url}")), // icon url
-            ctx
-        );
-
-        // Freeze the metadata to make it immutable
-        transfer::public_freeze_object(metadata);
-
-        // Mint the initial supply to the deployer
-        let initial_amount = {raw_initial_supply_str}; // {args.initial_supply} tokens with {args.decimals} decimals
-        let deployer = tx_context::sender(ctx);
-        coin::mint_and_transfer(&mut treasury, initial_amount, deployer, ctx);
-
-        // Transfer the TreasuryCap to the deployer for future minting
-        transfer::public_transfer(treasury, deployer);
-    }}
-
-    // --- Optional: Add standard mint/burn functions if needed ---
-
-    // public entry fun mint(
-    //     treasury: &mut coin::TreasuryCap<{witness_name}>,
-    //     amount: u64,
-    //     recipient: address,
-    //     ctx: &mut TxContext
-    // ) {{
-    //     coin::mint_and_transfer(treasury, amount, recipient, ctx);
-    // }}
-
-    // public entry fun burn(
-    //     treasury: &mut coin::TreasuryCap<{witness_name}>,
-    //     coin: coin::Coin<{witness_name}>,
-    // ) {{
-    //     coin::burn(treasury, coin);
-    // }}
-}}
-"""
+    move_code = render_token_module(
+        package_name=module_name,
+        module_name=module_name,
+        name=args.token_name, # Use original name for metadata
+        symbol=args.token_symbol,
+        description=args.description,
+        icon_url=args.image_url,
+        decimals=args.decimals,
+        initial_supply=raw_initial_supply_str,
+        deployer_address=args.deployer_address,
+    )
     return module_name, move_code
 
 def generate_move_toml(module_name, sui_version="1.22.0"): # Use a recent Sui version
@@ -100,20 +60,189 @@ Sui = {{ git = "https://github.com/MystenLabs/sui.git", subdir = "crates/sui-fra
 """
     return toml_content
 
+def write_package(output_dir, module_name, move_code, toml_content):
+    """Writes Move.toml and sources/<module>.move; returns the package directory."""
+    package_dir = os.path.join(output_dir, module_name)
+    sources_dir = os.path.join(package_dir, "sources")
+    os.makedirs(sources_dir, exist_ok=True)
+    with open(os.path.join(sources_dir, f"{module_name}.move"), "w") as f:
+        f.write(move_code)
+    with open(os.path.join(package_dir, "Move.toml"), "w") as f:
+        f.write(toml_content)
+    return package_dir
+
+# --- Batch mode ---
+
+MANIFEST_FIELDS = ("token_name", "token_symbol", "decimals", "initial_supply", "description", "image_url", "deployer_address")
+REQUIRED_FIELDS = ("token_name", "token_symbol", "decimals", "initial_supply", "deployer_address")
+
+def _parse_number(value, kind):
+    """kind(value), or None when the value is missing, blank or not a number (reported by run_batch)."""
+    if value is None or str(value).strip() == "":
+        return None
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        return None
+
+def read_manifest(path, default_deployer=None):
+    """Reads token rows from a .csv (header row) or .jsonl manifest, using the CLI flag names with underscores."""
+    with open(path, "r", newline="") as f:
+        if path.endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+    tokens = []
+    for row in rows:
+        token = {field: row.get(field) for field in MANIFEST_FIELDS}
+        token["description"] = token["description"] or ""
+        token["image_url"] = token["image_url"] or ""
+        token["deployer_address"] = token["deployer_address"] or default_deployer
+        token["decimals"] = _parse_number(token["decimals"], int)
+        token["initial_supply"] = _parse_number(token["initial_supply"], float)
+        tokens.append(token)
+    return tokens
+
+def _render_chunk(chunk, output_dir, sui_version):
+    """Worker: renders and writes one chunk of manifest rows, timing each token."""
+    results = []
+    for index, token in chunk:
+        result = {"index": index, "token_name": token["token_name"], "token_symbol": token["token_symbol"]}
+        try:
+            start = time.perf_counter()
+            module_name, move_code = generate_move_contract(argparse.Namespace(**token))
+            toml_content = generate_move_toml(module_name, sui_version)
+            rendered = time.perf_counter()
+            package_dir = write_package(output_dir, module_name, move_code, toml_content)
+            result.update(
+                module_name=module_name,
+                package_dir=package_dir,
+                status="generated",
+                render_ms=(rendered - start) * 1000,
+                write_ms=(time.perf_counter() - rendered) * 1000,
+            )
+        except Exception as e:
+            result.update(status="error", error=str(e))
+        results.append(result)
+    return results
+
+def _build_package(package_dir, sui_path):
+    """Builds one package with the backend's shared MOVE_HOME and build cache."""
+    from scripts.build_cache import package_hash, restore_build, store_build, sui_env
+    key = package_hash(package_dir)
+    if restore_build(key, package_dir):
+        return "cached", 0.0, None
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sui_path, "move", "build", "--skip-fetch-latest-git-deps", "--path", package_dir],
+        capture_output=True, text=True, env=sui_env(),
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        return "build_failed", elapsed * 1000, proc.stderr[-2000:]
+    store_build(key, package_dir, elapsed)
+    return "built", elapsed * 1000, None
+
+def run_batch(args):
+    started = time.perf_counter()
+    tokens = read_manifest(args.manifest, args.deployer_address)
+    invalid = {}
+    for i, t in enumerate(tokens):
+        fields = [field for field in REQUIRED_FIELDS if t[field] is None or t[field] == ""]
+        if t["decimals"] is not None and t["decimals"] < 0:
+            fields.append("decimals")
+        if fields:
+            invalid[i] = fields
+    if invalid:
+        for i, fields in invalid.items():
+            print(f"Error: manifest row {i} has missing or invalid {', '.join(fields)}")
+        print(f"{len(invalid)} of {len(tokens)} rows need {', '.join(REQUIRED_FIELDS)}; nothing was generated")
+        return 1
+
+    # Packages are named after the sanitized token name; refuse rows that would overwrite each other
+    seen = {}
+    duplicates = []
+    for i, t in enumerate(tokens):
+        name = sanitize_name(t["token_name"])
+        if name in seen:
+            duplicates.append((seen[name], i, name))
+        seen.setdefault(name, i)
+    if duplicates:
+        for first, again, name in duplicates:
+            print(f"Error: rows {first} and {again} both generate package '{name}'")
+        return 1
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    indexed = list(enumerate(tokens))
+    workers = args.workers or os.cpu_count() or 1
+    chunk_size = max(1, math.ceil(len(indexed) / (workers * 4)))
+    chunks = [indexed[i:i + chunk_size] for i in range(0, len(indexed), chunk_size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk_results in pool.map(_render_chunk, chunks, [args.output_dir] * len(chunks), [args.sui_version] * len(chunks)):
+            results.extend(chunk_results)
+    generated_at = time.perf_counter()
+
+    if args.build:
+        to_build = [r for r in results if r["status"] == "generated"]
+        with ThreadPoolExecutor(max_workers=args.build_workers) as pool:
+            outcomes = pool.map(lambda r: _build_package(r["package_dir"], args.sui_path), to_build)
+            for result, (status, build_ms, error) in zip(to_build, outcomes):
+                result.update(status=status, build_ms=build_ms)
+                if error:
+                    result["error"] = error
+
+    results.sort(key=lambda r: r["index"])
+    statuses = {}
+    for r in results:
+        statuses[r["status"]] = statuses.get(r["status"], 0) + 1
+    report = {
+        "manifest": args.manifest,
+        "output_dir": args.output_dir,
+        "tokens": len(results),
+        "statuses": statuses,
+        "generate_seconds": generated_at - started,
+        "total_seconds": time.perf_counter() - started,
+        "results": results,
+    }
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+    ok = sum(1 for r in results if r["status"] in ("generated", "built", "cached"))
+    print(f"Generated {ok}/{len(results)} packages in {report['total_seconds']:.2f}s ({statuses})")
+    if args.report:
+        print(f"Per-token report written to {args.report}")
+    return 0 if ok == len(results) else 1
+
 def main():
     parser = argparse.ArgumentParser(description="Generate a Sui Move fungible token contract.")
-    parser.add_argument("--token-name", required=True, help="Name of the token (e.g., 'My Cool Token')")
-    parser.add_argument("--token-symbol", required=True, help="Symbol of the token (e.g., 'COOL')")
-    parser.add_argument("--decimals", type=int, required=True, help="Number of decimal places for the token (e.g., 9)")
-    parser.add_argument("--initial-supply", type=float, required=True, help="Initial supply of the token (e.g., 1000000)")
+    parser.add_argument("--token-name", help="Name of the token (e.g., 'My Cool Token')")
+    parser.add_argument("--token-symbol", help="Symbol of the token (e.g., 'COOL')")
+    parser.add_argument("--decimals", type=int, help="Number of decimal places for the token (e.g., 9)")
+    parser.add_argument("--initial-supply", type=float, help="Initial supply of the token (e.g., 1000000)")
     parser.add_argument("--description", default="", help="Description of the token")
     parser.add_argument("--image-url", default="", help="URL to the token's image/icon")
+    parser.add_argument("--deployer-address", help="Address that receives the initial supply and the TreasuryCap (batch mode: default for rows without one)")
     parser.add_argument("--output-dir", default=".", help="Directory to create the new token package in (default: current directory)")
     parser.add_argument("--sui-version", default="1.22.0", help="Sui framework version to use in Move.toml (default: 1.22.0)")
-
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument("--manifest", help="CSV or JSONL file with one token per row (fields: " + ", ".join(MANIFEST_FIELDS) + ")")
+    batch.add_argument("--workers", type=int, default=0, help="Render processes (default: CPU count)")
+    batch.add_argument("--build", action="store_true", help="Also run 'sui move build' on every package, sharing the dependency/build cache")
+    batch.add_argument("--build-workers", type=int, default=2, help="Concurrent builds with --build (default: 2)")
+    batch.add_argument("--sui-path", default="sui", help="Sui CLI binary used by --build (default: sui)")
+    batch.add_argument("--report", help="Write a JSON summary with per-token timings to this file")
 
     args = parser.parse_args()
 
+    if args.manifest:
+        sys.exit(run_batch(args))
+
+    required = ["token_name", "token_symbol", "decimals", "initial_supply", "deployer_address"]
+    missing = [f"--{name.replace('_', '-')}" for name in required if getattr(args, name) is None]
+    if missing:
+        parser.error(f"the following arguments are required: {', '.join(missing)}")
+
     if not args.image_url:
         print("Warning: No image URL provided. Using an empty string.")
     if not args.description:
@@ -123,21 +252,10 @@ def main():
     module_name, move_code = generate_move_contract(args)
     toml_content = generate_move_toml(module_name, args.sui_version)
 
-    package_dir = os.path.join(args.output_dir, module_name)
-    sources_dir = os.path.join(package_dir, "sources")
-    move_file_path = os.path.join(sources_dir, f"{module_name}.move")
-    toml_file_path = os.path.join(package_dir, "Move.toml")
-
     try:
-        os.makedirs(sources_dir, exist_ok=True)
-
-        with open(move_file_path, "w") as f:
-            f.write(move_code)
-        print(f"Successfully generated Move contract: {move_file_path}")
-
-        with open(toml_file_path, "w") as f:
-            f.write(toml_content)
-        print(f"Successfully generated Move.toml: {toml_file_path}")
+        package_dir = write_package(args.output_dir, module_name, move_code, toml_content)
+        print(f"Successfully generated Move contract: {os.path.join(package_dir, 'sources', f'{module_name}.move')}")
+        print(f"Successfully generated Move.toml: {os.path.join(package_dir, 'Move.toml')}")
 
         print(f"\nGenerated token package '{module_name}' in '{package_dir}'")
         print("To build the package, navigate to the directory and run:")